@@ -0,0 +1,61 @@
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core import replicas
+from app.core.config import settings
+from app.core.database import RoutingSession, _use_immediate_transactions, apply_sqlite_pragmas, mark_read_only
+
+# Only imported when settings.USE_ASYNC_DB is on, so the async driver
+# (aiosqlite locally, asyncpg in production) stays an optional dependency.
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=settings.DB_ECHO)
+async_writer_engine = async_engine
+
+if settings.ASYNC_DATABASE_URL.startswith("sqlite") and settings.DB_PROFILE != "legacy":
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+    # The same writer as the sync stack's: one connection that takes the
+    # write lock up front. Group commit writes through the sync writer, so
+    # the two queue on BEGIN IMMEDIATE instead of failing lock upgrades.
+    async_writer_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        echo=settings.DB_ECHO,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_WRITER_TIMEOUT_SECONDS,
+    )
+    event.listen(async_writer_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    _use_immediate_transactions(async_writer_engine.sync_engine)
+
+
+def _async_replica_engine(url):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    elif url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    replica = create_async_engine(url, echo=settings.DB_ECHO)
+    if url.get_backend_name() == "sqlite":
+        event.listen(replica.sync_engine, "connect", apply_sqlite_pragmas)
+    return replica
+
+
+replica_engines = [_async_replica_engine(replica.url) for replica in replicas.REPLICAS]
+event.listen(async_writer_engine.sync_engine, "commit", replicas.note_commit)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    writer=async_writer_engine.sync_engine,
+    reader=async_engine.sync_engine,
+    replica_binds=[replica.sync_engine for replica in replica_engines],
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        mark_read_only(db, request)
+        yield db
@@ -0,0 +1,33 @@
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.async_database import get_async_db
+from app.core.dependencies import decode_user_id, oauth2_scheme, principal_cache
+from app.models.user import User
+from app.schemas.user import UserOut
+from app.utils.perimissions import AccessScope, resolve_scope_async
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    user_id = decode_user_id(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.scalar(select(User).where(User.userId == user_id))
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        principal = UserOut.model_validate(user)
+        principal_cache.set(user_id, principal)
+
+    db.info["user_id"] = user_id
+    return principal
+
+
+async def get_access_scope(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+) -> AccessScope:
+    return await resolve_scope_async(db, user)
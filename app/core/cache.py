@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry time-to-live and hit/miss counters."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
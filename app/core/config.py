@@ -4,6 +4,120 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     ALGORITHM: str = "HS256"
+    # "auto" uses the stdlib HMAC signer for HS* and python-jose otherwise;
+    # "jose", "hmac" and "pyjwt" force a backend.
+    JWT_BACKEND: str = "auto"
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 50000
+
+    DATABASE_URL: str = "sqlite:///./tracker.db"
+    DB_ECHO: bool = False
+    # "production": WAL + pragmas, one writer connection and a reader pool.
+    # "legacy": the original single default-pooled engine.
+    DB_PROFILE: str = "production"
+    DB_READER_POOL_SIZE: int = 8
+    DB_READER_MAX_OVERFLOW: int = 16
+    DB_WRITER_TIMEOUT_SECONDS: float = 30
+    # Read replicas for @read_only routes (app.core.replicas). With
+    # DB_REPLICA_SYNC_SECONDS > 0 each URL is a local SQLite copy that this
+    # process refreshes from the primary on that interval, and a copy more
+    # than DB_REPLICA_MAX_LAG_SECONDS old is not read. Otherwise replicas are
+    # kept up elsewhere and a user reads from the primary for
+    # DB_REPLICA_STICKY_SECONDS after their own write.
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_SYNC_SECONDS: float = 0
+    DB_REPLICA_STICKY_SECONDS: float = 5
+    DB_REPLICA_MAX_LAG_SECONDS: float = 30
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    DB_MIGRATE_ON_STARTUP: bool = True
+    DB_CHECK_QUERY_PLANS: bool = True
+
+    # Opt-in async stack: routers in app/routers/aio served over AsyncSession.
+    USE_ASYNC_DB: bool = False
+    ASYNC_DATABASE_URL: str = "sqlite+aiosqlite:///./tracker.db"
+
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 500
+    EXPORT_BATCH_SIZE: int = 1000
+    BULK_MAX_ITEMS: int = 10000
+
+    # bcrypt runs on a process pool; 0 workers hashes inline in the request thread.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_DEPTH: int = 16
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    # ETag response cache for polled list endpoints. Versions are per process,
+    # so with several workers a stale body lives at most the TTL.
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_SIZE: int = 5000
+
+    # /metrics and the X-Profile sampling profiler (off unless enabled; when
+    # PROFILING_TOKEN is set the header value must match it).
+    METRICS_QUANTILE_WINDOW: int = 1024
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str = ""
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_INTERVAL_SECONDS: float = 0.001
+
+    # Per-route SQL statement budgets (@query_budget): "off", "warn" or "raise".
+    QUERY_BUDGET_MODE: str = "off"
+
+    # Change feed: events kept for Last-Event-ID resume, and how many may queue
+    # for one subscriber before it is dropped.
+    EVENT_BUFFER_SIZE: int = 10000
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 256
+    EVENT_HEARTBEAT_SECONDS: float = 15
+
+    # Per-process; other workers see membership changes after at most the TTL.
+    ACCESS_SCOPE_CACHE_TTL_SECONDS: int = 30
+    ACCESS_SCOPE_CACHE_MAX_SIZE: int = 10000
+
+    # Tiered history (archive_history.py): how often every process re-reads
+    # the archive partition catalog. compact waits ARCHIVE_COMPACT_GRACE_SECONDS
+    # after a month is archived, so keep it well above the refresh interval.
+    ARCHIVE_CATALOG_REFRESH_SECONDS: float = 30
+    ARCHIVE_COMPACT_GRACE_SECONDS: float = 300
+
+    # Columnar snapshot behind /time_entries/reports. Every process holds
+    # time_entries and tasks as arrays (about 25 bytes per entry) and applies
+    # new and changed rows every ANALYTICS_REFRESH_SECONDS. Change log rows
+    # are kept ANALYTICS_CHANGE_RETENTION_SECONDS; a process further behind
+    # reloads.
+    ANALYTICS_ENABLED: bool = True
+    ANALYTICS_REFRESH_SECONDS: float = 60
+    ANALYTICS_LOAD_BATCH: int = 100000
+    ANALYTICS_CHANGE_RETENTION_SECONDS: float = 86400
+    ANALYTICS_RETRY_AFTER_SECONDS: int = 5
+
+    # Side effects such as task logs run on worker threads after the request
+    # commits (app.core.jobs), JOBS_BATCH_SIZE per transaction. Durable jobs
+    # are written to the jobs table with the request and survive a crash;
+    # in-memory ones are lost if the process dies before they run.
+    JOBS_DURABLE: bool = True
+    JOBS_WORKERS: int = 1
+    JOBS_BATCH_SIZE: int = 500
+    JOBS_BATCH_DELAY_SECONDS: float = 0.05
+    JOBS_POLL_SECONDS: float = 1
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_SECONDS: float = 1
+
+    # Group commit (app.core.group_commit): time-entry creates and task status
+    # changes arriving within GROUP_COMMIT_WINDOW_MS share one writer
+    # transaction of up to GROUP_COMMIT_MAX_BATCH writes, each in a savepoint.
+    # A write still waiting after GROUP_COMMIT_TIMEOUT_SECONDS gets a 503.
+    GROUP_COMMIT_ENABLED: bool = True
+    GROUP_COMMIT_WINDOW_MS: float = 2
+    GROUP_COMMIT_MAX_BATCH: int = 64
+    GROUP_COMMIT_TIMEOUT_SECONDS: float = 30
+    GROUP_COMMIT_RETRY_AFTER_SECONDS: int = 1
 
     model_config = SettingsConfigDict(
         env_file=".env",
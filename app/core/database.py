@@ -49,28 +49,135 @@
 #     finally:
 #         db.close()
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
-
-DATABASE_URL = "sqlite:///./tracker.db"
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    echo=True
-)
-
-SessionLocal = sessionmaker(
-    bind=engine,
-    autoflush=False,
-    autocommit=False
-)
+from fastapi import Request
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+
+from app.core import replicas
+from app.core.config import settings
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def _use_immediate_transactions(engine):
+    # pysqlite defers BEGIN until the first DML and upgrades the lock lazily;
+    # taking the write lock up front avoids SQLITE_BUSY on lock upgrade and
+    # makes SAVEPOINTs behave.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+def create_engines(url=None, profile=None, echo=None):
+    """Build the (writer, reader) engine pair for a database profile."""
+    url = url or settings.DATABASE_URL
+    profile = profile or settings.DB_PROFILE
+    echo = settings.DB_ECHO if echo is None else echo
+    is_sqlite = url.startswith("sqlite")
+    connect_args = {"check_same_thread": False} if is_sqlite else {}
+
+    if profile == "legacy" or not is_sqlite:
+        engine = create_engine(url, connect_args=connect_args, echo=echo)
+        return engine, engine
+
+    # SQLite allows one writer at a time; queue writers on a single pooled
+    # connection instead of letting them fight over the database lock.
+    writer = create_engine(
+        url,
+        connect_args=connect_args,
+        echo=echo,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_WRITER_TIMEOUT_SECONDS,
+    )
+    reader = create_reader_engine(url, echo)
+    event.listen(writer, "connect", apply_sqlite_pragmas)
+    _use_immediate_transactions(writer)
+
+    return writer, reader
+
+def create_reader_engine(url, echo=None):
+    """A pooled read-side engine: the primary's reader pool or a replica."""
+    echo = settings.DB_ECHO if echo is None else echo
+    is_sqlite = url.startswith("sqlite")
+    reader = create_engine(
+        url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        echo=echo,
+        pool_size=settings.DB_READER_POOL_SIZE,
+        max_overflow=settings.DB_READER_MAX_OVERFLOW,
+    )
+    if is_sqlite:
+        event.listen(reader, "connect", apply_sqlite_pragmas)
+    return reader
+
+class RoutingSession(Session):
+    """Session that flushes and runs DML on the writer and reads from the reader pool.
+
+    A read-only session (see app.core.replicas) reads from a replica once
+    info["user_id"] is set, if app.core.replicas.choose picks one.
+    """
+
+    def __init__(self, *args, writer=None, reader=None, replica_binds=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader or writer
+        self.replica_binds = replica_binds
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            # Stay on the writer once it has been used: later reads see this
+            # session's own writes, and ORM bulk operations that resolve
+            # their bind by mapper alone share the writer's transaction.
+            self.info["primary"] = True
+
+        if self.info.get("primary"):
+            return self.writer
+        if self.replica_binds and self.info.get("read_only") and "user_id" in self.info:
+            if "replica" not in self.info:
+                # One replica per session, so its reads share one snapshot.
+                self.info["replica"] = replicas.choose(self.info["user_id"], self.info.get("request_state"))
+            if self.info["replica"] is not None:
+                return self.replica_binds[self.info["replica"]]
+        return self.reader
+
+def create_session_factory(writer, reader, replica_binds=()):
+    return sessionmaker(
+        class_=RoutingSession,
+        writer=writer,
+        reader=reader,
+        replica_binds=replica_binds,
+        autoflush=False,
+        autocommit=False
+    )
+
+def mark_read_only(db, request: Request):
+    """Let db read from a replica if the request's route is @read_only."""
+    if replicas.route_read_only(request.scope.get("route")):
+        db.info["read_only"] = True
+        db.info["request_state"] = request.state
+
+engine, reader_engine = create_engines()
+replica_engines = [create_reader_engine(replica.url) for replica in replicas.REPLICAS]
+event.listen(engine, "commit", replicas.note_commit)
+
+SessionLocal = create_session_factory(engine, reader_engine, replica_engines)
 
 class Base(DeclarativeBase):
     pass
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    mark_read_only(db, request)
     try:
         yield db
     finally:
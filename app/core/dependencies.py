@@ -1,14 +1,36 @@
+import hashlib
+import time
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import SECRET_KEY, ALGORITHM
+from app.core.security import decode_access_token
 from app.models.user import User
+from app.schemas.user import UserOut
+from app.utils.perimissions import AccessScope, resolve_scope
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Authenticated users are cached as detached UserOut snapshots so role checks
+# in the routers never need a session.
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Verified tokens -> user id, keyed by the token's SHA-256 so raw bearer tokens
+# are never held in memory. Entries never outlive the token's exp.
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
 # def get_current_user(
 #     token: str = Depends(oauth2_scheme),
 #     db: Session = Depends(get_db)
@@ -25,20 +47,84 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 #     return user
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+def decode_user_id(token: str) -> int:
+    key = hashlib.sha256(token.encode()).digest()
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        return user_id
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-    except JWTError:
+        user_id = int(user_id)
+    except (JWTError, ValueError):
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.userId == int(user_id)).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(key, user_id, ttl=ttl)
+    return user_id
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    return authenticate(db, token)
+
+
+def authenticate(db: Session, token: str) -> UserOut:
+    """The principal behind a bearer token, for callers outside Depends."""
+    user_id = decode_user_id(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.userId == user_id).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+
+        principal = UserOut.model_validate(user)
+        principal_cache.set(user_id, principal)
+
+    # Reads from here on may go to a replica; see app.core.replicas.
+    db.info["user_id"] = user_id
+    return principal
+
+
+def get_access_scope(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> AccessScope:
+    # FastAPI resolves this once per request; resolve_scope caches across requests.
+    return resolve_scope(db, user)
+
+
+def invalidate_principal(user_id: int):
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    # Role, email or name changes must not be served from a stale principal.
+    invalidate_principal(target.userId)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principal_changes", set()).add(target.userId)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Again after commit: a concurrent request may have re-cached the old
+    # row between our flush and commit.
+    for user_id in session.info.pop("principal_changes", ()):
+        invalidate_principal(user_id)
+
 
-    return user
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes(session):
+    session.info.pop("principal_changes", None)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+
+class Subscriber:
+    """One stream's bounded queue, owned by the event loop that serves it."""
+
+    def __init__(self, project_id: int, loop: asyncio.AbstractEventLoop):
+        self.project_id = project_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=settings.EVENT_SUBSCRIBER_QUEUE_SIZE)
+        self.dropped = False
+
+    def offer(self, event):
+        # Runs on self.loop. A consumer that lets its queue fill is cut off
+        # rather than allowed to hold events (and memory) back; it reconnects
+        # with Last-Event-ID and replays from the bus history.
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBus:
+    """In-process pub/sub of task changes, fanned out per project.
+
+    publish() never blocks: it hands each event to the subscribers' loops
+    and returns. The last EVENT_BUFFER_SIZE events are kept for resume.
+    """
+
+    def __init__(self, buffer_size: int):
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=buffer_size)
+        self._subscribers = {}
+        self._last_id = 0
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, type: str, project_id: int, **data):
+        with self._lock:
+            self._last_id += 1
+            event = {
+                "id": self._last_id,
+                "type": type,
+                "projectId": project_id,
+                "at": datetime.now(timezone.utc).isoformat(),
+                **data,
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers.get(project_id, ()))
+            self.published += 1
+
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                # Loop already closed; the stream's own cleanup will unsubscribe.
+                pass
+        return event
+
+    def subscribe(self, project_id: int, last_event_id: int | None = None):
+        """Register a subscriber and return it with the events to replay.
+
+        The replay is None when last_event_id is no longer (or never was) in
+        the history, meaning the client must refetch instead of resuming.
+        """
+        subscriber = Subscriber(project_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(project_id, set()).add(subscriber)
+            replay = []
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else self._last_id + 1
+                if last_event_id > self._last_id or last_event_id < oldest - 1:
+                    replay = None
+                else:
+                    replay = [
+                        event for event in self._history
+                        if event["id"] > last_event_id and event["projectId"] == project_id
+                    ]
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[subscriber.project_id]
+            if subscriber.dropped:
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "last_event_id": self._last_id,
+                "published": self.published,
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "dropped_subscribers": self.dropped,
+            }
+
+
+bus = EventBus(settings.EVENT_BUFFER_SIZE)
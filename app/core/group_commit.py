@@ -0,0 +1,222 @@
+"""Group commit: concurrent small writes share one writer transaction.
+
+A route hands its write to run() as a unit, a function of a Session:
+
+    entry = group_commit.run(db, lambda session: writes.create_time_entry(session, ...))
+
+The committer thread collects the units that arrive within
+GROUP_COMMIT_WINDOW_MS, up to GROUP_COMMIT_MAX_BATCH of them. A write that
+arrives alone while the previous batch also had a single write is
+committed without waiting, so a quiet server pays no window. It runs
+them in order in one transaction on the writer, each in its own
+SAVEPOINT, and commits once. Each caller gets back its own unit's return
+value. If the unit raised, the caller gets that exception, and the unit's
+savepoint is rolled back without affecting the others. If the COMMIT
+itself fails, every caller in the batch gets that error.
+
+A unit that has not started within GROUP_COMMIT_TIMEOUT_SECONDS is
+dropped, and its caller gets a 503: nothing was written, so a retry is
+safe. A unit already in a batch may still commit, so its caller waits
+for the outcome instead. Should the committer thread die, the callers in
+its batch get the exception that killed it, and the next write starts a
+new thread, which takes over the queue.
+
+Units run in the caller's context, so @query_budget counts their
+statements against the request. They share the batch's Session, so a
+unit sees the writes of the units before it. A check such as the daily
+hour limit therefore stays correct inside a batch. With
+GROUP_COMMIT_ENABLED off, run() applies the unit to the request's own
+session and commits it.
+"""
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core import replicas
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+batches = 0
+units = 0
+timeouts = 0
+
+
+class _Unit:
+    def __init__(self, fn: Callable):
+        self.fn = fn
+        self.future = Future()
+        self.context = contextvars.copy_context()
+        self.result = None
+        self.error = None
+
+    def _apply(self, session):
+        with session.begin_nested():
+            result = self.fn(session)
+            session.flush()
+        return result
+
+    def run(self, session):
+        # Jobs the unit queued must not outlive its savepoint.
+        queued = len(session.info.get("queued_jobs", ()))
+        try:
+            self.result = self.context.run(self._apply, session)
+        except Exception as exc:
+            self.error = exc
+            del session.info.get("queued_jobs", [])[queued:]
+
+
+class GroupCommitter:
+    """The thread that owns the batch transaction."""
+
+    def __init__(self, bind, pending=None):
+        self.bind = bind
+        self._queue = queue.SimpleQueue() if pending is None else pending
+        self._busy = False
+        self._thread = threading.Thread(target=self._loop, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn) -> Future:
+        unit = _Unit(fn)
+        self._queue.put(unit)
+        return unit.future
+
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + settings.GROUP_COMMIT_WINDOW_MS / 1000
+        while len(batch) < settings.GROUP_COMMIT_MAX_BATCH:
+            wait = self._busy or len(batch) > 1
+            try:
+                unit = self._queue.get(timeout=max(deadline - time.monotonic(), 0) if wait else 0)
+            except queue.Empty:
+                break
+            if unit is None:
+                self._queue.put(None)
+                break
+            batch.append(unit)
+        self._busy = len(batch) > 1
+        return batch
+
+    def _loop(self):
+        while (unit := self._queue.get()) is not None:
+            batch = self._collect(unit)
+            try:
+                self._commit(batch)
+            except BaseException as exc:
+                # The thread is going down: fail its callers now rather than
+                # leave them to wait out the timeout.
+                for held in batch:
+                    if not held.future.done():
+                        held.future.set_exception(exc)
+                raise
+
+    def _commit(self, batch):
+        global batches, units
+        # Skip units whose caller timed out and cancelled them.
+        batch = [unit for unit in batch if unit.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            with Session(self.bind, autoflush=False, expire_on_commit=False) as session:
+                with session.begin():
+                    for unit in batch:
+                        unit.run(session)
+        except Exception as exc:
+            # BEGIN or COMMIT failed: nothing in the batch was written.
+            logger.exception("Group commit of %d writes failed", len(batch))
+            for unit in batch:
+                unit.error = exc
+
+        batches += 1
+        units += len(batch)
+        for unit in batch:
+            if unit.error is not None:
+                unit.future.set_exception(unit.error)
+            else:
+                unit.future.set_result(unit.result)
+
+
+_committer = None
+_committer_lock = threading.Lock()
+
+
+def _get_committer() -> GroupCommitter:
+    global _committer
+    with _committer_lock:
+        if _committer is None:
+            _committer = GroupCommitter(engine)
+        elif not _committer.alive():
+            logger.error("Group commit thread died, starting a new one")
+            _committer = GroupCommitter(engine, _committer._queue)
+        return _committer
+
+
+def _timed_out() -> HTTPException:
+    global timeouts
+    timeouts += 1
+    return HTTPException(
+        status_code=503,
+        detail="Write timed out, retry shortly",
+        headers={"Retry-After": str(settings.GROUP_COMMIT_RETRY_AFTER_SECONDS)},
+    )
+
+
+def run(db, fn):
+    """Apply fn(session) and commit it; returns what fn returned."""
+    if not settings.GROUP_COMMIT_ENABLED:
+        result = fn(db)
+        db.commit()
+        return result
+    future = _get_committer().submit(fn)
+    try:
+        result = future.result(timeout=settings.GROUP_COMMIT_TIMEOUT_SECONDS)
+    except TimeoutError:
+        if not future.done() and future.cancel():
+            raise _timed_out()
+        # Already in a batch, which may commit it.
+        result = future.result()
+    # The batch session does not know whose writes it committed.
+    replicas.note_write(db.info.get("user_id"))
+    return result
+
+
+async def run_async(db, fn):
+    """run() for an AsyncSession."""
+    if not settings.GROUP_COMMIT_ENABLED:
+        result = await db.run_sync(fn)
+        await db.commit()
+        return result
+    future = _get_committer().submit(fn)
+    waiter = asyncio.wrap_future(future)
+    # asyncio.wait, unlike wait_for, leaves the unit alone on timeout.
+    await asyncio.wait({waiter}, timeout=settings.GROUP_COMMIT_TIMEOUT_SECONDS)
+    if not waiter.done() and future.cancel():
+        raise _timed_out()
+    result = await waiter
+    replicas.note_write(db.info.get("user_id"))
+    return result
+
+
+def shutdown():
+    """Commit what is queued and stop the committer."""
+    global _committer
+    with _committer_lock:
+        if _committer is not None:
+            _committer.stop()
+            _committer = None
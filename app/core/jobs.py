@@ -0,0 +1,331 @@
+"""Side effects run after the request that caused them, off its path.
+
+A route queues a job in its own session:
+
+    jobs.enqueue(db, "task_log", {"taskId": 1, "userId": 2, "log": "..."})
+
+Once that session commits, a worker thread picks the job up with up to
+JOBS_BATCH_SIZE others. Each handler gets a list of payloads and applies
+them in one writer transaction, so a burst of requests costs one batched
+insert instead of one per request.
+
+With JOBS_DURABLE the job is a row in the ``jobs`` outbox, inserted in
+the request's transaction. It commits or rolls back with the primary
+write and survives a crash; any process's worker may run it. The worker
+deletes a batch and applies it in one transaction, so each job takes
+effect exactly once. Without JOBS_DURABLE, jobs wait in this process's
+memory from commit until they run, and are lost if it dies first.
+
+When a batch fails, its jobs are retried one by one. A job that still
+fails is retried with exponential backoff, up to JOBS_MAX_ATTEMPTS
+times. A durable job that runs out of attempts stays in the outbox with
+failedAt set.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import count, islice
+from typing import Callable, Optional
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.response_cache import table_versions
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS: dict[str, Callable] = {}
+# Tables each kind writes, whose response cache versions a batch bumps.
+WRITES: dict[str, tuple] = {}
+
+completed = 0
+retried = 0
+failed = 0
+
+
+def handler(kind: str, writes=()):
+    """Register fn(connection, payloads) as the handler of a job kind that
+    writes the given tables."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        WRITES[kind] = tuple(writes)
+        return fn
+    return register
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _backoff(attempts) -> float:
+    return settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+
+
+@dataclass
+class QueuedJob:
+    id: int
+    kind: str
+    payload: dict
+    attempts: int = 0
+    createdAt: Optional[datetime] = None
+    # In-memory jobs only: time.monotonic() of the next attempt, and whether
+    # a worker holds the job.
+    due: float = 0.0
+    running: bool = False
+
+
+class OutboxStore:
+    """Durable jobs: rows of the jobs table."""
+
+    def claim(self, connection, limit):
+        due = (
+            select(Job.id)
+            .where(Job.failedAt.is_(None), Job.runAfter <= _utcnow())
+            .order_by(Job.id)
+            .limit(limit)
+        )
+        rows = connection.execute(
+            delete(Job).where(Job.id.in_(due))
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.createdAt)
+        ).all()
+        return sorted((QueuedJob(*row) for row in rows), key=lambda job: job.id)
+
+    def retry(self, connection, failures):
+        """Put failed jobs back, in the transaction that claimed them."""
+        now = _utcnow()
+        rows = []
+        for job, error in failures:
+            attempts = job.attempts + 1
+            rows.append({
+                "id": job.id,
+                "kind": job.kind,
+                "payload": job.payload,
+                "attempts": attempts,
+                "runAfter": now + timedelta(seconds=_backoff(attempts)),
+                "lastError": error,
+                "failedAt": now if attempts >= settings.JOBS_MAX_ATTEMPTS else None,
+                "createdAt": job.createdAt,
+            })
+        if rows:
+            connection.execute(insert(Job), rows)
+
+    def settle(self, claimed, failures):
+        pass
+
+    def abort(self, claimed):
+        # The rollback restored the claimed rows.
+        pass
+
+
+class MemoryStore:
+    """In-memory jobs, held by this process from commit until they have run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[int, QueuedJob] = {}
+        self._ids = count(1)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def put(self, kind, payloads):
+        with self._lock:
+            for payload in payloads:
+                job = QueuedJob(next(self._ids), kind, payload)
+                self._jobs[job.id] = job
+
+    def claim(self, connection, limit):
+        now = time.monotonic()
+        with self._lock:
+            jobs = list(islice(
+                (job for job in self._jobs.values() if not job.running and job.due <= now), limit,
+            ))
+            for job in jobs:
+                job.running = True
+        return jobs
+
+    def retry(self, connection, failures):
+        pass
+
+    def settle(self, claimed, failures):
+        """After commit: forget the jobs that ran and reschedule the rest."""
+        now = time.monotonic()
+        retry = {job.id for job, _ in failures}
+        with self._lock:
+            for job in claimed:
+                if job.id in retry:
+                    job.attempts += 1
+                    if job.attempts < settings.JOBS_MAX_ATTEMPTS:
+                        job.due = now + _backoff(job.attempts)
+                        job.running = False
+                        continue
+                self._jobs.pop(job.id, None)
+
+    def abort(self, claimed):
+        with self._lock:
+            for job in claimed:
+                job.running = False
+
+
+_outbox = OutboxStore()
+_memory = MemoryStore()
+
+
+def _store():
+    return _outbox if settings.JOBS_DURABLE else _memory
+
+
+def enqueue(db, kind: str, *payloads: dict):
+    """Queue jobs to run after db's transaction commits. Durable jobs are
+    written to the outbox as part of that transaction."""
+    db.info.setdefault("queued_jobs", []).append((kind, payloads))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_outbox(session):
+    # One executemany for everything the transaction queued; added as ORM
+    # objects, each row would be its own INSERT ... RETURNING.
+    queued = session.info.get("queued_jobs")
+    if queued and settings.JOBS_DURABLE:
+        now = _utcnow()
+        session.execute(insert(Job), [
+            {"kind": kind, "payload": payload, "runAfter": now}
+            for kind, payloads in queued
+            for payload in payloads
+        ])
+
+
+@event.listens_for(Session, "after_commit")
+def _release_committed_jobs(session):
+    queued = session.info.pop("queued_jobs", None)
+    if not queued:
+        return
+    if not settings.JOBS_DURABLE:
+        for kind, payloads in queued:
+            _memory.put(kind, payloads)
+    _wake.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_queued_jobs(session):
+    session.info.pop("queued_jobs", None)
+
+
+def _run_handlers(connection, jobs):
+    by_kind = defaultdict(list)
+    for job in jobs:
+        by_kind[job.kind].append(job.payload)
+    for kind, payloads in by_kind.items():
+        HANDLERS[kind](connection, payloads)
+
+
+def _apply(connection, jobs):
+    """Run jobs as one batch, or one by one if the batch fails; returns
+    [(job, error)] for the jobs that failed on their own."""
+    if len(jobs) > 1:
+        try:
+            with connection.begin_nested():
+                _run_handlers(connection, jobs)
+            return []
+        except Exception:
+            logger.warning("Batch of %d jobs failed, running them one by one", len(jobs), exc_info=True)
+
+    failures = []
+    for job in jobs:
+        try:
+            with connection.begin_nested():
+                _run_handlers(connection, [job])
+        except Exception as exc:
+            logger.warning("Job %s (%s) failed: %r", job.id, job.kind, exc)
+            failures.append((job, repr(exc)))
+    return failures
+
+
+def run_batch(bind=None) -> int:
+    """Run up to JOBS_BATCH_SIZE due jobs; returns how many were claimed."""
+    global completed, retried, failed
+    store = _store()
+    claimed, failures = [], []
+    try:
+        with (bind or engine).begin() as connection:
+            claimed = store.claim(connection, settings.JOBS_BATCH_SIZE)
+            if not claimed:
+                return 0
+            failures = _apply(connection, claimed)
+            store.retry(connection, failures)
+    except Exception:
+        store.abort(claimed)
+        raise
+    store.settle(claimed, failures)
+    # Handlers write through a bare connection, which the session hooks
+    # that keep the response cache fresh never see.
+    table_versions.bump({table for job in claimed for table in WRITES.get(job.kind, ())})
+
+    completed += len(claimed) - len(failures)
+    for job, error in failures:
+        if job.attempts + 1 >= settings.JOBS_MAX_ATTEMPTS:
+            failed += 1
+            logger.error("Job %s (%s) gave up after %d attempts: %s", job.id, job.kind, job.attempts + 1, error)
+        else:
+            retried += 1
+    return len(claimed)
+
+
+def drain(bind=None) -> int:
+    """Run batches until no job is due; returns how many were claimed."""
+    total = 0
+    while True:
+        try:
+            claimed = run_batch(bind)
+        except Exception:
+            logger.exception("Job batch failed")
+            return total
+        total += claimed
+        if claimed < settings.JOBS_BATCH_SIZE:
+            return total
+
+
+# ---------- Workers ----------
+
+_wake = threading.Event()
+_stop = threading.Event()
+_workers: list[threading.Thread] = []
+
+
+def _work_loop():
+    while not _stop.is_set():
+        _wake.wait(settings.JOBS_POLL_SECONDS)
+        # Let the commits of a burst gather into one batch.
+        _stop.wait(settings.JOBS_BATCH_DELAY_SECONDS)
+        _wake.clear()
+        drain()
+    drain()
+
+
+def start():
+    """Start the workers; they first run whatever an earlier process left
+    in the outbox."""
+    if _workers:
+        return
+    _stop.clear()
+    _wake.set()
+    for number in range(max(settings.JOBS_WORKERS, 1)):
+        worker = threading.Thread(target=_work_loop, name=f"jobs-{number}", daemon=True)
+        worker.start()
+        _workers.append(worker)
+
+
+def shutdown():
+    """Stop the workers once they have run every job that is due."""
+    _stop.set()
+    _wake.set()
+    while _workers:
+        _workers.pop().join()
+    if len(_memory):
+        logger.warning("%d in-memory jobs not run at shutdown", len(_memory))
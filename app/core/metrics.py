@@ -0,0 +1,277 @@
+import threading
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from decimal import Decimal
+from time import perf_counter
+
+import orjson
+from fastapi import routing
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.profiler import SamplingProfiler, profile_path
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.serialize_time = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        # Recent latencies for exact p50/p95/p99 alongside the buckets.
+        self.recent = deque(maxlen=settings.METRICS_QUANTILE_WINDOW)
+        self.statuses = {}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.routes = {}
+        self.caches = {}
+        self.collectors = []
+
+    def record(self, method, route, status, duration, stats: RequestStats):
+        with self._lock:
+            metrics = self.routes.get((method, route))
+            if metrics is None:
+                metrics = self.routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(duration)
+            metrics.db_time.observe(stats.db_seconds)
+            metrics.serialize_time.observe(stats.serialize_seconds)
+            metrics.queries.observe(stats.queries)
+            metrics.recent.append(duration)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def register_cache(self, name, cache):
+        """Anything with a stats() dict of counters (TTLCache)."""
+        self.caches[name] = cache
+
+    def register_collector(self, fn):
+        """fn() -> iterable of (name, type, help, labels dict, value)."""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            routes = sorted(self.routes.items())
+            _histograms(lines, routes, "http_request_duration_seconds",
+                        "Request latency by route.", lambda m: m.latency)
+            _histograms(lines, routes, "db_time_seconds",
+                        "Time spent in database calls per request.", lambda m: m.db_time)
+            _histograms(lines, routes, "db_queries_per_request",
+                        "Database statements executed per request.", lambda m: m.queries)
+            _histograms(lines, routes, "serialization_seconds",
+                        "Response model validation and JSON encoding time per request.",
+                        lambda m: m.serialize_time)
+
+            lines.append("# HELP http_request_latency_seconds Latency quantiles over recent requests.")
+            lines.append("# TYPE http_request_latency_seconds summary")
+            for (method, route), metrics in routes:
+                recent = sorted(metrics.recent)
+                for q in QUANTILES:
+                    value = recent[min(int(q * len(recent)), len(recent) - 1)] if recent else 0
+                    lines.append(_sample("http_request_latency_seconds",
+                                         {"method": method, "route": route, "quantile": q}, value))
+
+            lines.append("# HELP http_requests_total Requests by route and status.")
+            lines.append("# TYPE http_requests_total counter")
+            for (method, route), metrics in routes:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(_sample("http_requests_total",
+                                         {"method": method, "route": route, "status": status}, count))
+
+        cache_stats = {name: cache.stats() for name, cache in self.caches.items()}
+        for stat, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                           ("invalidations", "counter"), ("size", "gauge")):
+            name = f"cache_{stat}_total" if kind == "counter" else f"cache_{stat}"
+            lines.append(f"# TYPE {name} {kind}")
+            for cache, stats in sorted(cache_stats.items()):
+                lines.append(_sample(name, {"cache": cache}, stats[stat]))
+
+        declared = set()
+        for collect in self.collectors:
+            for name, kind, help, labels, value in collect():
+                if name not in declared:
+                    declared.add(name)
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} {kind}")
+                lines.append(_sample(name, labels, value))
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name, labels, value) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def _histograms(lines, routes, name, help, pick):
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for (method, route), metrics in routes:
+        histogram = pick(metrics)
+        labels = {"method": method, "route": route}
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(_sample(f"{name}_bucket", {**labels, "le": bound}, count))
+        lines.append(_sample(f"{name}_bucket", {**labels, "le": "+Inf"}, histogram.count))
+        lines.append(_sample(f"{name}_sum", labels, round(histogram.sum, 6)))
+        lines.append(_sample(f"{name}_count", labels, histogram.count))
+
+
+registry = Registry()
+
+
+class MetricsMiddleware:
+    """Times each request, collects its DB/serialization stats, and runs the
+    sampling profiler when asked to via the X-Profile header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        profiler = output = None
+        if settings.PROFILING_ENABLED:
+            requested = dict(scope["headers"]).get(b"x-profile")
+            if requested is not None and (
+                not settings.PROFILING_TOKEN or requested.decode() == settings.PROFILING_TOKEN
+            ):
+                output = profile_path(scope["method"], scope["path"])
+                profiler = SamplingProfiler(settings.PROFILE_INTERVAL_SECONDS).start()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if output:
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (b"x-profile-output", output.encode())],
+                    }
+            await send(message)
+
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - started
+            current_request.reset(token)
+            if profiler:
+                profiler.stop()
+                profiler.write_folded(output)
+            route = scope.get("route")
+            registry.record(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                duration,
+                stats,
+            )
+
+
+def _orjson_default(value):
+    # Same text as pydantic's JSON mode, so rows rendered without a
+    # response_model match validated responses byte for byte.
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Unserializable value: {value!r}")
+
+
+class TimedJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        started = perf_counter()
+        try:
+            return orjson.dumps(
+                content,
+                default=_orjson_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            )
+        finally:
+            _add_serialize_time(perf_counter() - started)
+
+
+def _add_serialize_time(seconds):
+    stats = current_request.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+# FastAPI looks serialize_response up at call time, so wrapping the module
+# attribute times response_model validation for every route.
+_serialize_response = routing.serialize_response
+
+
+async def _timed_serialize_response(*args, **kwargs):
+    started = perf_counter()
+    try:
+        return await _serialize_response(*args, **kwargs)
+    finally:
+        _add_serialize_time(perf_counter() - started)
+
+
+routing.serialize_response = _timed_serialize_response
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_started"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
@@ -0,0 +1,68 @@
+"""Schema migrations for databases created before a model change.
+
+``Base.metadata.create_all`` only creates missing tables, so indexes and other
+objects added to existing tables are applied here as numbered steps tracked in
+SQLite's ``PRAGMA user_version``.
+"""
+from app.core.database import Base, engine
+from app.models import user, project, task, assignee, task_log, time_entries, time_rollup, archive, job, analytics as analytics_model  # noqa: F401
+from app.utils import analytics, rollups, search
+from app.utils.archive import unarchive
+
+def _create_model_indexes(connection, *tables):
+    for table in tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+def _0001_query_indexes(connection):
+    _create_model_indexes(
+        connection,
+        time_entries.TimeEntry.__table__,
+        task.Task.__table__,
+        task_log.TaskLog.__table__,
+        assignee.Assignee.__table__,
+        project.ProjectOwner.__table__,
+    )
+
+def _0002_time_rollups(connection):
+    rollups.create_views(connection)
+    rollups.rebuild(connection)
+
+def _0003_full_text_search(connection):
+    search.create_index(connection)
+
+def _0004_analytics_change_log(connection):
+    analytics.create_change_log(connection)
+
+def _0005_unarchive_task_logs(connection):
+    # task_logs are no longer tiered; archived logs return to the hot table,
+    # whose insert trigger puts them back in the search index.
+    unarchive(connection, task_log.TaskLog.__table__)
+
+MIGRATIONS = [
+    _0001_query_indexes,
+    _0002_time_rollups,
+    _0003_full_text_search,
+    _0004_analytics_change_log,
+    _0005_unarchive_task_logs,
+]
+
+def migrate(bind=engine):
+    """Create missing tables and apply pending migrations; returns the new schema version."""
+    Base.metadata.create_all(bind=bind)
+
+    with bind.begin() as connection:
+        current = connection.exec_driver_sql("PRAGMA user_version").scalar()
+        version = current
+        for number, step in enumerate(MIGRATIONS, start=1):
+            if number <= version:
+                continue
+            step(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {number}")
+            version = number
+
+        if version != current:
+            # Refresh planner statistics so the new indexes are picked up.
+            connection.exec_driver_sql("ANALYZE")
+
+    return version
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.config import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+# Jobs running or waiting on the pool; anything past this gets a 503.
+_slots = threading.BoundedSemaphore(
+    max(settings.PASSWORD_HASH_WORKERS, 1) + settings.PASSWORD_HASH_QUEUE_DEPTH
+)
+rejected = 0
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        return _executor
+
+
+def _run(fn, *args):
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return fn(*args)
+
+    global rejected
+    if not _slots.acquire(blocking=False):
+        rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent sign-ins, retry shortly",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        # Blocks this threadpool thread without holding the GIL.
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str) -> str:
+    return _run(security.hash_password, password)
+
+
+def verify_and_rehash(password: str, hash: str):
+    return _run(security.verify_and_rehash, password, hash)
+
+
+def start():
+    """Spawn the workers up front so the first logins don't pay for it."""
+    if settings.PASSWORD_HASH_WORKERS > 0:
+        executor = _get_executor()
+        for future in [executor.submit(int) for _ in range(settings.PASSWORD_HASH_WORKERS)]:
+            future.result()
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
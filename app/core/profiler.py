@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.core.config import settings
+
+# Threads parked in these modules are idle (threadpool workers, the event
+# loop's selector), not doing work for the request being profiled.
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval and counts
+    identical stacks, producing "collapsed" output for flamegraph.pl or
+    speedscope.
+
+    Sync endpoints hop between threadpool threads, so all busy threads are
+    sampled; profile under low concurrency to keep other requests out.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profile_path(method: str, path: str) -> str:
+    slug = path.strip("/").replace("/", "_") or "root"
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    return os.path.join(settings.PROFILE_DIR, f"{int(time.time() * 1000)}-{method}-{slug}.folded")
@@ -0,0 +1,122 @@
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Transaction control and pragmas are bookkeeping, not queries a handler chose to make.
+CONTROL_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+_active: ContextVar[tuple] = ContextVar("active_query_counters", default=())
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse literals, placeholders lists and whitespace so the same query
+    issued in a loop maps to one shape."""
+    shape = re.sub(r"\s+", " ", statement).strip()
+    shape = re.sub(r"'(?:[^']|'')*'", "?", shape)
+    shape = re.sub(r"\b\d+(\.\d+)?\b", "?", shape)
+    shape = re.sub(r"\((?:\?, )+\?\)", "(?...)", shape)
+    return shape
+
+
+class QueryCounter:
+    """Records every SQL statement executed in this context, on any engine.
+
+        with QueryCounter() as queries:
+            client.get("/projects")
+        queries.assert_within(2, "GET /projects")
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        self._token = _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, *exc):
+        _active.reset(self._token)
+
+    @property
+    def queries(self) -> list:
+        return [s for s in self.statements if not s.lstrip().upper().startswith(CONTROL_STATEMENTS)]
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated(self) -> list:
+        """(shape, times) for every statement shape issued more than once."""
+        shapes = Counter(statement_shape(s) for s in self.queries)
+        return [(shape, times) for shape, times in shapes.most_common() if times > 1]
+
+    def report(self, budget: int, label: str) -> str:
+        lines = [f"{label} ran {self.count} queries (budget {budget})"]
+        for shape, times in self.repeated():
+            lines.append(f"  {times}x {shape}")
+        return "\n".join(lines)
+
+    def assert_within(self, budget: int, label: str = "block"):
+        if self.count > budget:
+            raise BudgetExceeded(self.report(budget, label))
+
+
+def query_budget(limit: int):
+    """Declare the most queries an endpoint may run with cold caches.
+
+    Put it under the route decorator; QueryBudgetMiddleware and
+    tests/test_query_budgets.py read it back from the matched route.
+    """
+
+    def decorate(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+
+    return decorate
+
+
+def route_budget(route):
+    return getattr(getattr(route, "endpoint", None), "query_budget", None)
+
+
+class QueryBudgetMiddleware:
+    """Checks each request against its route's budget.
+
+    QUERY_BUDGET_MODE "warn" logs offenders; "raise" raises BudgetExceeded
+    after the response, which TestClient surfaces as a test failure.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or settings.QUERY_BUDGET_MODE == "off":
+            return await self.app(scope, receive, send)
+
+        with QueryCounter() as counter:
+            await self.app(scope, receive, send)
+
+        budget = route_budget(scope.get("route"))
+        if budget is None or counter.count <= budget:
+            return
+        report = counter.report(budget, f"{scope['method']} {scope['route'].path}")
+        if settings.QUERY_BUDGET_MODE == "raise":
+            raise BudgetExceeded(report)
+        logger.warning(report)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active.get():
+        counter.statements.append(statement)
@@ -0,0 +1,71 @@
+"""Startup check that the hot router queries are served by indexes."""
+import logging
+from datetime import date
+
+from sqlalchemy import select
+
+from app.core.database import reader_engine
+from app.models.assignee import Assignee
+from app.models.project import Project
+from app.models.task import Task
+from app.models.task_log import TaskLog
+from app.models.time_entries import TimeEntry
+from app.models.user import User
+from app.utils import rollups
+from app.utils.pagination import paginate
+from app.utils.perimissions import scope_query
+
+logger = logging.getLogger(__name__)
+
+def hot_queries():
+    """Representative statements for the queries issued by app/routers."""
+    today = date.today()
+    return {
+        "validate_daily_hours": rollups.daily_hours_query(1, today),
+        "bulk_create_time_entries": rollups.daily_hours_by_user_query([1, 2], today, today),
+        "get_time_stats": rollups.stats_query(1, today, today),
+        "get_time_entries": select(TimeEntry).where(TimeEntry.userId == 1).order_by(
+            TimeEntry.workDate.desc()
+        ),
+        "get_project_time_entries": select(TimeEntry).where(
+            TimeEntry.projectId == 1, TimeEntry.workDate >= today
+        ).order_by(TimeEntry.workDate.desc()),
+        "get_tasks_by_project": select(Task).where(Task.projectId == 1),
+        "get_task_logs": select(TaskLog).where(TaskLog.taskId == 1),
+        "get_user_assigned_tasks": select(Task).join(
+            Assignee, Assignee.taskId == Task.taskId
+        ).where(Assignee.userId == 1),
+        "get_project_assignees": select(User).join(
+            Assignee, Assignee.userId == User.userId
+        ).join(Task, Task.taskId == Assignee.taskId).where(Task.projectId == 1),
+        # get_projects lists the projects in the caller's AccessScope.
+        "resolve_scope": scope_query(1),
+        "get_projects": paginate(
+            select(Project).where(Project.projectId.in_([1, 2])), (Project.projectId,)
+        ),
+    }
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return [row[-1] for row in rows]
+
+def check_query_plans(bind=reader_engine):
+    """Log a warning for every hot query whose plan scans a table or sorts in a temp b-tree."""
+    if bind.dialect.name != "sqlite":
+        return {}
+
+    problems = {}
+    with bind.connect() as connection:
+        for name, statement in hot_queries().items():
+            plan = explain(connection, statement)
+            bad = [
+                step for step in plan
+                if (step.startswith("SCAN") and "CONSTANT ROW" not in step) or "TEMP B-TREE" in step
+            ]
+            if bad:
+                problems[name] = bad
+                logger.warning("Query %s is not index-backed: %s", name, "; ".join(bad))
+
+    return problems
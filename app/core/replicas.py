@@ -0,0 +1,218 @@
+"""Read replicas for the routes that only read.
+
+A route opts in by being marked under its route decorator:
+
+    @router.get("/time-entries/project/{project_id}")
+    @query_budget(3)
+    @read_only
+    def get_project_time_entries(...):
+
+get_db tags that request's session read-only, and get_current_user tells
+the session who is asking. Once the user is known, RoutingSession sends
+the session's reads to one replica from DB_REPLICA_URLS, taken in turn,
+and stays on it for the rest of the request. Before that (the principal
+lookup) and everywhere else, reads go to the primary's reader pool.
+
+Read-your-writes: every commit that wrote records the time against its
+user. A replica serves that user only once it holds the primary's state
+as of that time. Other users may read from a replica that is behind,
+except for a response the response cache is about to store: that one
+reads from a replica with every commit, or from the primary, so an old
+body is never cached under the current table versions. (If the session
+picked a replica before the cache check ran, the response is just not
+cached.)
+
+With DB_REPLICA_SYNC_SECONDS > 0 each replica is a local SQLite file that
+this process overwrites with a copy of the primary (the sqlite3 backup
+API) on that interval. This is a stand-in for real replication, and it
+copies the whole database each time. Its lag is known exactly: the time
+the last copy started. Otherwise the replicas are maintained elsewhere,
+or are read-only URIs on the primary file (``sqlite:///file:tracker.db?
+mode=ro&uri=true``). Their lag is unknown, so a user stays on the primary
+for DB_REPLICA_STICKY_SECONDS after writing.
+
+Like the response cache versions, write times are per process.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from itertools import count
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Users whose last write is remembered; one who falls out early may read a
+# replica that does not have their write yet.
+STICKY_USERS = 100_000
+
+
+def read_only(endpoint):
+    """Route marker: the endpoint only reads, so it may be served by a replica."""
+    endpoint.read_only = True
+    return endpoint
+
+
+def route_read_only(route) -> bool:
+    return getattr(getattr(route, "endpoint", None), "read_only", False)
+
+
+def _synced() -> bool:
+    return settings.DB_REPLICA_SYNC_SECONDS > 0
+
+
+@dataclass
+class Replica:
+    url: str
+    # time.monotonic() at which the last copy started; every commit before
+    # it is on the replica. Only known for synced copies.
+    synced_at: Optional[float] = None
+    reads: int = 0
+    syncs: int = 0
+
+    def usable(self, now) -> bool:
+        if not _synced():
+            return True
+        return self.synced_at is not None and now - self.synced_at <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+    def caught_up(self, since, now) -> bool:
+        """Whether the replica has everything committed up to `since`."""
+        if since is None:
+            return True
+        if _synced():
+            return self.synced_at is not None and self.synced_at >= since
+        return now - since >= settings.DB_REPLICA_STICKY_SECONDS
+
+    def lag(self, now) -> float:
+        if self.synced_at is None:
+            return 0.0
+        return now - self.synced_at
+
+
+REPLICAS = [Replica(url) for url in settings.DB_REPLICA_URLS]
+
+# User id -> time.monotonic() of their last commit that wrote.
+_last_write = TTLCache(
+    max_size=STICKY_USERS,
+    ttl=max(settings.DB_REPLICA_STICKY_SECONDS, settings.DB_REPLICA_MAX_LAG_SECONDS),
+)
+# Last commit on the primary by anyone, including job workers.
+_last_commit = None
+_turn = count()
+primary_reads = 0
+
+
+def note_write(user_id):
+    """Record that user_id just committed a write."""
+    if user_id is not None and REPLICAS:
+        _last_write.set(user_id, time.monotonic())
+
+
+def note_commit(connection):
+    """Engine "commit" listener for the primary."""
+    global _last_commit
+    _last_commit = time.monotonic()
+
+
+@event.listens_for(Session, "after_commit")
+def _note_session_write(session):
+    # RoutingSession sets "primary" once the session has flushed or run DML.
+    if session.info.get("primary"):
+        note_write(session.info.get("user_id"))
+
+
+def choose(user_id, request_state=None) -> Optional[int]:
+    """Index in REPLICAS of the replica to read user_id's request from, or
+    None for the primary."""
+    global primary_reads
+    now = time.monotonic()
+    since = _last_write.get(user_id)
+    if request_state is not None and getattr(request_state, "response_cache_etag", None):
+        since = _last_commit
+    eligible = [
+        index for index, replica in enumerate(REPLICAS)
+        if replica.usable(now) and replica.caught_up(since, now)
+    ]
+    if not eligible:
+        primary_reads += 1
+        return None
+
+    index = eligible[next(_turn) % len(eligible)]
+    replica = REPLICAS[index]
+    replica.reads += 1
+    if request_state is not None and not replica.caught_up(_last_commit, now):
+        # Read by ResponseCacheMiddleware: don't cache what may be old.
+        request_state.stale_read = True
+    return index
+
+
+# ---------- Synced copies ----------
+
+def _path(url) -> str:
+    return make_url(url).database
+
+
+def sync(replica: Replica):
+    """Overwrite the replica's file with a consistent copy of the primary."""
+    started = time.monotonic()
+    source = sqlite3.connect(_path(settings.DATABASE_URL))
+    target = sqlite3.connect(_path(replica.url))
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    replica.synced_at = started
+    replica.syncs += 1
+
+
+def sync_all():
+    for replica in REPLICAS:
+        try:
+            sync(replica)
+        except Exception:
+            logger.exception("Syncing replica %s failed", replica.url)
+
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _sync_loop():
+    while not _stop.wait(settings.DB_REPLICA_SYNC_SECONDS):
+        sync_all()
+
+
+def start():
+    """Copy the primary to each synced replica, then keep them refreshed."""
+    global _thread
+    if not REPLICAS or not _synced() or _thread is not None:
+        return
+    sync_all()
+    _stop.clear()
+    _thread = threading.Thread(target=_sync_loop, name="replica-sync", daemon=True)
+    _thread.start()
+
+
+def shutdown():
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join()
+        _thread = None
+
+
+def stats() -> list[dict]:
+    now = time.monotonic()
+    return [
+        {"url": replica.url, "reads": replica.reads, "syncs": replica.syncs, "lag_seconds": replica.lag(now)}
+        for replica in REPLICAS
+    ]
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import threading
+from itertools import chain
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.dependencies import get_current_user
+
+# Distinguishes this process's version counters from every other worker's,
+# so an ETag minted elsewhere can never be mistaken for a match here.
+EPOCH = os.urandom(8).hex()
+
+# ETag -> (body, media type) of a 200 response.
+response_cache = TTLCache(
+    max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+not_modified = 0
+
+
+class TableVersions:
+    """Per-table write counters; any cached response built from a table is
+    stale once that table's counter moves."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self, tables) -> tuple:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(self._versions)
+
+
+table_versions = TableVersions()
+
+
+class CachedResponse(Exception):
+    """Raised from the cache dependency to answer before the endpoint runs."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+async def cached_response_handler(request: Request, exc: CachedResponse):
+    return exc.response
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cache_response(*tables, current_user=get_current_user):
+    """Route dependency: answer from the cache, or mark the request so the
+    middleware stores the response. `tables` must cover everything the
+    response (and its access check) reads."""
+
+    def check_response_cache(request: Request, user=Depends(current_user)):
+        global not_modified
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return
+
+        key = (
+            EPOCH,
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            user.userId,
+            user.role,
+            table_versions.snapshot(tables),
+        )
+        etag = '"%s"' % hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            not_modified += 1
+            raise CachedResponse(Response(status_code=304, headers=headers))
+
+        cached = response_cache.get(etag)
+        if cached is not None:
+            body, media_type = cached
+            raise CachedResponse(Response(body, media_type=media_type, headers=headers))
+
+        request.state.response_cache_etag = etag
+
+    return Depends(check_response_cache)
+
+
+class ResponseCacheMiddleware:
+    """Adds the ETag to responses marked by cache_response and stores their body."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        etag = None
+        media_type = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal etag, media_type
+            if message["type"] == "http.response.start":
+                state = scope.get("state", {})
+                etag = state.get("response_cache_etag")
+                # A replica that is behind may have served an old body.
+                if etag and message["status"] == 200 and not state.get("stale_read"):
+                    headers = [
+                        (name, value) for name, value in message.get("headers", [])
+                        if name.lower() not in (b"etag", b"cache-control")
+                    ]
+                    for name, value in headers:
+                        if name.lower() == b"content-type":
+                            media_type = value.decode("latin-1")
+                    headers.append((b"etag", etag.encode()))
+                    headers.append((b"cache-control", b"private, no-cache"))
+                    message = {**message, "headers": headers}
+                else:
+                    etag = None
+            elif message["type"] == "http.response.body" and etag:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_cache.set(etag, (b"".join(chunks), media_type))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def stats() -> dict:
+    return {
+        **response_cache.stats(),
+        "not_modified": not_modified,
+        "table_versions": table_versions.as_dict(),
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+    }
+    if tables:
+        session.info.setdefault("written_tables", set()).update(tables)
+        table_versions.bump(tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_executed_tables(orm_execute_state):
+    # Bulk inserts and rollup upserts go through session.execute, not flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement.table, "name", None)
+        if table:
+            session = orm_execute_state.session
+            session.info.setdefault("written_tables", set()).add(table)
+            table_versions.bump([table])
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    # Bump again at commit: a reader may have cached pre-commit data under
+    # the versions bumped at flush time.
+    table_versions.bump(session.info.pop("written_tables", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("written_tables", None)
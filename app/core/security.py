@@ -1,5 +1,12 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
 from passlib.context import CryptContext
 from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
 from datetime import datetime, timedelta
 from app.core.config import settings
 
@@ -7,7 +14,12 @@ SECRET_KEY = settings.SECRET_KEY
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 ALGORITHM = settings.ALGORITHM
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
 
 def hash_password(password: str):
     return pwd_context.hash(password)
@@ -18,6 +30,147 @@ def hash_password(password: str):
 def verify_password(password, hash):
     return pwd_context.verify(password, hash)
 
+
+def verify_and_rehash(password, hash):
+    """Verify a password; on success also return a new hash if the stored one
+    uses an outdated scheme or work factor, else None."""
+    if not pwd_context.verify(password, hash):
+        return False, None
+    if pwd_context.needs_update(hash):
+        return True, pwd_context.hash(password)
+    return True, None
+
+class JoseSigner:
+    """python-jose: supports every algorithm jose does, including RS*/ES*."""
+
+    def __init__(self, key, algorithm):
+        self.key = key
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, self.key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, self.key, algorithms=[self.algorithm])
+
+
+class PyJWTSigner:
+    """PyJWT backend; errors are re-raised as jose's JWTError."""
+
+    def __init__(self, key, algorithm):
+        try:
+            import jwt as pyjwt
+        except ImportError as exc:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package") from exc
+        self._jwt = pyjwt
+        self.key = key
+        self.algorithm = algorithm
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, self.key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self.key, algorithms=[self.algorithm])
+        except self._jwt.ExpiredSignatureError as exc:
+            raise ExpiredSignatureError(str(exc)) from exc
+        except self._jwt.PyJWTError as exc:
+            raise JWTError(str(exc)) from exc
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _numeric_date(value):
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+class HmacSigner:
+    """HS256/384/512 fast path: stdlib hmac with the keyed state precomputed
+    once, and only the exp/nbf checks the app relies on.
+
+    Tokens are standard compact JWS, interchangeable with JoseSigner's.
+    """
+
+    DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, key, algorithm):
+        self.algorithm = algorithm
+        self._mac = hmac.new(key.encode(), digestmod=self.DIGESTS[algorithm])
+        self._header = _b64encode(json.dumps(
+            {"alg": algorithm, "typ": "JWT"}, separators=(",", ":")
+        ).encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict) -> str:
+        claims = {
+            name: _numeric_date(value) if name in ("exp", "iat", "nbf") else value
+            for name, value in claims.items()
+        }
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict:
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            header_segment, _, payload_segment = signing_input.partition(".")
+            header = json.loads(_b64decode(header_segment))
+            expected = self._sign(signing_input.encode("ascii"))
+            valid = hmac.compare_digest(expected, _b64decode(signature))
+        except (ValueError, TypeError) as exc:
+            raise JWTError("Invalid token") from exc
+
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise JWTError("The specified alg value is not allowed")
+        if not valid:
+            raise JWTError("Signature verification failed.")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as exc:
+            raise JWTError("Invalid payload") from exc
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload")
+
+        now = time.time()
+        for name in ("exp", "nbf"):
+            if name in claims and not isinstance(claims[name], (int, float)):
+                raise JWTClaimsError(f"{name} claim must be a number")
+        if "exp" in claims and claims["exp"] < now:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims and claims["nbf"] > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+        return claims
+
+
+SIGNERS = {"jose": JoseSigner, "pyjwt": PyJWTSigner, "hmac": HmacSigner}
+
+
+def create_signer(algorithm=None, key=None, backend=None):
+    algorithm = algorithm or ALGORITHM
+    backend = backend or settings.JWT_BACKEND
+    if backend == "auto":
+        backend = "hmac" if algorithm in HmacSigner.DIGESTS else "jose"
+    if backend not in SIGNERS:
+        raise ValueError(f"Unknown JWT_BACKEND {backend!r}")
+    return SIGNERS[backend](key or SECRET_KEY, algorithm)
+
+
+signer = create_signer()
+
+
 # def create_access_token(data: dict):
 #     to_encode = data.copy()
 #     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -27,5 +180,10 @@ def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return signer.encode(to_encode)
+
+
+def decode_access_token(token: str) -> dict:
+    return signer.decode(token)
 
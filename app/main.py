@@ -1,8 +1,52 @@
-from fastapi import FastAPI
-from app.routers import auth, projects, tasks, assignees, task_logs, users, time_entries
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core import group_commit, jobs, password_pool, replicas, response_cache
+from app.core.dependencies import get_current_user, principal_cache, token_cache
+from app.core.events import bus
+from app.core.metrics import MetricsMiddleware, TimedJSONResponse, registry
+from app.core.query_budget import QueryBudgetMiddleware, query_budget
+from app.core.migrations import migrate
+from app.core.query_plans import check_query_plans
+from app.routers import auth, events
+from app.utils import analytics, archive
+from app.utils.perimissions import require_role, scope_cache
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Project Tracking System")
+if settings.USE_ASYNC_DB:
+    from app.routers.aio import projects, tasks, assignees, task_logs, users, time_entries, search
+else:
+    from app.routers import projects, tasks, assignees, task_logs, users, time_entries, search
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_MIGRATE_ON_STARTUP:
+        migrate()
+    if settings.DB_CHECK_QUERY_PLANS:
+        check_query_plans()
+    password_pool.start()
+    replicas.start()
+    jobs.start()
+    archive.start()
+    analytics.start()
+    yield
+    analytics.shutdown()
+    archive.shutdown()
+    group_commit.shutdown()
+    jobs.shutdown()
+    replicas.shutdown()
+    password_pool.shutdown()
+
+app = FastAPI(
+    title="Project Tracking System",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
+)
+
+app.add_middleware(response_cache.ResponseCacheMiddleware)
+app.add_exception_handler(response_cache.CachedResponse, response_cache.cached_response_handler)
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,15 +55,67 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+registry.register_cache("principal", principal_cache)
+registry.register_cache("token", token_cache)
+registry.register_cache("access_scope", scope_cache)
+registry.register_cache("response", response_cache.response_cache)
+
+
+@registry.register_collector
+def _runtime_samples():
+    events = bus.stats()
+    yield ("events_published_total", "counter", "Change feed events published.", {}, events["published"])
+    yield ("events_subscribers", "gauge", "Open change feed streams.", {}, events["subscribers"])
+    yield ("events_dropped_subscribers_total", "counter", "Streams cut off for falling behind.",
+           {}, events["dropped_subscribers"])
+    yield ("password_hash_rejected_total", "counter", "Logins/registrations refused with 503.",
+           {}, password_pool.rejected)
+    yield ("jobs_completed_total", "counter", "Background jobs run.", {}, jobs.completed)
+    yield ("jobs_retried_total", "counter", "Background job attempts that failed and were rescheduled.",
+           {}, jobs.retried)
+    yield ("jobs_failed_total", "counter", "Background jobs given up after JOBS_MAX_ATTEMPTS.",
+           {}, jobs.failed)
+    yield ("group_commit_batches_total", "counter", "Writer transactions committed by group commit.",
+           {}, group_commit.batches)
+    yield ("group_commit_writes_total", "counter", "Writes committed through group commit.",
+           {}, group_commit.units)
+    yield ("group_commit_timeouts_total", "counter", "Writes refused with 503 after GROUP_COMMIT_TIMEOUT_SECONDS.",
+           {}, group_commit.timeouts)
+    yield ("replica_primary_reads_total", "counter", "Read-only sessions kept on the primary.",
+           {}, replicas.primary_reads)
+    for index, replica in enumerate(replicas.stats()):
+        yield ("replica_reads_total", "counter", "Read-only sessions served by each replica.",
+               {"replica": index}, replica["reads"])
+        yield ("replica_lag_seconds", "gauge", "Age of each synced replica's copy of the primary.",
+               {"replica": index}, replica["lag_seconds"])
+    yield ("response_cache_not_modified_total", "counter", "Requests answered with 304.",
+           {}, response_cache.not_modified)
 
 @app.get("/", tags=["greet"])
+@query_budget(0)
 def greet():
     return {"Welcome to internal project tracking system"}
 
+@app.get("/metrics", include_in_schema=False)
+@query_budget(0)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats", tags=["greet"])
+@query_budget(1)
+def cache_stats(user=Depends(get_current_user)):
+    require_role(user, ["admin"])
+    return {"responses": response_cache.stats()}
+
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(tasks.router)
 app.include_router(assignees.router)
 app.include_router(task_logs.router)
 app.include_router(users.router)
-app.include_router(time_entries.router)
\ No newline at end of file
+app.include_router(time_entries.router)
+app.include_router(search.router)
+app.include_router(events.router)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class AnalyticsChange(Base):
+    """A time_entries or tasks row that was updated or deleted.
+
+    Appended by triggers (see app.utils.analytics) so the columnar report
+    snapshots can re-read just those keys. seq never repeats, even after
+    old rows are pruned by changedAt.
+    """
+    __tablename__ = "analytics_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    rowKey = Column(Integer, nullable=False)
+    changedAt = Column(DateTime, server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ArchivePartition(Base):
+    """One closed month of time_entries moved to its own table.
+
+    minKey/maxKey bound the primary keys stored in the partition, so lookups
+    by id only probe partitions that can hold it. compactedAt is set once
+    the month's rows have been deleted from the hot table.
+    """
+    __tablename__ = "archive_partitions"
+    __table_args__ = (UniqueConstraint("source", "period"),)
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    period = Column(Date, nullable=False)
+    tableName = Column(String, nullable=False, unique=True)
+    rowCount = Column(Integer, nullable=False, default=0)
+    minKey = Column(Integer)
+    maxKey = Column(Integer)
+    archivedAt = Column(DateTime(timezone=True), server_default=func.now())
+    compactedAt = Column(DateTime(timezone=True))
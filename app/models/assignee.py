@@ -1,8 +1,12 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.core.database import Base
 
 class Assignee(Base):
     __tablename__ = "assignees"
+    __table_args__ = (
+        # The primary key serves user -> tasks; this serves task -> users.
+        Index("ix_assignees_task_user", "taskId", "userId"),
+    )
 
     userId = Column(Integer, ForeignKey("users.userId"), primary_key=True)
     taskId = Column(Integer, ForeignKey("tasks.taskId"), primary_key=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Job(Base):
+    """A side effect queued in the same transaction as the write that
+    caused it (see app.core.jobs). The worker deletes the row when the job
+    has run; failedAt is set once it has used up its attempts."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    runAfter = Column(DateTime, nullable=False, index=True)
+    lastError = Column(String)
+    failedAt = Column(DateTime)
+    createdAt = Column(DateTime, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -10,7 +10,11 @@ class Project(Base):
 
 class ProjectOwner(Base):
     __tablename__ = "project_owners"
-    
+    __table_args__ = (
+        # The primary key serves project -> owners; this serves user -> projects.
+        Index("ix_project_owners_user_project", "userId", "projectId"),
+    )
+
     projectId = Column(Integer, ForeignKey("projects.projectId"), primary_key=True)
     userId = Column(Integer, ForeignKey("users.userId"), primary_key=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 from app.core.enums import TaskStatus
@@ -7,13 +8,15 @@ class Task(Base):
     __tablename__ = "tasks"
 
     taskId = Column(Integer, primary_key=True, index=True)
-    projectId = Column(Integer, ForeignKey("projects.projectId"))
+    projectId = Column(Integer, ForeignKey("projects.projectId"), index=True)
     title = Column(String, nullable=False)
-    description = Column(String)
+    # Unbounded text and a JSON blob: loaded (and decoded) only on access or
+    # when a query undefers or selects them.
+    description = deferred(Column(String))
     # status = Column(String, default="todo")  # todo, ongoing, complete
     status = Column(String, default=TaskStatus.todo)
     priority = Column(String)
-    assets = Column(JSON)
+    assets = deferred(Column(JSON))
     createdBy = Column(Integer, ForeignKey("users.userId"))
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
     dueAt = Column(DateTime)
@@ -6,7 +6,7 @@ class TaskLog(Base):
     __tablename__ = "task_logs"
 
     id = Column(Integer, primary_key=True)
-    taskId = Column(Integer, ForeignKey("tasks.taskId"))
+    taskId = Column(Integer, ForeignKey("tasks.taskId"), index=True)
     userId = Column(Integer, ForeignKey("users.userId"))
     log = Column(String, nullable=False)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
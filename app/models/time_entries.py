@@ -1,13 +1,19 @@
 from sqlalchemy import (
     Column, Integer, ForeignKey, Date, Numeric,
-    Boolean, Text, DateTime, func, String
+    Boolean, Text, DateTime, func, String, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
 from app.core.enums import Billing
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    __table_args__ = (
+        # validate_daily_hours, stats and per-user listings (ordered by workDate)
+        Index("ix_time_entries_user_work_date", "userId", "workDate"),
+        # per-project listings and billing exports
+        Index("ix_time_entries_project_work_date", "projectId", "workDate"),
+    )
 
     timeEntryId = Column(Integer, primary_key=True, index=True)
     userId = Column(Integer, ForeignKey("users.userId"), nullable=False)
@@ -18,5 +24,6 @@ class TimeEntry(Base):
     billable = Column(String, default=Billing.non_billable)
     workDate = Column(Date, nullable=False)
 
-    note = Column(Text)
+    # Free text, only needed when an entry is returned; see ENTRY_FIELDS.
+    note = deferred(Column(Text))
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
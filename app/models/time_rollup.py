@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.core.database import Base
+
+class TimeRollupDaily(Base):
+    """Per-day totals of time_entries, maintained alongside every entry write.
+
+    Hours are stored as integer hundredths so incremental updates stay exact.
+    The key leads with (userId, workDate) so the daily-limit check and the
+    per-user stats are primary-key range lookups.
+    """
+    __tablename__ = "time_rollups_daily"
+
+    userId = Column(Integer, ForeignKey("users.userId"), primary_key=True)
+    workDate = Column(Date, primary_key=True)
+    projectId = Column(Integer, ForeignKey("projects.projectId"), primary_key=True)
+    billable = Column(String, primary_key=True)
+    centiHours = Column(Integer, nullable=False, default=0)
+    entryCount = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.core.async_database import get_async_db
+from app.core.async_dependencies import get_access_scope, get_current_user
+from app.core.config import settings
+from app.core.response_cache import cache_response
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.models.project import Project, ProjectOwner
+from app.schemas.pagination import Page
+from app.schemas.project import ProjectCreate, ProjectOut
+from app.utils.pagination import paginate
+from app.utils.perimissions import require_role
+from app.utils.rows import model_columns, page_response
+
+
+router = APIRouter(prefix="/projects", tags=["Projects"])
+
+PROJECT_KEY = (Project.projectId,)
+PROJECT_COLUMNS = model_columns(ProjectOut, Project)
+# Listing reads the projects plus the ownerships and assignments that scope it.
+PROJECT_TABLES = ("projects", "project_owners", "tasks", "assignees")
+
+async def _project_page(db, query, cursor, limit):
+    return page_response(await db.execute(paginate(query, PROJECT_KEY, cursor, limit)), PROJECT_KEY, limit)
+
+@router.post("", response_model=ProjectOut)
+@query_budget(3)
+async def create_project(
+    data: ProjectCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    require_role(user, ["admin", "manager"])
+
+    project = Project(name=data.name)
+    db.add(project)
+    await db.flush()
+
+    db.add(ProjectOwner(projectId=project.projectId, userId=user.userId))
+    await db.commit()
+
+    return project
+
+@router.get(
+    "",
+    response_model=Page[ProjectOut],
+    dependencies=[cache_response(*PROJECT_TABLES, current_user=get_current_user)],
+)
+@query_budget(3)
+@read_only
+async def get_projects(
+    db: AsyncSession = Depends(get_async_db),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+):
+    if scope.is_admin:
+        return await _project_page(db, select(*PROJECT_COLUMNS), cursor, limit)
+
+    # Projects where user is owner or has assigned tasks
+    query = select(*PROJECT_COLUMNS).where(Project.projectId.in_(scope.visible_projects))
+    return await _project_page(db, query, cursor, limit)
+
+@router.get(
+    "/accessible",
+    response_model=Page[ProjectOut],
+    dependencies=[cache_response(*PROJECT_TABLES, current_user=get_current_user)],
+)
+@query_budget(3)
+@read_only
+async def get_accessible_projects(
+    db: AsyncSession = Depends(get_async_db),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+):
+    if scope.is_admin:
+        return await _project_page(db, select(*PROJECT_COLUMNS), cursor, limit)
+
+    # Projects where user is owner or has assigned tasks
+    query = select(*PROJECT_COLUMNS).where(Project.projectId.in_(scope.visible_projects))
+    return await _project_page(db, query, cursor, limit)
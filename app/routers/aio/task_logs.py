@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+
+from app.core.async_database import get_async_db
+from app.core.async_dependencies import get_access_scope, get_current_user
+from app.core.config import settings
+from app.core.response_cache import cache_response
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.models.task_log import TaskLog
+from app.models.task import Task
+from app.schemas.pagination import Page
+from app.schemas.task_log import TaskLogOut
+from app.utils import audit
+from app.utils.pagination import paginate
+from app.utils.rows import model_columns, page_response
+
+router = APIRouter(tags=["Task Logs"])
+
+@router.get(
+    "/tasks/{task_id}/logs",
+    response_model=Page[TaskLogOut],
+    dependencies=[cache_response("task_logs", "tasks", "assignees", current_user=get_current_user)],
+)
+@query_budget(3)
+@read_only
+async def get_task_logs(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    since: Optional[datetime] = Query(None, description="Only logs created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs created at or before this time"),
+):
+    # An assignment implies the task exists; everyone else needs the 404 check.
+    if task_id not in scope.assigned_tasks:
+        if not await db.scalar(select(Task.taskId).where(Task.taskId == task_id)):
+            raise HTTPException(404, "Task not found")
+
+        if not scope.can_view_task(task_id):
+            raise HTTPException(403, "Not authorized")
+
+    key = (TaskLog.id,)
+    query = select(*model_columns(TaskLogOut, TaskLog)).where(TaskLog.taskId == task_id)
+    if since:
+        query = query.where(TaskLog.createdAt >= audit.stored_time(since))
+    if until:
+        query = query.where(TaskLog.createdAt <= audit.stored_time(until))
+    return page_response(await db.execute(paginate(query, key, cursor, limit)), key, limit)
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.core.async_database import get_async_db
+from app.core.async_dependencies import get_access_scope, get_current_user
+from app.core.config import settings
+from app.core.events import bus
+from app.core import group_commit
+from app.core.response_cache import cache_response
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.models.task import Task
+from app.schemas.pagination import Page
+from app.schemas.task import TaskBulkCreate, TaskCreate, TaskDetailOut, TaskOut
+from app.utils import audit, writes
+from app.utils.pagination import paginate
+from app.utils.rows import field_columns, page_response
+
+router = APIRouter(tags=["Tasks"])
+
+@router.post("/projects/{project_id}/tasks", response_model=TaskOut)
+@query_budget(5)
+async def create_task(
+    project_id: int,
+    data: TaskCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+):
+    if not scope.can_manage_project(project_id):
+        raise HTTPException(403, "Not project owner")
+
+    task = Task(
+        projectId=project_id,
+        title=data.title,
+        description=data.description,
+        priority=data.priority,
+        dueAt=data.dueAt,
+        assets=data.assets,
+        createdBy=user.userId,
+    )
+
+    db.add(task)
+    await db.flush()
+
+    audit.log_task(db, task.taskId, user.userId, "Task created")
+    await db.commit()
+    await db.refresh(task)
+
+    bus.publish("task.created", project_id, taskId=task.taskId, title=task.title, actorId=user.userId)
+    return task
+
+@router.post("/projects/{project_id}/tasks/bulk", response_model=list[TaskOut])
+@query_budget(4)
+async def create_tasks_bulk(
+    project_id: int,
+    data: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+):
+    """Create many tasks, and queue their "Task created" logs, in one transaction."""
+    if len(data.tasks) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_ITEMS} tasks per batch")
+
+    if not scope.can_manage_project(project_id):
+        raise HTTPException(403, "Not project owner")
+
+    # Sorted on taskId for the request order; see the sync router.
+    tasks = (await db.execute(
+        insert(Task).returning(Task.taskId, Task.title, Task.status, Task.priority),
+        [
+            {
+                "projectId": project_id,
+                "title": item.title,
+                "description": item.description,
+                "priority": item.priority,
+                "dueAt": item.dueAt,
+                "assets": item.assets,
+                "createdBy": user.userId,
+            }
+            for item in data.tasks
+        ],
+    )).all()
+    tasks.sort(key=lambda task: task.taskId)
+
+    audit.log_tasks(db, [(task.taskId, user.userId, "Task created") for task in tasks])
+    await db.commit()
+
+    for task in tasks:
+        bus.publish("task.created", project_id, taskId=task.taskId, title=task.title, actorId=user.userId)
+    return tasks
+
+@router.patch("/tasks/{task_id}/status")
+@query_budget(4)
+async def update_task_status(
+    task_id: int,
+    status: str,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    old_status, project_id = await group_commit.run_async(
+        db, lambda session: writes.change_task_status(session, task_id, status, user.userId),
+    )
+
+    bus.publish(
+        "task.status", project_id,
+        taskId=task_id, previous=old_status, status=status, actorId=user.userId,
+    )
+    return {"message": "Status updated"}
+
+@router.get(
+    "/projects/{project_id}/tasks",
+    response_model=Page[TaskOut],
+    dependencies=[cache_response("tasks", "project_owners", current_user=get_current_user)],
+)
+@query_budget(3)
+@read_only
+async def get_tasks_by_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TaskDetailOut fields, instead of TaskOut's"),
+):
+    if not scope.can_manage_project(project_id):
+        raise HTTPException(403, "Not authorized")
+
+    key = (Task.taskId,)
+    columns = field_columns(fields, TaskDetailOut, Task, default=TaskOut, always=key)
+    query = select(*columns).where(Task.projectId == project_id)
+    return page_response(await db.execute(paginate(query, key, cursor, limit)), key, limit)
@@ -0,0 +1,409 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from typing import Literal, Optional
+from datetime import date
+
+from app.core.async_dependencies import get_access_scope, get_current_user
+from app.core.async_database import get_async_db
+from app.core.config import settings
+from app.core import group_commit
+from app.core.enums import Billing
+from app.core.metrics import TimedJSONResponse
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.schemas.pagination import Page
+from app.schemas.time_entries import (
+    DueDateReport,
+    TimeEntryBulkCreate,
+    TimeEntryBulkResult,
+    TimeEntryCreate,
+    TimeEntryResponse,
+    UtilizationReport,
+)
+from app.utils.exports import EXPORT_FORMATS, iter_project_entries
+from app.utils.rows import field_columns, model_columns, page_response
+from app.utils import analytics, archive, rollups, writes
+from app.utils.writes import DAILY_HOUR_LIMIT, DAILY_LIMIT_EXCEEDED, ENTRY_FIELDS
+from app.models.time_entries import TimeEntry
+from app.models.user import User
+
+
+router = APIRouter(prefix="/time_entries", tags=["Billing"])
+
+ENTRY_KEY = (TimeEntry.workDate, TimeEntry.timeEntryId)
+
+
+async def validate_daily_hours(db, user_id, work_date, new_hours, exclude_entry=None):
+    total = await db.scalar(rollups.daily_hours_query(user_id, work_date))
+    writes.check_daily_hours(total, user_id, work_date, new_hours, exclude_entry)
+
+
+async def _apply_rollup(db, entry, sign=1):
+    for statement in rollups.entry_statements(entry, sign):
+        await db.execute(statement)
+
+
+ARCHIVED = "Time entries in archived months are read-only"
+
+
+def _entries_query(columns, cursor, limit, start_date=None, end_date=None, **filters):
+    """A page of entries, newest first, from the hot table and any archived
+    months the date range reaches."""
+    def where(t):
+        return [getattr(t, name) == value for name, value in filters.items() if value]
+
+    return archive.tiered_select(
+        "time_entries", columns, where, start_date, end_date,
+        key=ENTRY_KEY, cursor=cursor, limit=limit, descending=True,
+    )
+
+
+@router.post("/time-entries", response_model=TimeEntryResponse)
+@query_budget(5)
+async def create_time_entry(
+    payload: TimeEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    archive.require_open("time_entries", payload.workDate)
+    return await group_commit.run_async(
+        db, lambda session: writes.create_time_entry(session, current_user.userId, payload),
+    )
+
+
+@router.post("/time-entries/bulk", response_model=TimeEntryBulkResult)
+@query_budget(5)
+async def bulk_create_time_entries(
+    payload: TimeEntryBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Import a batch of time entries in one transaction.
+    The daily limit is checked for every (user, date) group with a single
+    aggregate query; rows that fail are reported by index and skipped.
+    """
+    if len(payload.entries) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_ITEMS} entries per batch")
+
+    can_import_for_others = current_user.role in ["admin", "manager"]
+    errors = []
+    candidates = []
+    for index, item in enumerate(payload.entries):
+        user_id = item.userId or current_user.userId
+        if user_id != current_user.userId and not can_import_for_others:
+            errors.append({"index": index, "detail": "Not authorized to add time for this user"})
+            continue
+        if not archive.is_open("time_entries", item.workDate):
+            errors.append({"index": index, "detail": ARCHIVED})
+            continue
+        candidates.append((index, user_id, item))
+
+    user_ids = {user_id for _, user_id, _ in candidates}
+    if user_ids - {current_user.userId}:
+        known = set(await db.scalars(select(User.userId).where(User.userId.in_(user_ids))))
+    else:
+        known = user_ids
+
+    totals = {}
+    if candidates:
+        work_dates = [item.workDate for _, _, item in candidates]
+        query = rollups.daily_hours_by_user_query(user_ids, min(work_dates), max(work_dates))
+        totals = {(row.userId, row.workDate): row.centiHours for row in await db.execute(query)}
+
+    rows = []
+    limit = DAILY_HOUR_LIMIT * 100
+    for index, user_id, item in candidates:
+        if user_id not in known:
+            errors.append({"index": index, "detail": "User not found"})
+            continue
+
+        key = (user_id, item.workDate)
+        hours = rollups.to_centi_hours(item.hours)
+        if totals.get(key, 0) + hours > limit:
+            errors.append({"index": index, "detail": DAILY_LIMIT_EXCEEDED})
+            continue
+
+        totals[key] = totals.get(key, 0) + hours
+        rows.append({**item.model_dump(exclude={"userId"}), "userId": user_id})
+
+    if rows:
+        await db.execute(insert(TimeEntry), rows)
+        await db.run_sync(rollups.apply_rows, rows)
+        await db.commit()
+
+    errors.sort(key=lambda error: error["index"])
+    return {"inserted": len(rows), "errors": errors}
+
+
+# IMPORTANT: More specific routes must come BEFORE generic routes
+@router.get("/time-entries/stats/summary")
+@query_budget(2)
+@read_only
+async def get_time_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """Get summary statistics for the current user's time entries."""
+    query = rollups.stats_query(current_user.userId, start_date, end_date)
+    return rollups.stats_response((await db.execute(query)).one())
+
+
+@router.get("/time-entries/reports/utilization", response_model=UtilizationReport)
+@query_budget(2)
+@read_only
+async def get_utilization_report(
+    scope=Depends(get_access_scope),
+    group_by: Literal["user", "project"] = "user",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+):
+    """
+    Hours, billable hours and billable ratio per user or project per week.
+    Answered from the in-memory analytics snapshot, which trails writes by
+    up to ANALYTICS_REFRESH_SECONDS (see as_of).
+    """
+    analytics.require_access(scope, project_id)
+    report = analytics.utilization(analytics.snapshot(), group_by, start_date, end_date, project_id, user_id)
+    return TimedJSONResponse(report)
+
+
+@router.get("/time-entries/reports/due-dates", response_model=DueDateReport)
+@query_budget(2)
+@read_only
+async def get_due_date_report(
+    scope=Depends(get_access_scope),
+    project_id: Optional[int] = None,
+    overdue_only: bool = False,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+):
+    """
+    Hours logged against tasks that have a due date, and how much of it came
+    after the due date, most late hours first. Answered from the analytics
+    snapshot (see as_of).
+    """
+    analytics.require_access(scope, project_id)
+    report = analytics.due_dates(analytics.snapshot(), date.today(), project_id, overdue_only, limit)
+    return TimedJSONResponse(report)
+
+
+@router.get("/time-entries/user/{user_id}", response_model=Page[TimeEntryResponse])
+@query_budget(2)
+@read_only
+async def get_user_time_entries(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+    project_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
+):
+    """
+    Get time entries for a specific user.
+    Only admins and managers can view other users' time entries.
+    """
+    if current_user.role not in ["admin", "manager"] and current_user.userId != user_id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to view this user's time entries"
+        )
+
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(
+        columns, cursor, limit, start_date, end_date, userId=user_id, projectId=project_id,
+    )
+    return page_response(await db.execute(query), ENTRY_KEY, limit)
+
+
+def require_project_entries_access(scope, project_id):
+    if scope.role not in ["admin", "manager"]:
+        # Check if user is project owner
+        if project_id not in scope.owned_projects:
+            raise HTTPException(
+                status_code=403,
+                detail="Not authorized to view this project's time entries"
+            )
+
+
+@router.get("/time-entries/project/{project_id}/export")
+@query_budget(3)
+@read_only
+async def export_project_time_entries(
+    project_id: int,
+    scope=Depends(get_access_scope),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    billable: Optional[Billing] = None,
+):
+    """
+    Stream all time entries for a project as NDJSON or CSV, oldest first.
+    The export reads through a sync server-side cursor; StreamingResponse
+    pulls each chunk on the threadpool, so the event loop never blocks.
+    """
+    require_project_entries_access(scope, project_id)
+
+    media_type, encode = EXPORT_FORMATS[format]
+    batches = iter_project_entries(project_id, start_date, end_date, billable)
+    filename = f"project-{project_id}-time-entries.{format}"
+
+    return StreamingResponse(
+        encode(batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/time-entries/project/{project_id}", response_model=Page[TimeEntryResponse])
+@query_budget(3)
+@read_only
+async def get_project_time_entries(
+    project_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    scope=Depends(get_access_scope),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
+):
+    """
+    Get all time entries for a specific project.
+    Only admins, managers, and project owners can view.
+    """
+    require_project_entries_access(scope, project_id)
+
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(columns, cursor, limit, start_date, end_date, projectId=project_id)
+    return page_response(await db.execute(query), ENTRY_KEY, limit)
+
+
+@router.get("/time-entries", response_model=Page[TimeEntryResponse])
+@query_budget(2)
+@read_only
+async def get_time_entries(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+    project_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
+):
+    """
+    Get time entries for the current user.
+    Optionally filter by project_id, start_date, and end_date.
+    Entries are paged newest first; pass next_cursor back as cursor.
+    """
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(
+        columns, cursor, limit, start_date, end_date,
+        userId=current_user.userId, projectId=project_id,
+    )
+    return page_response(await db.execute(query), ENTRY_KEY, limit)
+
+
+async def _get_own_entry(db, entry_id, current_user, action):
+    entry = await db.get(TimeEntry, entry_id)
+
+    if not entry:
+        # 409 for an entry that has moved to an archived month.
+        lookup = archive.lookup_select("time_entries", (TimeEntry.timeEntryId,), entry_id)
+        if lookup is not None and (await db.execute(lookup)).first():
+            raise HTTPException(409, ARCHIVED)
+        raise HTTPException(status_code=404, detail="Time entry not found")
+
+    if entry.userId != current_user.userId:
+        raise HTTPException(
+            status_code=403,
+            detail=f"Not authorized to {action} this time entry"
+        )
+
+    archive.require_open("time_entries", entry.workDate)
+    return entry
+
+
+@router.get("/time-entries/{entry_id}", response_model=TimeEntryResponse)
+@query_budget(2)
+@read_only
+async def get_time_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Get a specific time entry by ID."""
+    # Entries whose id falls in an archived month's range may live there.
+    lookup = archive.lookup_select("time_entries", model_columns(TimeEntryResponse, TimeEntry), entry_id)
+    if lookup is not None:
+        entry = (await db.execute(lookup)).first()
+    else:
+        entry = await db.get(TimeEntry, entry_id, options=[undefer(TimeEntry.note)])
+
+    if not entry:
+        raise HTTPException(status_code=404, detail="Time entry not found")
+
+    # Users can only view their own entries unless admin/manager
+    if current_user.role not in ["admin", "manager"] and entry.userId != current_user.userId:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to view this time entry"
+        )
+
+    return entry
+
+
+@router.patch("/time-entries/{entry_id}", response_model=TimeEntryResponse)
+@query_budget(8)
+async def update_time_entry(
+    entry_id: int,
+    payload: TimeEntryCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Update a time entry. Users can only update their own entries."""
+    entry = await _get_own_entry(db, entry_id, current_user, "update")
+    archive.require_open("time_entries", payload.workDate)
+
+    await validate_daily_hours(
+        db=db,
+        user_id=current_user.userId,
+        work_date=payload.workDate,
+        new_hours=payload.hours,
+        exclude_entry=entry
+    )
+
+    await _apply_rollup(db, entry, -1)
+    for key, value in payload.model_dump().items():
+        setattr(entry, key, value)
+    await _apply_rollup(db, entry)
+
+    await db.commit()
+    await db.refresh(entry, ENTRY_FIELDS)
+    return entry
+
+
+@router.delete("/time-entries/{entry_id}")
+@query_budget(5)
+async def delete_time_entry(
+    entry_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Delete a time entry. Users can only delete their own entries."""
+    entry = await _get_own_entry(db, entry_id, current_user, "delete")
+
+    await _apply_rollup(db, entry, -1)
+    await db.delete(entry)
+    await db.commit()
+    return {"message": "Time entry deleted successfully"}
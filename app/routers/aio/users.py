@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.core.async_database import get_async_db
+from app.core.async_dependencies import get_current_user
+from app.core.config import settings
+from app.core.response_cache import cache_response
+from app.utils.perimissions import require_role
+from app.models.user import User
+from app.schemas.pagination import Page
+from app.schemas.user import UserOut
+from app.utils.pagination import paginate
+from app.utils.rows import model_columns, page_response
+from app.core.enums import Role
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+
+router = APIRouter(prefix="/users", tags=["Users"])
+
+@router.get(
+    "",
+    response_model=Page[UserOut],
+    dependencies=[cache_response("users", current_user=get_current_user)],
+)
+@query_budget(2)
+@read_only
+async def get_all_users(
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+):
+    require_role(current_user, [Role.admin, Role.manager])
+
+    key = (User.userId,)
+    query = select(*model_columns(UserOut, User))
+    return page_response(await db.execute(paginate(query, key, cursor, limit)), key, limit)
+
+@router.get("/me", response_model=UserOut)
+@query_budget(1)
+@read_only
+async def get_me(current_user: UserOut = Depends(get_current_user)):
+    return current_user
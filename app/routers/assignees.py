@@ -1,33 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_access_scope, get_current_user
+from app.core.events import bus
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
 from app.models.assignee import Assignee
-from app.models.project import ProjectOwner
 from app.models.task import Task
-from app.models.task_log import TaskLog
 from app.models.user import User
+from app.schemas.assignee import AssigneeBulkCreate, AssigneeBulkResult
+from app.schemas.task import AssignedTaskOut, TaskDetailOut
+from app.schemas.user import UserOut
+from app.utils import audit
+from app.utils.perimissions import invalidate_scope
+from app.utils.rows import field_columns, model_columns, rows_response
 
 router = APIRouter(tags=["Assignees"])
 
 @router.post("/tasks/{task_id}/assignees/{user_id}")
+@query_budget(6)
 def assign_user(
     task_id: int,
     user_id: int,
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
 ):
     task = db.query(Task).filter(Task.taskId == task_id).first()
     if not task:
         raise HTTPException(404, "Task not found")
 
-    is_owner = db.query(ProjectOwner).filter(
-        ProjectOwner.projectId == task.projectId,
-        ProjectOwner.userId == user.userId,
-    ).first()
-
-    if user.role != "admin" and not is_owner:
+    if not scope.can_manage_project(task.projectId):
         raise HTTPException(403, "Not authorized")
 
     exists = db.query(Assignee).filter(
@@ -41,17 +49,66 @@ def assign_user(
     assignee = Assignee(taskId=task_id, userId=user_id)
     db.add(assignee)
 
-    db.add(TaskLog(
-        taskId=task_id,
-        userId=user.userId,
-        log=f"User {user_id} assigned to task",
-    ))
+    project_id = task.projectId
+    audit.log_task(db, task_id, user.userId, f"User {user_id} assigned to task")
 
     db.commit()
+    bus.publish("task.assigned", project_id, taskId=task_id, userId=user_id, actorId=user.userId)
     return {"message": "User assigned"}
 
 
+@router.post("/tasks/assignees/bulk", response_model=AssigneeBulkResult)
+@query_budget(6)
+def assign_users_bulk(
+    data: AssigneeBulkCreate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+):
+    """Assign every user in userIds to every task in taskIds in one transaction."""
+    task_ids = set(data.taskIds)
+    user_ids = set(data.userIds)
+    if len(task_ids) * len(user_ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_ITEMS} assignments per batch")
+
+    tasks = db.query(Task.taskId, Task.projectId).filter(Task.taskId.in_(task_ids)).all()
+    missing = task_ids - {task.taskId for task in tasks}
+    if missing:
+        raise HTTPException(404, f"Tasks not found: {sorted(missing)}")
+
+    if not all(scope.can_manage_project(task.projectId) for task in tasks):
+        raise HTTPException(403, "Not authorized")
+
+    existing = {
+        (row.taskId, row.userId)
+        for row in db.query(Assignee.taskId, Assignee.userId).filter(
+            Assignee.taskId.in_(task_ids),
+            Assignee.userId.in_(user_ids),
+        )
+    }
+    pairs = [
+        (task_id, user_id)
+        for task_id in sorted(task_ids)
+        for user_id in sorted(user_ids)
+        if (task_id, user_id) not in existing
+    ]
+
+    if pairs:
+        db.execute(insert(Assignee), [{"taskId": t, "userId": u} for t, u in pairs])
+        audit.log_tasks(db, [(t, user.userId, f"User {u} assigned to task") for t, u in pairs])
+        db.commit()
+        # Core inserts bypass the session's flush hooks.
+        invalidate_scope(*{u for _, u in pairs})
+
+        project_of = {task.taskId: task.projectId for task in tasks}
+        for t, u in pairs:
+            bus.publish("task.assigned", project_of[t], taskId=t, userId=u, actorId=user.userId)
+
+    return {"assigned": len(pairs), "skipped": len(existing)}
+
+
 @router.delete("/tasks/{task_id}/assignees/{user_id}")
+@query_budget(5)
 def unassign_user(
     task_id: int,
     user_id: int,
@@ -66,42 +123,54 @@ def unassign_user(
     if not assignee:
         raise HTTPException(404, "Assignment not found")
 
+    project_id = db.query(Task.projectId).filter(Task.taskId == task_id).scalar()
     db.delete(assignee)
 
-    db.add(TaskLog(
-        taskId=task_id,
-        userId=user.userId,
-        log=f"User {user_id} unassigned from task",
-    ))
+    audit.log_task(db, task_id, user.userId, f"User {user_id} unassigned from task")
 
     db.commit()
+    bus.publish("task.unassigned", project_id, taskId=task_id, userId=user_id, actorId=user.userId)
     return {"message": "User unassigned"}
 
-@router.get("/projects/{project_id}/assignees")
+@router.get("/projects/{project_id}/assignees", response_model=list[UserOut])
+@query_budget(3)
+@read_only
 def get_project_assignees(
     project_id: int,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
 ):
+    """Users assigned to any task in the project, once each."""
+    if not scope.is_admin and project_id not in scope.visible_projects:
+        raise HTTPException(403, "Not authorized")
+
     assignees = (
-        db.query(User)
+        db.query(*model_columns(UserOut, User))
         .join(Assignee, Assignee.userId == User.userId)
-        .filter(Assignee.taskId == project_id)  # ✅ fixed capitalization
+        .join(Task, Task.taskId == Assignee.taskId)
+        .filter(Task.projectId == project_id)
+        .distinct()
+        .order_by(User.userId)
         .all()
     )
 
-    return assignees
+    return rows_response(assignees)
 
-@router.get("/users/my/assigned-tasks")
+@router.get("/users/my/assigned-tasks", response_model=list[AssignedTaskOut])
+@query_budget(2)
+@read_only
 def get_user_assigned_tasks(
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
+    fields: Optional[str] = Query(None, description="Comma-separated TaskDetailOut fields, instead of AssignedTaskOut's"),
 ):
+    columns = field_columns(fields, TaskDetailOut, Task, default=AssignedTaskOut)
     tasks = (
-        db.query(Task)
+        db.query(*columns)
         .join(Assignee, Assignee.taskId == Task.taskId)
         .filter(Assignee.userId == user.userId)
+        .order_by(Task.taskId)
         .all()
     )
 
-    return tasks
\ No newline at end of file
+    return rows_response(tasks)
\ No newline at end of file
@@ -3,17 +3,16 @@ from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.database import get_db
-from app.core.security import (
-    hash_password,
-    verify_password,
-    create_access_token,
-)
+from app.core.password_pool import hash_password, verify_and_rehash
+from app.core.security import create_access_token
+from app.core.query_budget import query_budget
 from app.models.user import User
 from app.schemas.auth import UserCreate, Token, UserLogIn
 
 router = APIRouter(tags=["Auth"])
 
 @router.post("/auth/register", response_model=Token)
+@query_budget(3)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
     existing_user =  db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -56,15 +55,28 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/auth/login", response_model=Token)
+# The lookup, plus the UPDATE when the stored hash is rehashed.
+@query_budget(2)
 def login(
     form_data: UserLogIn,
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.email == form_data.email).first()
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # if not user or not verify_password(form_data.password, user.password_hash):
+    #     raise HTTPException(status_code=401, detail="Invalid credentials")
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    valid, new_hash = verify_and_rehash(form_data.password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS: upgrade it in place.
+        user.password_hash = new_hash
+        db.commit()
+
     # token = create_access_token({"sub": user.userId})
     token = create_access_token({"sub": str(user.userId)})
 
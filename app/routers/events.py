@@ -0,0 +1,88 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.dependencies import authenticate, oauth2_scheme
+from app.core.events import bus
+from app.core.query_budget import query_budget
+from app.utils.perimissions import AccessScope, resolve_scope
+
+router = APIRouter(tags=["Events"])
+
+
+def _format(event) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _stream(request: Request, subscriber, replay):
+    try:
+        if replay is None:
+            # Resume point fell out of the history: the client must refetch.
+            yield "event: reset\ndata: {}\n\n"
+            replay = []
+
+        last_id = 0
+        for event in replay:
+            last_id = event["id"]
+            yield _format(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.EVENT_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+
+            if event is None:
+                yield "event: dropped\ndata: {}\n\n"
+                break
+            if event["id"] <= last_id:
+                continue  # already sent as part of the replay
+            last_id = event["id"]
+            yield _format(event)
+    finally:
+        bus.unsubscribe(subscriber)
+
+
+def _access_scope(token: str) -> AccessScope:
+    # Not Depends(get_access_scope): a yielding get_db is only closed after
+    # the response, so every open stream would hold a reader connection.
+    with SessionLocal() as db:
+        return resolve_scope(db, authenticate(db, token))
+
+
+@router.get("/projects/{project_id}/events")
+@query_budget(2)
+async def stream_project_events(
+    project_id: int,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    last_event_id: Optional[int] = Query(None),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events for task creation, status changes and (un)assignments
+    in a project. Reconnect with Last-Event-ID (or ?last_event_id=) to resume.
+    """
+    scope = await run_in_threadpool(_access_scope, token)
+    if not scope.is_admin and project_id not in scope.visible_projects:
+        raise HTTPException(403, "Not authorized")
+
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    subscriber, replay = bus.subscribe(project_id, resume_from)
+
+    return StreamingResponse(
+        _stream(request, subscriber, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
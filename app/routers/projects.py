@@ -1,18 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 
+from app.core.config import settings
+from app.core.response_cache import cache_response
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_access_scope, get_current_user
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
 from app.models.project import Project, ProjectOwner
+from app.schemas.pagination import Page
 from app.schemas.project import ProjectCreate, ProjectOut
+from app.utils.pagination import paginate
 from app.utils.perimissions import require_role
-from app.models.task import Task
-from app.models.assignee import Assignee
+from app.utils.rows import model_columns, page_response
 
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+PROJECT_KEY = (Project.projectId,)
+PROJECT_COLUMNS = model_columns(ProjectOut, Project)
+# Listing reads the projects plus the ownerships and assignments that scope it.
+PROJECT_TABLES = ("projects", "project_owners", "tasks", "assignees")
+
 @router.post("", response_model=ProjectOut)
+@query_budget(4)
 def create_project(
     data: ProjectCreate,
     db: Session = Depends(get_db),
@@ -22,8 +34,7 @@ def create_project(
 
     project = Project(name=data.name)
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    db.flush()
 
     owner = ProjectOwner(projectId=project.projectId, userId=user.userId)
     db.add(owner)
@@ -46,52 +57,47 @@ def create_project(
 #         .all()
 #     )
 
-@router.get("", response_model=list[ProjectOut])
+@router.get(
+    "",
+    response_model=Page[ProjectOut],
+    dependencies=[cache_response(*PROJECT_TABLES)],
+)
+@query_budget(3)
+@read_only
 def get_projects(
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
 ):
-    if user.role == "admin":
-        return db.query(Project).all()
+    if scope.is_admin:
+        projects = paginate(db.query(*PROJECT_COLUMNS), PROJECT_KEY, cursor, limit).all()
+        return page_response(projects, PROJECT_KEY, limit)
 
-    # Get projects where user is owner
-    owned_projects = (
-        db.query(Project)
-        .join(ProjectOwner)
-        .filter(ProjectOwner.userId == user.userId)
-    )
-    
-    # Get projects where user has assigned tasks
-    assigned_projects = (
-        db.query(Project)
-        .join(Task, Task.projectId == Project.projectId)
-        .join(Assignee, Assignee.taskId == Task.taskId)
-        .filter(Assignee.userId == user.userId)
-    )
-    
-    # Union both queries and remove duplicates
-    all_projects = owned_projects.union(assigned_projects).all()
-    
-    return all_projects
+    # Owned projects plus projects where the user has assigned tasks
+    query = db.query(*PROJECT_COLUMNS).filter(Project.projectId.in_(scope.visible_projects))
+    all_projects = paginate(query, PROJECT_KEY, cursor, limit).all()
 
-@router.get("/accessible", response_model=list[ProjectOut])
+    return page_response(all_projects, PROJECT_KEY, limit)
+
+@router.get(
+    "/accessible",
+    response_model=Page[ProjectOut],
+    dependencies=[cache_response(*PROJECT_TABLES)],
+)
+@query_budget(3)
+@read_only
 def get_accessible_projects(
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
 ):
-    if user.role == "admin":
-        return db.query(Project).all()
+    if scope.is_admin:
+        projects = paginate(db.query(*PROJECT_COLUMNS), PROJECT_KEY, cursor, limit).all()
+        return page_response(projects, PROJECT_KEY, limit)
 
     # Projects where user is owner or has assigned tasks
-    return (
-        db.query(Project)
-        .outerjoin(ProjectOwner, ProjectOwner.projectId == Project.projectId)
-        .outerjoin(Task, Task.projectId == Project.projectId)
-        .outerjoin(Assignee, Assignee.taskId == Task.taskId)
-        .filter(
-            (ProjectOwner.userId == user.userId) | 
-            (Assignee.userId == user.userId)
-        )
-        .distinct()
-        .all()
-    )
\ No newline at end of file
+    query = db.query(*PROJECT_COLUMNS).filter(Project.projectId.in_(scope.visible_projects))
+    projects = paginate(query, PROJECT_KEY, cursor, limit).all()
+    return page_response(projects, PROJECT_KEY, limit)
\ No newline at end of file
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.config import settings
+from app.core.response_cache import cache_response
+from app.core.database import get_db
+from app.core.dependencies import get_access_scope
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.schemas.task import TaskSearchHit
+from app.schemas.task_log import TaskLogSearchHit
+from app.utils.rows import rows_response
+from app.utils.search import task_log_search_query, task_search_query
+
+router = APIRouter(tags=["Search"])
+
+@router.get(
+    "/search/tasks",
+    response_model=list[TaskSearchHit],
+    dependencies=[cache_response("tasks", "project_owners", "assignees")],
+)
+@query_budget(3)
+@read_only
+def search_tasks(
+    q: str = Query(..., min_length=1, description='Words to match; end a word with * to match it as a prefix'),
+    project_id: Optional[int] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    scope=Depends(get_access_scope),
+):
+    """Tasks of owned projects and assigned tasks whose title or description
+    matches, best match first."""
+    return rows_response(db.execute(task_search_query(q, scope, project_id, limit)))
+
+@router.get(
+    "/search/task-logs",
+    response_model=list[TaskLogSearchHit],
+    dependencies=[cache_response("task_logs", "tasks", "assignees")],
+)
+@query_budget(3)
+@read_only
+def search_task_logs(
+    q: str = Query(..., min_length=1, description='Words to match; end a word with * to match it as a prefix'),
+    task_id: Optional[int] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    scope=Depends(get_access_scope),
+):
+    """Log entries of assigned tasks (all tasks for admins) that match, best match first."""
+    return rows_response(db.execute(task_log_search_query(q, scope, task_id, limit)))
@@ -1,30 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
 
+from app.core.config import settings
+from app.core.response_cache import cache_response
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_access_scope
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
 from app.models.task_log import TaskLog
-from app.models.assignee import Assignee
 from app.models.task import Task
+from app.schemas.pagination import Page
+from app.schemas.task_log import TaskLogOut
+from app.utils import audit
+from app.utils.pagination import paginate
+from app.utils.rows import model_columns, page_response
 
 router = APIRouter(tags=["Task Logs"])
 
-@router.get("/tasks/{task_id}/logs")
+@router.get(
+    "/tasks/{task_id}/logs",
+    response_model=Page[TaskLogOut],
+    dependencies=[cache_response("task_logs", "tasks", "assignees")],
+)
+@query_budget(3)
+@read_only
 def get_task_logs(
     task_id: int,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    since: Optional[datetime] = Query(None, description="Only logs created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only logs created at or before this time"),
 ):
-    task = db.query(Task).filter(Task.taskId == task_id).first()
-    if not task:
-        raise HTTPException(404, "Task not found")
+    # An assignment implies the task exists; everyone else needs the 404 check.
+    if task_id not in scope.assigned_tasks:
+        task = db.query(Task.taskId).filter(Task.taskId == task_id).first()
+        if not task:
+            raise HTTPException(404, "Task not found")
 
-    is_assignee = db.query(Assignee).filter(
-        Assignee.taskId == task_id,
-        Assignee.userId == user.userId,
-    ).first()
+        if not scope.can_view_task(task_id):
+            raise HTTPException(403, "Not authorized")
 
-    if user.role != "admin" and not is_assignee:
-        raise HTTPException(403, "Not authorized")
-
-    return db.query(TaskLog).filter(TaskLog.taskId == task_id).all()
+    key = (TaskLog.id,)
+    query = db.query(*model_columns(TaskLogOut, TaskLog)).filter(TaskLog.taskId == task_id)
+    if since:
+        query = query.filter(TaskLog.createdAt >= audit.stored_time(since))
+    if until:
+        query = query.filter(TaskLog.createdAt <= audit.stored_time(until))
+    logs = paginate(query, key, cursor, limit).all()
+    return page_response(logs, key, limit)
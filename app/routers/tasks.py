@@ -1,32 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from typing import Optional
 
+from app.core.config import settings
+from app.core.response_cache import cache_response
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_access_scope, get_current_user
+from app.core.events import bus
+from app.core import group_commit
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
 from app.models.task import Task
-from app.models.project import ProjectOwner
-from app.models.task_log import TaskLog
-from app.schemas.task import TaskCreate, TaskOut
+from app.schemas.pagination import Page
+from app.schemas.task import TaskBulkCreate, TaskCreate, TaskDetailOut, TaskOut
+from app.utils import audit, writes
+from app.utils.pagination import paginate
+from app.utils.rows import field_columns, page_response
 
 router = APIRouter(tags=["Tasks"])
 
 @router.post("/projects/{project_id}/tasks", response_model=TaskOut)
+@query_budget(5)
 def create_task(
     project_id: int,
     data: TaskCreate,
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
 ):
-    is_owner = (
-        db.query(ProjectOwner)
-        .filter(
-            ProjectOwner.projectId == project_id,
-            ProjectOwner.userId == user.userId,
-        )
-        .first()
-    )
-
-    if not is_owner and user.role != "admin":
+    if not scope.can_manage_project(project_id):
         raise HTTPException(403, "Not project owner")
 
     task = Task(
@@ -40,63 +43,97 @@ def create_task(
     )
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    db.flush()
 
-    log = TaskLog(
-        taskId=task.taskId,
-        userId=user.userId,
-        log="Task created",
-    )
-    db.add(log)
+    audit.log_task(db, task.taskId, user.userId, "Task created")
     db.commit()
 
+    bus.publish("task.created", project_id, taskId=task.taskId, title=task.title, actorId=user.userId)
     return task
 
+@router.post("/projects/{project_id}/tasks/bulk", response_model=list[TaskOut])
+@query_budget(4)
+def create_tasks_bulk(
+    project_id: int,
+    data: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+):
+    """Create many tasks, and queue their "Task created" logs, in one transaction."""
+    if len(data.tasks) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_ITEMS} tasks per batch")
+
+    if not scope.can_manage_project(project_id):
+        raise HTTPException(403, "Not project owner")
+
+    # sort_by_parameter_order makes SQLite fall back to one INSERT per row.
+    # One multi-row INSERT under the write lock hands out ascending rowids in
+    # VALUES order, so sorting on taskId restores the request order.
+    tasks = db.execute(
+        insert(Task).returning(Task.taskId, Task.title, Task.status, Task.priority),
+        [
+            {
+                "projectId": project_id,
+                "title": item.title,
+                "description": item.description,
+                "priority": item.priority,
+                "dueAt": item.dueAt,
+                "assets": item.assets,
+                "createdBy": user.userId,
+            }
+            for item in data.tasks
+        ],
+    ).all()
+    tasks.sort(key=lambda task: task.taskId)
+
+    audit.log_tasks(db, [(task.taskId, user.userId, "Task created") for task in tasks])
+    db.commit()
+
+    for task in tasks:
+        bus.publish("task.created", project_id, taskId=task.taskId, title=task.title, actorId=user.userId)
+    return tasks
+
 @router.patch("/tasks/{task_id}/status")
+@query_budget(4)
 def update_task_status(
     task_id: int,
     status: str,
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    task = db.query(Task).filter(Task.taskId == task_id).first()
-    if not task:
-        raise HTTPException(404, "Task not found")
-
-    old_status = task.status
-    task.status = status
-
-    log = TaskLog(
-        taskId=task_id,
-        userId=user.userId,
-        log=f"Status changed from {old_status} → {status}",
+    old_status, project_id = group_commit.run(
+        db, lambda session: writes.change_task_status(session, task_id, status, user.userId),
     )
 
-    db.add(log)
-    db.commit()
-
+    bus.publish(
+        "task.status", project_id,
+        taskId=task_id, previous=old_status, status=status, actorId=user.userId,
+    )
     return {"message": "Status updated"}
 
 #added
-@router.get("/projects/{project_id}/tasks", response_model=list[TaskOut])
+@router.get(
+    "/projects/{project_id}/tasks",
+    response_model=Page[TaskOut],
+    dependencies=[cache_response("tasks", "project_owners")],
+)
+@query_budget(3)
+@read_only
 def get_tasks_by_project(
     project_id: int,
     db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TaskDetailOut fields, instead of TaskOut's"),
 ):
     # Optional: access check (owner or admin)
-    is_owner = (
-        db.query(ProjectOwner)
-        .filter(
-            ProjectOwner.projectId == project_id,
-            ProjectOwner.userId == user.userId,
-        )
-        .first()
-    )
-
-    if not is_owner and user.role != "admin":
+    if not scope.can_manage_project(project_id):
         raise HTTPException(403, "Not authorized")
 
-    tasks = db.query(Task).filter(Task.projectId == project_id).all()
-    return tasks
+    key = (Task.taskId,)
+    columns = field_columns(fields, TaskDetailOut, Task, default=TaskOut, always=key)
+    query = db.query(*columns).filter(Task.projectId == project_id)
+    tasks = paginate(query, key, cursor, limit).all()
+    return page_response(tasks, key, limit)
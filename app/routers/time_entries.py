@@ -45,62 +45,142 @@
 #     db.refresh(entry)
 #     return entry
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, undefer
+from typing import Literal, Optional
 from datetime import date
 
-from app.core.dependencies import get_current_user
+from app.core.config import settings
+from app.core.dependencies import get_access_scope, get_current_user
 from app.core.database import get_db
-from app.schemas.time_entries import TimeEntryCreate, TimeEntryResponse
+from app.core import group_commit
+from app.core.enums import Billing
+from app.core.metrics import TimedJSONResponse
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
+from app.schemas.pagination import Page
+from app.schemas.time_entries import (
+    DueDateReport,
+    TimeEntryBulkCreate,
+    TimeEntryBulkResult,
+    TimeEntryCreate,
+    TimeEntryResponse,
+    UtilizationReport,
+)
+from app.utils.exports import EXPORT_FORMATS, iter_project_entries
+from app.utils.rows import field_columns, model_columns, page_response
+from app.utils import analytics, archive, rollups, writes
+from app.utils.writes import DAILY_HOUR_LIMIT, DAILY_LIMIT_EXCEEDED, ENTRY_FIELDS, validate_daily_hours
 from app.models.time_entries import TimeEntry
 from app.models.user import User
-from sqlalchemy import func
+from sqlalchemy import insert
 
 
 router = APIRouter(prefix="/time_entries", tags=["Billing"])
 
-def validate_daily_hours(db, user_id, work_date, new_hours, exclude_entry_id=None):
-    query = db.query(func.coalesce(func.sum(TimeEntry.hours), 0)).filter(
-        TimeEntry.userId == user_id,
-        TimeEntry.workDate == work_date
+# Newest first; timeEntryId breaks ties within a day.
+ENTRY_KEY = (TimeEntry.workDate, TimeEntry.timeEntryId)
+ARCHIVED = "Time entries in archived months are read-only"
+
+def _entries_query(columns, cursor, limit, start_date=None, end_date=None, **filters):
+    """A page of entries, newest first, from the hot table and any archived
+    months the date range reaches."""
+    def where(t):
+        return [getattr(t, name) == value for name, value in filters.items() if value]
+
+    return archive.tiered_select(
+        "time_entries", columns, where, start_date, end_date,
+        key=ENTRY_KEY, cursor=cursor, limit=limit, descending=True,
     )
-    
-    if exclude_entry_id:
-        query = query.filter(TimeEntry.id != exclude_entry_id)
-    
-    total = query.scalar()
-    
-    if total + new_hours > 8:
-        raise HTTPException(403, "Daily limit exceeded. Maximum 8 hours per day.")
 
+def _missing_entry(db, entry_id):
+    """404, or 409 for an entry that has moved to an archived month."""
+    lookup = archive.lookup_select("time_entries", (TimeEntry.timeEntryId,), entry_id)
+    if lookup is not None and db.execute(lookup).first():
+        return HTTPException(409, ARCHIVED)
+    return HTTPException(status_code=404, detail="Time entry not found")
 
 @router.post("/time-entries", response_model=TimeEntryResponse)
+@query_budget(5)
 def create_time_entry(
     payload: TimeEntryCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    validate_daily_hours(
-        db=db,
-        user_id=current_user.userId,
-        work_date=payload.workDate,
-        new_hours=payload.hours,
-    )
+    archive.require_open("time_entries", payload.workDate)
+    return group_commit.run(db, lambda session: writes.create_time_entry(session, current_user.userId, payload))
 
-    entry = TimeEntry(
-        userId=current_user.userId,
-        **payload.model_dump()
-    )
 
-    db.add(entry)
-    db.commit()
-    db.refresh(entry)
-    return entry
+@router.post("/time-entries/bulk", response_model=TimeEntryBulkResult)
+@query_budget(5)
+def bulk_create_time_entries(
+    payload: TimeEntryBulkCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """
+    Import a batch of time entries in one transaction.
+    The daily limit is checked for every (user, date) group with a single
+    aggregate query; rows that fail are reported by index and skipped.
+    """
+    if len(payload.entries) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(413, f"At most {settings.BULK_MAX_ITEMS} entries per batch")
+
+    can_import_for_others = current_user.role in ["admin", "manager"]
+    errors = []
+    candidates = []
+    for index, item in enumerate(payload.entries):
+        user_id = item.userId or current_user.userId
+        if user_id != current_user.userId and not can_import_for_others:
+            errors.append({"index": index, "detail": "Not authorized to add time for this user"})
+            continue
+        if not archive.is_open("time_entries", item.workDate):
+            errors.append({"index": index, "detail": ARCHIVED})
+            continue
+        candidates.append((index, user_id, item))
+
+    user_ids = {user_id for _, user_id, _ in candidates}
+    if user_ids - {current_user.userId}:
+        known = {row.userId for row in db.query(User.userId).filter(User.userId.in_(user_ids))}
+    else:
+        known = user_ids
+
+    totals = {}
+    if candidates:
+        work_dates = [item.workDate for _, _, item in candidates]
+        query = rollups.daily_hours_by_user_query(user_ids, min(work_dates), max(work_dates))
+        totals = {(row.userId, row.workDate): row.centiHours for row in db.execute(query)}
+
+    rows = []
+    limit = DAILY_HOUR_LIMIT * 100
+    for index, user_id, item in candidates:
+        if user_id not in known:
+            errors.append({"index": index, "detail": "User not found"})
+            continue
+
+        key = (user_id, item.workDate)
+        hours = rollups.to_centi_hours(item.hours)
+        if totals.get(key, 0) + hours > limit:
+            errors.append({"index": index, "detail": DAILY_LIMIT_EXCEEDED})
+            continue
+
+        totals[key] = totals.get(key, 0) + hours
+        rows.append({**item.model_dump(exclude={"userId"}), "userId": user_id})
+
+    if rows:
+        db.execute(insert(TimeEntry), rows)
+        rollups.apply_rows(db, rows)
+        db.commit()
+
+    errors.sort(key=lambda error: error["index"])
+    return {"inserted": len(rows), "errors": errors}
 
 
 # IMPORTANT: More specific routes must come BEFORE generic routes
 @router.get("/time-entries/stats/summary")
+@query_budget(2)
+@read_only
 def get_time_stats(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
@@ -108,31 +188,53 @@ def get_time_stats(
     end_date: Optional[date] = None,
 ):
     """Get summary statistics for the current user's time entries."""
-    query = db.query(
-        func.sum(TimeEntry.hours).label("total_hours"),
-        func.sum(
-            func.case((TimeEntry.billable == "billable", TimeEntry.hours), else_=0)
-        ).label("billable_hours"),
-        func.count(TimeEntry.id).label("entry_count"),
-    ).filter(TimeEntry.userId == current_user.userId)
-    
-    if start_date:
-        query = query.filter(TimeEntry.workDate >= start_date)
-    
-    if end_date:
-        query = query.filter(TimeEntry.workDate <= end_date)
-    
-    result = query.first()
-    
-    return {
-        "total_hours": float(result.total_hours or 0),
-        "billable_hours": float(result.billable_hours or 0),
-        "non_billable_hours": float((result.total_hours or 0) - (result.billable_hours or 0)),
-        "entry_count": result.entry_count or 0,
-    }
+    query = rollups.stats_query(current_user.userId, start_date, end_date)
+    return rollups.stats_response(db.execute(query).one())
+
+
+@router.get("/time-entries/reports/utilization", response_model=UtilizationReport)
+@query_budget(2)
+@read_only
+def get_utilization_report(
+    scope=Depends(get_access_scope),
+    group_by: Literal["user", "project"] = "user",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    project_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+):
+    """
+    Hours, billable hours and billable ratio per user or project per week.
+    Answered from the in-memory analytics snapshot, which trails writes by
+    up to ANALYTICS_REFRESH_SECONDS (see as_of).
+    """
+    analytics.require_access(scope, project_id)
+    report = analytics.utilization(analytics.snapshot(), group_by, start_date, end_date, project_id, user_id)
+    return TimedJSONResponse(report)
 
 
-@router.get("/time-entries/user/{user_id}", response_model=List[TimeEntryResponse])
+@router.get("/time-entries/reports/due-dates", response_model=DueDateReport)
+@query_budget(2)
+@read_only
+def get_due_date_report(
+    scope=Depends(get_access_scope),
+    project_id: Optional[int] = None,
+    overdue_only: bool = False,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+):
+    """
+    Hours logged against tasks that have a due date, and how much of it came
+    after the due date, most late hours first. Answered from the analytics
+    snapshot (see as_of).
+    """
+    analytics.require_access(scope, project_id)
+    report = analytics.due_dates(analytics.snapshot(), date.today(), project_id, overdue_only, limit)
+    return TimedJSONResponse(report)
+
+
+@router.get("/time-entries/user/{user_id}", response_model=Page[TimeEntryResponse])
+@query_budget(2)
+@read_only
 def get_user_time_entries(
     user_id: int,
     db: Session = Depends(get_db),
@@ -140,6 +242,9 @@ def get_user_time_entries(
     project_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
 ):
     """
     Get time entries for a specific user.
@@ -152,98 +257,125 @@ def get_user_time_entries(
             detail="Not authorized to view this user's time entries"
         )
     
-    query = db.query(TimeEntry).filter(TimeEntry.userId == user_id)
-    
-    if project_id:
-        query = query.filter(TimeEntry.projectId == project_id)
-    
-    if start_date:
-        query = query.filter(TimeEntry.workDate >= start_date)
-    
-    if end_date:
-        query = query.filter(TimeEntry.workDate <= end_date)
-    
-    entries = query.order_by(TimeEntry.workDate.desc()).all()
-    return entries
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(
+        columns, cursor, limit, start_date, end_date, userId=user_id, projectId=project_id,
+    )
+    entries = db.execute(query).all()
+    return page_response(entries, ENTRY_KEY, limit)
 
 
-@router.get("/time-entries/project/{project_id}", response_model=List[TimeEntryResponse])
+def require_project_entries_access(scope, project_id):
+    if scope.role not in ["admin", "manager"]:
+        # Check if user is project owner
+        if project_id not in scope.owned_projects:
+            raise HTTPException(
+                status_code=403,
+                detail="Not authorized to view this project's time entries"
+            )
+
+
+@router.get("/time-entries/project/{project_id}/export")
+@query_budget(3)
+@read_only
+def export_project_time_entries(
+    project_id: int,
+    scope=Depends(get_access_scope),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    billable: Optional[Billing] = None,
+):
+    """
+    Stream all time entries for a project as NDJSON or CSV, oldest first.
+    Rows are read from a server-side cursor, so memory stays flat
+    regardless of the export size.
+    """
+    require_project_entries_access(scope, project_id)
+
+    media_type, encode = EXPORT_FORMATS[format]
+    batches = iter_project_entries(project_id, start_date, end_date, billable)
+    filename = f"project-{project_id}-time-entries.{format}"
+
+    return StreamingResponse(
+        encode(batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/time-entries/project/{project_id}", response_model=Page[TimeEntryResponse])
+@query_budget(3)
+@read_only
 def get_project_time_entries(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    scope=Depends(get_access_scope),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
 ):
     """
     Get all time entries for a specific project.
     Only admins, managers, and project owners can view.
     """
-    # Check authorization
-    if current_user.role not in ["admin", "manager"]:
-        # Check if user is project owner
-        from app.models.projects import ProjectOwner
-        is_owner = (
-            db.query(ProjectOwner)
-            .filter(
-                ProjectOwner.projectId == project_id,
-                ProjectOwner.userId == current_user.userId
-            )
-            .first()
-        )
-        if not is_owner:
-            raise HTTPException(
-                status_code=403,
-                detail="Not authorized to view this project's time entries"
-            )
-    
-    query = db.query(TimeEntry).filter(TimeEntry.projectId == project_id)
-    
-    if start_date:
-        query = query.filter(TimeEntry.workDate >= start_date)
-    
-    if end_date:
-        query = query.filter(TimeEntry.workDate <= end_date)
+    require_project_entries_access(scope, project_id)
     
-    entries = query.order_by(TimeEntry.workDate.desc()).all()
-    return entries
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(columns, cursor, limit, start_date, end_date, projectId=project_id)
+    entries = db.execute(query).all()
+    return page_response(entries, ENTRY_KEY, limit)
 
 
-@router.get("/time-entries", response_model=List[TimeEntryResponse])
+@router.get("/time-entries", response_model=Page[TimeEntryResponse])
+@query_budget(2)
+@read_only
 def get_time_entries(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
     project_id: Optional[int] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated TimeEntryResponse fields to return"),
 ):
     """
     Get time entries for the current user.
     Optionally filter by project_id, start_date, and end_date.
+    Entries are paged newest first; pass next_cursor back as cursor.
     """
-    query = db.query(TimeEntry).filter(TimeEntry.userId == current_user.userId)
-    
-    if project_id:
-        query = query.filter(TimeEntry.projectId == project_id)
-    
-    if start_date:
-        query = query.filter(TimeEntry.workDate >= start_date)
-    
-    if end_date:
-        query = query.filter(TimeEntry.workDate <= end_date)
-    
-    entries = query.order_by(TimeEntry.workDate.desc()).all()
-    return entries
+    columns = field_columns(fields, TimeEntryResponse, TimeEntry, always=ENTRY_KEY)
+    query = _entries_query(
+        columns, cursor, limit, start_date, end_date,
+        userId=current_user.userId, projectId=project_id,
+    )
+    entries = db.execute(query).all()
+    return page_response(entries, ENTRY_KEY, limit)
 
 
 @router.get("/time-entries/{entry_id}", response_model=TimeEntryResponse)
+@query_budget(2)
+@read_only
 def get_time_entry(
     entry_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """Get a specific time entry by ID."""
-    entry = db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
+    # Entries whose id falls in an archived month's range may live there.
+    lookup = archive.lookup_select("time_entries", model_columns(TimeEntryResponse, TimeEntry), entry_id)
+    if lookup is not None:
+        entry = db.execute(lookup).first()
+    else:
+        entry = (
+            db.query(TimeEntry)
+            .options(undefer(TimeEntry.note))
+            .filter(TimeEntry.timeEntryId == entry_id)
+            .first()
+        )
     
     if not entry:
         raise HTTPException(status_code=404, detail="Time entry not found")
@@ -259,6 +391,7 @@ def get_time_entry(
 
 
 @router.patch("/time-entries/{entry_id}", response_model=TimeEntryResponse)
+@query_budget(8)
 def update_time_entry(
     entry_id: int,
     payload: TimeEntryCreate,
@@ -266,10 +399,10 @@ def update_time_entry(
     current_user=Depends(get_current_user),
 ):
     """Update a time entry. Users can only update their own entries."""
-    entry = db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
+    entry = db.query(TimeEntry).filter(TimeEntry.timeEntryId == entry_id).first()
     
     if not entry:
-        raise HTTPException(status_code=404, detail="Time entry not found")
+        raise _missing_entry(db, entry_id)
     
     # Users can only update their own entries
     if entry.userId != current_user.userId:
@@ -278,35 +411,41 @@ def update_time_entry(
             detail="Not authorized to update this time entry"
         )
     
+    archive.require_open("time_entries", entry.workDate)
+    archive.require_open("time_entries", payload.workDate)
+
     # Validate daily hours excluding the current entry
     validate_daily_hours(
         db=db,
         user_id=current_user.userId,
         work_date=payload.workDate,
         new_hours=payload.hours,
-        exclude_entry_id=entry_id
+        exclude_entry=entry
     )
     
-    # Update entry
+    # Update entry, moving its hours between rollup buckets
+    rollups.apply_entry(db, entry, -1)
     for key, value in payload.model_dump().items():
         setattr(entry, key, value)
+    rollups.apply_entry(db, entry)
     
     db.commit()
-    db.refresh(entry)
+    db.refresh(entry, ENTRY_FIELDS)
     return entry
 
 
 @router.delete("/time-entries/{entry_id}")
+@query_budget(5)
 def delete_time_entry(
     entry_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
     """Delete a time entry. Users can only delete their own entries."""
-    entry = db.query(TimeEntry).filter(TimeEntry.id == entry_id).first()
+    entry = db.query(TimeEntry).filter(TimeEntry.timeEntryId == entry_id).first()
     
     if not entry:
-        raise HTTPException(status_code=404, detail="Time entry not found")
+        raise _missing_entry(db, entry_id)
     
     # Users can only delete their own entries
     if entry.userId != current_user.userId:
@@ -315,6 +454,8 @@ def delete_time_entry(
             detail="Not authorized to delete this time entry"
         )
     
+    archive.require_open("time_entries", entry.workDate)
+    rollups.apply_entry(db, entry, -1)
     db.delete(entry)
     db.commit()
     return {"message": "Time entry deleted successfully"}
@@ -1,25 +1,44 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
+from typing import Optional
 
+from app.core.config import settings
+from app.core.response_cache import cache_response
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.utils.perimissions import require_role
 from app.models.user import User
+from app.schemas.pagination import Page
 from app.schemas.user import UserOut
+from app.utils.pagination import paginate
+from app.utils.rows import model_columns, page_response
 from app.core.enums import Role
+from app.core.query_budget import query_budget
+from app.core.replicas import read_only
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.get("", response_model=list[UserOut])
+@router.get(
+    "",
+    response_model=Page[UserOut],
+    dependencies=[cache_response("users")],
+)
+@query_budget(2)
+@read_only
 def get_all_users(
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
 ):
     require_role(current_user, [Role.admin, Role.manager])
 
-    users = db.query(User).all()
-    return users
+    key = (User.userId,)
+    users = paginate(db.query(*model_columns(UserOut, User)), key, cursor, limit).all()
+    return page_response(users, key, limit)
 
 @router.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
+@query_budget(1)
+@read_only
+def get_me(current_user: UserOut = Depends(get_current_user)):
     return current_user
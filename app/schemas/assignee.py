@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class AssigneeBulkCreate(BaseModel):
+    taskIds: List[int] = Field(min_length=1)
+    userIds: List[int] = Field(min_length=1)
+
+
+class AssigneeBulkResult(BaseModel):
+    assigned: int
+    skipped: int
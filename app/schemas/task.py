@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Optional
 from app.core.enums import TaskStatus
@@ -12,6 +12,10 @@ class TaskCreate(BaseModel):
     assets: Optional[List[str]] = []
 
 
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(min_length=1)
+
+
 class TaskOut(BaseModel):
     taskId: int
     title: str
@@ -22,5 +26,28 @@ class TaskOut(BaseModel):
         from_attributes = True
 
 
+class AssignedTaskOut(TaskOut):
+    projectId: int
+    description: Optional[str]
+    dueAt: Optional[datetime]
+
+
+class TaskDetailOut(AssignedTaskOut):
+    """Every task field a fields= parameter may ask for."""
+    assets: Optional[List[str]]
+    createdBy: Optional[int]
+    createdAt: Optional[datetime]
+
+
 class TaskStatusUpdate(BaseModel):
     status: TaskStatus
+
+
+class TaskSearchHit(BaseModel):
+    taskId: int
+    projectId: int
+    title: str
+    status: str
+    priority: Optional[str]
+    score: float
+    snippet: str
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class TaskLogOut(BaseModel):
+    id: int
+    taskId: int
+    userId: Optional[int]
+    log: str
+    createdAt: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaskLogSearchHit(BaseModel):
+    id: int
+    taskId: int
+    userId: Optional[int]
+    createdAt: datetime
+    score: float
+    snippet: str
@@ -2,9 +2,9 @@
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
-from app.core.enums import Billing
+from app.core.enums import Billing, TaskStatus
 
 # ---------- CREATE ----------
 
@@ -17,6 +17,15 @@ class TimeEntryCreate(BaseModel):
     note: Optional[str] = None
 
 
+class TimeEntryBulkItem(TimeEntryCreate):
+    # Admins and managers may import entries on behalf of other users.
+    userId: Optional[int] = None
+
+
+class TimeEntryBulkCreate(BaseModel):
+    entries: List[TimeEntryBulkItem] = Field(min_length=1)
+
+
 # ---------- RESPONSE ----------
 
 class TimeEntryResponse(BaseModel):
@@ -32,3 +41,50 @@ class TimeEntryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TimeEntryBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class TimeEntryBulkResult(BaseModel):
+    inserted: int
+    errors: List[TimeEntryBulkError]
+
+
+# ---------- REPORTS ----------
+
+class UtilizationRow(BaseModel):
+    # One of the two, per group_by.
+    userId: Optional[int] = None
+    projectId: Optional[int] = None
+    week: date  # Monday
+    hours: float
+    billable_hours: float
+    billable_ratio: float
+
+
+class UtilizationReport(BaseModel):
+    as_of: datetime
+    items: List[UtilizationRow]
+
+
+class DueDateRow(BaseModel):
+    taskId: int
+    projectId: int
+    status: Optional[TaskStatus]
+    due_date: date
+    hours: float
+    hours_after_due: float
+    last_work_date: Optional[date]
+    overdue: bool
+
+
+class DueDateReport(BaseModel):
+    as_of: datetime
+    tasks: int
+    overdue_tasks: int
+    hours: float
+    hours_after_due: float
+    items: List[DueDateRow]
@@ -0,0 +1,482 @@
+"""Columnar snapshot of time_entries and tasks for the utilization reports.
+
+Management reports group every entry of a period at once, which as SQL
+would scan time_entries on the database the API writes to. Each process
+instead keeps the columns those reports need as NumPy arrays: int32 ids,
+date ordinals and hours as integer hundredths. The reports group them with
+np.bincount and never query the database.
+
+The snapshot is loaded once, archived months included, and then refreshed
+every ANALYTICS_REFRESH_SECONDS inside one read transaction:
+
+    new rows       keys past the snapshot's watermark, appended in key order
+    changed rows   keys logged in analytics_changes since the last refresh,
+                   re-read and then overwritten, or dropped if gone
+
+Triggers on the columns the snapshot holds fill analytics_changes, so edits
+made through any path are picked up. Log rows older than
+ANALYTICS_CHANGE_RETENTION_SECONDS are pruned. A process that has not
+refreshed for that long reloads from scratch.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from itertools import chain
+from typing import Callable, Optional
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import Integer, case, cast, delete, func, select, text
+
+from app.core.config import settings
+from app.core.database import engine, reader_engine
+from app.core.enums import Billing, TaskStatus
+from app.models.analytics import AnalyticsChange
+from app.models.task import Task
+from app.models.time_entries import TimeEntry
+from app.utils import archive
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TRIGGERS = {
+    "time_entries_analytics_update": """
+        CREATE TRIGGER IF NOT EXISTS time_entries_analytics_update
+        AFTER UPDATE OF "userId", "projectId", "taskId", hours, billable, "workDate" ON time_entries BEGIN
+            INSERT INTO analytics_changes (source, "rowKey") VALUES ('time_entries', old."timeEntryId");
+        END
+    """,
+    "time_entries_analytics_delete": """
+        CREATE TRIGGER IF NOT EXISTS time_entries_analytics_delete AFTER DELETE ON time_entries BEGIN
+            INSERT INTO analytics_changes (source, "rowKey") VALUES ('time_entries', old."timeEntryId");
+        END
+    """,
+    "tasks_analytics_update": """
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_update
+        AFTER UPDATE OF "projectId", status, "dueAt" ON tasks BEGIN
+            INSERT INTO analytics_changes (source, "rowKey") VALUES ('tasks', old."taskId");
+        END
+    """,
+    "tasks_analytics_delete": """
+        CREATE TRIGGER IF NOT EXISTS tasks_analytics_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO analytics_changes (source, "rowKey") VALUES ('tasks', old."taskId");
+        END
+    """,
+}
+
+# julianday() of 0001-01-01 minus one, so julianday(d) - this is date.toordinal().
+_JULIAN_ORDINAL_OFFSET = 1721424.5
+
+# Changed keys re-read per statement; each tier binds them once, well under
+# SQLite's 32766 variables.
+_KEY_BATCH = 5000
+
+STATUSES = list(TaskStatus)
+_STATUS_CODES = {status.value: code for code, status in enumerate(STATUSES)}
+
+
+def create_change_log(connection):
+    for ddl in CHANGE_TRIGGERS.values():
+        connection.execute(text(ddl))
+
+
+def _ordinal(column):
+    return cast(func.julianday(column) - _JULIAN_ORDINAL_OFFSET, Integer)
+
+
+def _entry_rows(where, catalog):
+    # Every entry exactly once, archived months included.
+    entries = archive.tiered_select(
+        "time_entries",
+        (TimeEntry.timeEntryId, TimeEntry.userId, TimeEntry.projectId, TimeEntry.taskId,
+         TimeEntry.workDate, TimeEntry.hours, TimeEntry.billable),
+        where, snapshot=catalog,
+    ).subquery()
+    c = entries.c
+    return select(
+        c.timeEntryId,
+        c.userId,
+        c.projectId,
+        func.coalesce(c.taskId, 0),
+        _ordinal(c.workDate),
+        cast(func.round(c.hours * 100), Integer),
+        case((c.billable == Billing.billable.value, 1), else_=0),
+    )
+
+
+def _task_rows(where, catalog):
+    return select(
+        Task.taskId,
+        func.coalesce(Task.projectId, 0),
+        case(_STATUS_CODES, value=Task.status, else_=-1),
+        func.coalesce(_ordinal(Task.dueAt), 0),
+    ).where(*where(Task))
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    key: str
+    # (name, dtype) of the arrays after the key, in the order rows() selects them.
+    columns: tuple
+    rows: Callable
+
+
+SOURCES = (
+    Source("time_entries", "timeEntryId", (
+        ("user", np.int32), ("project", np.int32), ("task", np.int32),
+        ("day", np.int32), ("centi_hours", np.int32), ("billable", np.int8),
+    ), _entry_rows),
+    Source("tasks", "taskId", (
+        ("project", np.int32), ("status", np.int8), ("due_day", np.int32),
+    ), _task_rows),
+)
+
+
+class ColumnTable:
+    """One source's columns as arrays sorted by key, grown in place.
+
+    A deleted row stays where it is with alive False, so positions never
+    shift between full loads.
+    """
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.size = 0
+        self._arrays = {"key": np.empty(0, np.int32), "alive": np.empty(0, bool)}
+        self._arrays.update((name, np.empty(0, dtype)) for name, dtype in source.columns)
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self._arrays[name][:self.size]
+
+    @property
+    def watermark(self) -> int:
+        return int(self._arrays["key"][self.size - 1]) if self.size else 0
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        capacity = len(self._arrays["key"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        for name, array in self._arrays.items():
+            grown = np.empty(capacity, array.dtype)
+            grown[:self.size] = array[:self.size]
+            self._arrays[name] = grown
+
+    def extend(self, chunk):
+        """Append a chunk whose keys are all past the watermark."""
+        n = len(chunk["key"])
+        self._reserve(n)
+        for name, values in chunk.items():
+            self._arrays[name][self.size:self.size + n] = values
+        self._arrays["alive"][self.size:self.size + n] = True
+        self.size += n
+
+    def _locate(self, keys):
+        positions = np.searchsorted(self["key"], keys)
+        found = positions < self.size
+        found[found] = self["key"][positions[found]] == keys[found]
+        return positions, found
+
+    def upsert(self, chunk):
+        positions, found = self._locate(chunk["key"])
+        for name, values in chunk.items():
+            self._arrays[name][positions[found]] = values[found]
+        self._arrays["alive"][positions[found]] = True
+        if found.all():
+            return
+        # A key below the watermark that was never loaded: rows inserted
+        # with explicit ids. Rare, so just re-sort everything.
+        rest = {name: values[~found] for name, values in chunk.items()}
+        merged = {
+            name: np.concatenate([self[name], rest.get(name, np.ones(len(rest["key"]), bool))])
+            for name in self._arrays
+        }
+        order = np.argsort(merged["key"], kind="stable")
+        self.size = 0
+        self._arrays = {name: values[:0] for name, values in merged.items()}
+        self.extend({name: values[order] for name, values in merged.items() if name != "alive"})
+        self._arrays["alive"][:self.size] = merged["alive"][order]
+
+    def drop(self, keys):
+        positions, found = self._locate(keys)
+        self._arrays["alive"][positions[found]] = False
+
+
+def _chunks(connection, statement, source):
+    """Sorted column chunks of a rows() statement, batch by batch."""
+    result = connection.execution_options(yield_per=settings.ANALYTICS_LOAD_BATCH).execute(statement)
+    width = len(source.columns) + 1
+    for rows in result.partitions():
+        # fromiter over the flattened values: np.array(rows) would probe
+        # every Row for the array protocol first.
+        data = np.fromiter(chain.from_iterable(rows), np.int64, len(rows) * width).reshape(-1, width)
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        chunk = {"key": data[:, 0].astype(np.int32)}
+        for index, (name, dtype) in enumerate(source.columns, start=1):
+            chunk[name] = data[:, index].astype(dtype)
+        yield chunk
+
+
+def _concat(chunks):
+    chunks = list(chunks)
+    if not chunks:
+        return None
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+class Snapshot:
+    """Both sources' ColumnTables, refreshed in place. Reports and refreshes
+    take the lock, so a report never sees half an update."""
+
+    def __init__(self):
+        self.tables = {source.name: ColumnTable(source) for source in SOURCES}
+        self.lock = threading.Lock()
+        self.change_seq = 0
+        self.refreshed_at: Optional[datetime] = None
+
+    def load(self, bind):
+        """Read every row; returns self."""
+        with bind.connect() as connection:
+            connection.exec_driver_sql("BEGIN")  # one read snapshot for every statement
+            catalog = archive.load_catalog(connection)
+            self.change_seq = connection.scalar(select(func.max(AnalyticsChange.seq))) or 0
+            for source in SOURCES:
+                table = self.tables[source.name]
+                # Batches arrive in storage order: hot rows and each archived
+                # month separately, so sort once at the end.
+                chunk = _concat(_chunks(connection, source.rows(lambda t: (), catalog), source))
+                if chunk is not None:
+                    order = np.argsort(chunk["key"], kind="stable")
+                    table.extend({name: values[order] for name, values in chunk.items()})
+        self.refreshed_at = datetime.now(timezone.utc)
+        return self
+
+    def refresh(self, bind):
+        """Apply rows added, updated or deleted since the last load or refresh."""
+        with bind.connect() as connection:
+            connection.exec_driver_sql("BEGIN")
+            catalog = archive.load_catalog(connection)
+            latest = connection.scalar(select(func.max(AnalyticsChange.seq))) or 0
+            changed = {}
+            for source, key in connection.execute(
+                select(AnalyticsChange.source, AnalyticsChange.rowKey)
+                .where(AnalyticsChange.seq > self.change_seq).distinct()
+            ):
+                changed.setdefault(source, set()).add(key)
+
+            updates = []
+            for source in SOURCES:
+                table = self.tables[source.name]
+                watermark = table.watermark
+                added = _concat(_chunks(
+                    connection,
+                    source.rows(lambda t: (getattr(t, source.key) > watermark,), catalog),
+                    source,
+                ))
+                keys = sorted(changed.get(source.name, ()))
+                current = [
+                    chunk
+                    for start in range(0, len(keys), _KEY_BATCH)
+                    for chunk in _chunks(connection, source.rows(
+                        lambda t, batch=keys[start:start + _KEY_BATCH]: (
+                            getattr(t, source.key).in_(batch),
+                        ),
+                        catalog,
+                    ), source)
+                ]
+                updates.append((table, added, np.array(keys, dtype=np.int32), _concat(current)))
+
+        with self.lock:
+            for table, added, keys, current in updates:
+                if added is not None:
+                    table.extend(added)
+                if len(keys):
+                    table.drop(keys)
+                if current is not None:
+                    table.upsert(current)
+            self.change_seq = latest
+            self.refreshed_at = datetime.now(timezone.utc)
+
+
+def prune_changes(connection, now=None):
+    """Delete change log rows no snapshot still needs; returns how many."""
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(seconds=settings.ANALYTICS_CHANGE_RETENTION_SECONDS)
+    return connection.execute(delete(AnalyticsChange).where(AnalyticsChange.changedAt < cutoff)).rowcount
+
+
+# ---------- This process's snapshot ----------
+
+_snapshot: Optional[Snapshot] = None
+_stop = threading.Event()
+_refresher = None
+
+
+def snapshot() -> Snapshot:
+    if _snapshot is None:
+        detail = "Analytics snapshot is loading" if settings.ANALYTICS_ENABLED else "Analytics is disabled"
+        raise HTTPException(
+            status_code=503,
+            detail=detail,
+            headers={"Retry-After": str(settings.ANALYTICS_RETRY_AFTER_SECONDS)},
+        )
+    return _snapshot
+
+
+def refresh(bind=reader_engine) -> Snapshot:
+    """Load the snapshot, or bring it up to date; returns it."""
+    global _snapshot
+    current = _snapshot
+    retention = timedelta(seconds=settings.ANALYTICS_CHANGE_RETENTION_SECONDS)
+    if current is None or datetime.now(timezone.utc) - current.refreshed_at > retention:
+        # The changes since the last refresh may have been pruned already.
+        _snapshot = Snapshot().load(bind)
+    else:
+        current.refresh(bind)
+    return _snapshot
+
+
+def _refresh_loop():
+    wait = 0
+    while not _stop.wait(wait):
+        wait = settings.ANALYTICS_REFRESH_SECONDS
+        try:
+            refresh()
+            with engine.begin() as connection:
+                prune_changes(connection)
+        except Exception:
+            logger.exception("Analytics refresh failed")
+
+
+def start():
+    """Load the snapshot in the background and keep refreshing it; reports
+    answer 503 until the first load is done."""
+    global _refresher
+    if not settings.ANALYTICS_ENABLED or _refresher is not None:
+        return
+    _stop.clear()
+    _refresher = threading.Thread(target=_refresh_loop, name="analytics-refresh", daemon=True)
+    _refresher.start()
+
+
+def shutdown():
+    global _refresher
+    _stop.set()
+    if _refresher is not None:
+        _refresher.join()
+        _refresher = None
+
+
+# ---------- Reports ----------
+
+def require_access(scope, project_id=None):
+    """Admins and managers may report on anything, project owners on their
+    own projects (the project time-entry listing's rule)."""
+    if scope.role in ["admin", "manager"]:
+        return
+    if project_id is None or project_id not in scope.owned_projects:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to view reports for these time entries"
+        )
+
+
+def _ordinal_range(start, end):
+    return (start.toordinal() if start else 0), (end.toordinal() if end else np.iinfo(np.int32).max)
+
+
+def utilization(snap: Snapshot, group_by, start=None, end=None, project_id=None, user_id=None):
+    """Hours and billable hours per user or project per ISO week (Monday)."""
+    entries = snap.tables["time_entries"]
+    first, last = _ordinal_range(start, end)
+    with snap.lock:
+        day = entries["day"]
+        mask = entries["alive"] & (day >= first) & (day <= last)
+        if project_id is not None:
+            mask &= entries["project"] == project_id
+        if user_id is not None:
+            mask &= entries["user"] == user_id
+        ids = entries[group_by][mask].astype(np.int64)
+        # date(1, 1, 1) is a Monday, so (ordinal - 1) // 7 numbers the weeks.
+        weeks = (day[mask].astype(np.int64) - 1) // 7
+        centi = entries["centi_hours"][mask]
+        billable = entries["billable"][mask]
+
+    groups, inverse = np.unique((ids << 32) | weeks, return_inverse=True)
+    total = np.bincount(inverse, weights=centi, minlength=len(groups))
+    billed = np.bincount(inverse, weights=centi * billable, minlength=len(groups))
+    ratio = np.divide(billed, total, out=np.zeros(len(groups)), where=total > 0)
+    field = {"user": "userId", "project": "projectId"}[group_by]
+    items = [
+        {
+            field: group_id,
+            "week": date.fromordinal(week * 7 + 1),
+            "hours": hours / 100,
+            "billable_hours": billable_hours / 100,
+            "billable_ratio": round(share, 4),
+        }
+        for group_id, week, hours, billable_hours, share in zip(
+            (groups >> 32).tolist(), (groups & 0xFFFFFFFF).tolist(),
+            total.tolist(), billed.tolist(), ratio.tolist(),
+        )
+    ]
+    return {"as_of": snap.refreshed_at, "items": items}
+
+
+def due_dates(snap: Snapshot, today, project_id=None, overdue_only=False, limit=50):
+    """Hours logged against tasks that have a due date, with the hours logged
+    after it, worst first."""
+    entries, tasks = snap.tables["time_entries"], snap.tables["tasks"]
+    with snap.lock:
+        has_due = tasks["alive"] & (tasks["due_day"] > 0)
+        if project_id is not None:
+            has_due &= tasks["project"] == project_id
+        task_ids = tasks["key"][has_due]
+        task_project = tasks["project"][has_due]
+        status = tasks["status"][has_due]
+        due = tasks["due_day"][has_due]
+
+        logged = entries["alive"] & (entries["task"] > 0)
+        entry_task = entries["task"][logged]
+        entry_day = entries["day"][logged]
+        centi = entries["centi_hours"][logged]
+
+    position = np.searchsorted(task_ids, entry_task)
+    position[position == len(task_ids)] = 0
+    matched = (task_ids[position] == entry_task) if len(task_ids) else np.zeros(len(entry_task), bool)
+    position, entry_day, centi = position[matched], entry_day[matched], centi[matched]
+
+    hours = np.bincount(position, weights=centi, minlength=len(task_ids))
+    late = entry_day > due[position]
+    hours_late = np.bincount(position[late], weights=centi[late], minlength=len(task_ids))
+    last_day = np.zeros(len(task_ids), np.int32)
+    np.maximum.at(last_day, position, entry_day)
+
+    overdue = (due < today.toordinal()) & (status != _STATUS_CODES[TaskStatus.complete.value])
+    selected = overdue if overdue_only else np.ones(len(task_ids), bool)
+    # Most hours past due first, then the earliest due date.
+    order = np.lexsort((task_ids[selected], due[selected], -hours_late[selected]))
+    rows = np.flatnonzero(selected)[order[:limit]]
+
+    return {
+        "as_of": snap.refreshed_at,
+        "tasks": int(selected.sum()),
+        "overdue_tasks": int((overdue & selected).sum()),
+        "hours": float(hours[selected].sum()) / 100,
+        "hours_after_due": float(hours_late[selected].sum()) / 100,
+        "items": [
+            {
+                "taskId": int(task_ids[i]),
+                "projectId": int(task_project[i]),
+                "status": STATUSES[status[i]].value if status[i] >= 0 else None,
+                "due_date": date.fromordinal(int(due[i])),
+                "hours": float(hours[i]) / 100,
+                "hours_after_due": float(hours_late[i]) / 100,
+                "last_work_date": date.fromordinal(int(last_day[i])) if last_day[i] else None,
+                "overdue": bool(overdue[i]),
+            }
+            for i in rows.tolist()
+        ],
+    }
@@ -0,0 +1,441 @@
+"""Hot/cold storage tiers for time_entries.
+
+Closed months move into per-month archive tables (time_entries_2024_01) that
+have the hot table's columns and indexes. Each one is recorded in
+archive_partitions. The end of the newest archived month is the
+source's boundary. The hot table is only read from the boundary on, and a
+read that reaches further back adds the {source}_archive view over every
+partition, whose arms SQLite prunes by the request's range and filters.
+Archived months are read-only.
+
+Archiving runs in two steps, so that no API process misses a row while its
+catalog snapshot is out of date:
+
+    archive   copy each whole month before a cutoff into its partition and
+              register it; the rows stay in the hot table
+    compact   once every process has refreshed its snapshot
+              (ARCHIVE_COMPACT_GRACE_SECONDS), make each partition match
+              the hot rows of its month and delete those from the hot table
+
+task_logs stay in one table: their full-text index (app.utils.search) only
+covers the hot table, and compacting would drop archived logs from search.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import (
+    Column, Date, Index, MetaData, Table, and_, column, delete, func, insert, select, text, union_all, update,
+)
+
+from app.core.config import settings
+from app.core.database import reader_engine
+from app.models.analytics import AnalyticsChange
+from app.models.archive import ArchivePartition
+from app.models.time_entries import TimeEntry
+from app.utils.pagination import paginate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Source:
+    model: type
+    period_column: str
+    key: str
+    # Column tuples indexed in every partition, mirroring the hot table's.
+    indexes: tuple
+    label: str
+
+    @property
+    def table(self) -> Table:
+        return self.model.__table__
+
+    def bound(self, value):
+        """A month boundary (or a request's date/datetime) as a value of the period column."""
+        if value is None or isinstance(self.table.c[self.period_column].type, Date):
+            return value
+        if not isinstance(value, datetime):
+            return datetime(value.year, value.month, value.day)
+        # Stored timestamps are naive UTC.
+        return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+SOURCES = {
+    "time_entries": Source(
+        TimeEntry, "workDate", "timeEntryId",
+        (("userId", "workDate"), ("projectId", "workDate")),
+        "Time entries",
+    ),
+}
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+@dataclass(frozen=True)
+class Partition:
+    source: str
+    period: date
+    table_name: str
+    row_count: int
+    min_key: Optional[int]
+    max_key: Optional[int]
+    archived_at: datetime
+    compacted_at: Optional[datetime]
+
+    @property
+    def end(self) -> date:
+        return next_month(self.period)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    # Newest month first.
+    partitions: tuple = ()
+
+    def of(self, source) -> tuple:
+        return tuple(p for p in self.partitions if p.source == source)
+
+    def boundary(self, source) -> Optional[date]:
+        """First day the hot table is authoritative for, or None if nothing is archived."""
+        ends = [p.end for p in self.of(source)]
+        return max(ends) if ends else None
+
+
+def load_catalog(bind) -> Catalog:
+    """Read archive_partitions through a Connection or Session."""
+    rows = bind.execute(
+        select(
+            ArchivePartition.source,
+            ArchivePartition.period,
+            ArchivePartition.tableName,
+            ArchivePartition.rowCount,
+            ArchivePartition.minKey,
+            ArchivePartition.maxKey,
+            ArchivePartition.archivedAt,
+            ArchivePartition.compactedAt,
+        ).order_by(ArchivePartition.period.desc())
+    )
+    return Catalog(tuple(Partition(*row) for row in rows))
+
+
+# This process's snapshot. Routers never query the catalog themselves: it is
+# loaded at startup and re-read in the background.
+_catalog = Catalog()
+_stop = threading.Event()
+_refresher = None
+
+
+def catalog() -> Catalog:
+    return _catalog
+
+
+def refresh_catalog(bind=reader_engine) -> Catalog:
+    global _catalog
+    with bind.connect() as connection:
+        _catalog = load_catalog(connection)
+    return _catalog
+
+
+def _refresh_loop():
+    while not _stop.wait(settings.ARCHIVE_CATALOG_REFRESH_SECONDS):
+        try:
+            refresh_catalog()
+        except Exception:
+            logger.exception("Archive catalog refresh failed")
+
+
+def start():
+    """Load the catalog and keep re-reading it every ARCHIVE_CATALOG_REFRESH_SECONDS."""
+    global _refresher
+    refresh_catalog()
+    if _refresher is None:
+        _stop.clear()
+        _refresher = threading.Thread(target=_refresh_loop, name="archive-catalog", daemon=True)
+        _refresher.start()
+
+
+def shutdown():
+    global _refresher
+    _stop.set()
+    if _refresher is not None:
+        _refresher.join()
+        _refresher = None
+
+
+# ---------- Partition tables ----------
+
+archive_metadata = MetaData()
+_tables_lock = threading.Lock()
+
+
+def _table(source, name, indexed) -> Table:
+    with _tables_lock:
+        table = archive_metadata.tables.get(name)
+        if table is None:
+            spec = SOURCES[source]
+            table = Table(name, archive_metadata, *(
+                Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                for column in spec.table.columns
+            ))
+            for columns in spec.indexes if indexed else ():
+                Index(f"ix_{name}_{'_'.join(columns)}", *(table.c[column] for column in columns))
+    return table
+
+
+def partition_table(source, period) -> Table:
+    return _table(source, f"{source}_{period:%Y_%m}", indexed=True)
+
+
+def archive_view(source) -> Table:
+    """{source}_archive: every partition of a source as one UNION ALL view.
+    It is never created through the metadata; see _replace_view."""
+    return _table(source, f"{source}_archive", indexed=False)
+
+
+def _replace_view(connection, source):
+    # Recreated in the transaction that registers a partition, so the view
+    # always covers exactly the catalog's partitions. SQLite allows up to 500
+    # arms in a compound select, some forty years of months.
+    view = archive_view(source).name
+    tables = [p.table_name for p in load_catalog(connection).of(source)]
+    connection.execute(text(f'DROP VIEW IF EXISTS "{view}"'))
+    connection.execute(text(
+        f'CREATE VIEW "{view}" AS ' + " UNION ALL ".join(f'SELECT * FROM "{table}"' for table in tables)
+    ))
+
+
+# ---------- Reads ----------
+
+def _branch(spec, t, lower, upper, columns, where, start, end, key, cursor, limit, descending):
+    """One tier's part of a tiered read; t is the model or the view's columns."""
+    period = getattr(t, spec.period_column)
+    query = select(*(getattr(t, column.key) for column in columns)).where(*where(t))
+    if lower is not None:
+        query = query.where(period >= spec.bound(lower))
+    if upper is not None:
+        query = query.where(period < spec.bound(upper))
+    if start is not None:
+        query = query.where(period >= start)
+    if end is not None:
+        query = query.where(period <= end)
+    if key:
+        table_key = [getattr(t, column.key) for column in key]
+        if limit is not None:
+            query = paginate(query, table_key, cursor, limit, descending)
+        else:
+            query = query.order_by(*(c.desc() if descending else c.asc() for c in table_key))
+    return query
+
+
+def _union(spec, branches, columns, key, limit, descending):
+    if len(branches) == 1:
+        return branches[0]
+
+    # Each branch is read as SELECT <columns> FROM (branch), so it keeps its
+    # own ORDER BY/LIMIT inside the compound, and the columns are named rather
+    # than proxied from every branch. Ordering the compound itself lets SQLite
+    # merge the already ordered branches and stop at the limit.
+    names = [column(c.key, c.type) for c in columns]
+    query = union_all(*(select(*names).select_from(branch.subquery()) for branch in branches))
+    if key:
+        query = query.order_by(*(
+            column(c.key).desc() if descending else column(c.key).asc() for c in key
+        ))
+        if limit is not None:
+            query = query.limit(limit + 1)
+    return query
+
+
+def tiered_select(source, columns, where=lambda t: (), start=None, end=None,
+                  key=(), cursor=None, limit=None, descending=False, snapshot=None):
+    """Select columns (hot model attributes) from the hot table and, when the
+    range reaches before the boundary, from the archive view, as one statement.
+
+    where(t) returns the filters for one tier, t being the model or the
+    view's columns. start and end bound the period column, inclusive. With a
+    key the rows are ordered by it, and keyset-paginated like paginate() when
+    limit is given. The view's arm is cut at this snapshot's boundary, which
+    SQLite pushes into every partition, so only partitions with matching
+    rows in the range are read. With nothing archived this is the plain
+    hot-table query.
+    """
+    spec = SOURCES[source]
+    snapshot = _catalog if snapshot is None else snapshot
+    boundary = snapshot.boundary(source)
+    start, end = spec.bound(start), spec.bound(end)
+    args = (columns, where, start, end, key, cursor, limit, descending)
+
+    branches = []
+    if boundary is None or end is None or end >= spec.bound(boundary):
+        branches.append(_branch(spec, spec.model, boundary, None, *args))
+    if boundary is not None and (start is None or start < spec.bound(boundary)):
+        branches.append(_branch(spec, archive_view(source).c, None, boundary, *args))
+    return _union(spec, branches, columns, key, limit, descending)
+
+
+def lookup_select(source, columns, key_value, snapshot=None):
+    """Select the row with this primary key from the hot table and the
+    archive view, or None when no partition's key range holds it (read the
+    hot table as usual)."""
+    spec = SOURCES[source]
+    snapshot = _catalog if snapshot is None else snapshot
+    if not any(p.row_count and p.min_key <= key_value <= p.max_key for p in snapshot.of(source)):
+        return None
+
+    boundary = snapshot.boundary(source)
+    args = (columns, lambda t: (getattr(t, spec.key) == key_value,), None, None, (), None, None, False)
+    return _union(spec, [
+        _branch(spec, spec.model, boundary, None, *args),
+        _branch(spec, archive_view(source).c, None, boundary, *args),
+    ], columns, (), None, False)
+
+
+def is_open(source, day, snapshot=None) -> bool:
+    boundary = (_catalog if snapshot is None else snapshot).boundary(source)
+    return boundary is None or day >= SOURCES[source].bound(boundary)
+
+
+def require_open(source, day):
+    if not is_open(source, day):
+        spec = SOURCES[source]
+        raise HTTPException(409, f"{spec.label} before {catalog().boundary(source)} are archived and read-only")
+
+
+# ---------- archive / compact ----------
+
+def _in_month(spec, period):
+    column = spec.table.c[spec.period_column]
+    return and_(column >= spec.bound(period), column < spec.bound(next_month(period)))
+
+
+def _hot_months(connection, spec, lower=None, upper=None):
+    """First days of the months that have rows in the hot table in [lower, upper)."""
+    column = spec.table.c[spec.period_column]
+    query = select(func.strftime("%Y-%m-01", column)).distinct()
+    if lower is not None:
+        query = query.where(column >= spec.bound(lower))
+    if upper is not None:
+        query = query.where(column < spec.bound(upper))
+    return {date.fromisoformat(value) for value in connection.scalars(query)}
+
+
+def _partition_stats(connection, spec, table):
+    key = table.c[spec.key]
+    count, low, high = connection.execute(select(func.count(), func.min(key), func.max(key))).one()
+    return {"rowCount": count, "minKey": low, "maxKey": high}
+
+
+def archive(connection, source, before):
+    """Copy every month before `before` that has hot rows past the current
+    boundary into its partition and register it; returns {period: rows}."""
+    spec = SOURCES[source]
+    boundary = load_catalog(connection).boundary(source)
+    columns = [column.name for column in spec.table.columns]
+
+    archived = {}
+    for period in sorted(_hot_months(connection, spec, boundary, month_start(before))):
+        table = partition_table(source, period)
+        table.create(connection, checkfirst=True)
+        connection.execute(
+            insert(table).from_select(columns, select(*spec.table.columns).where(_in_month(spec, period)))
+        )
+        stats = _partition_stats(connection, spec, table)
+        connection.execute(insert(ArchivePartition).values(
+            source=source, period=period, tableName=table.name, **stats,
+        ))
+        archived[period] = stats["rowCount"]
+    if archived:
+        _replace_view(connection, source)
+    return archived
+
+
+def compact(connection, source, grace_seconds=None, now=None):
+    """Move archived months out of the hot table; returns {period: rows deleted}.
+
+    A month archived less than grace_seconds ago is left alone: a process
+    still on an older snapshot reads it from the hot table. Otherwise the
+    partition is made to match the hot rows of its month, which picks up any
+    write made before that process refreshed. Then those rows are deleted
+    from the hot table. Rows that reach an already compacted month later are
+    moved the same way.
+    """
+    spec = SOURCES[source]
+    grace = settings.ARCHIVE_COMPACT_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+    current = load_catalog(connection)
+    boundary = current.boundary(source)
+    if boundary is None:
+        return {}
+
+    partitions = {p.period: p for p in current.of(source)}
+    pending = {period for period, p in partitions.items() if p.compacted_at is None}
+    columns = [column.name for column in spec.table.columns]
+    hot_key = spec.table.c[spec.key]
+
+    # Moving rows is not a change to them: the deletes below are dropped
+    # from the analytics change log again before commit.
+    last_change = connection.scalar(select(func.max(AnalyticsChange.seq))) or 0
+
+    moved = {}
+    for period in sorted(_hot_months(connection, spec, upper=boundary) | pending):
+        p = partitions.get(period)
+        if p is not None and p.compacted_at is None and (now - p.archived_at).total_seconds() < grace:
+            continue
+
+        table = partition_table(source, period)
+        table.create(connection, checkfirst=True)
+        in_month = _in_month(spec, period)
+        if p is not None and p.compacted_at is None:
+            # The partition was copied while the hot rows were still live:
+            # drop what has been deleted since, then take the current rows.
+            connection.execute(delete(table).where(table.c[spec.key].not_in(select(hot_key).where(in_month))))
+        connection.execute(
+            insert(table).prefix_with("OR REPLACE")
+            .from_select(columns, select(*spec.table.columns).where(in_month))
+        )
+        deleted = connection.execute(delete(spec.table).where(in_month)).rowcount
+
+        stats = _partition_stats(connection, spec, table)
+        if p is None:
+            connection.execute(insert(ArchivePartition).values(
+                source=source, period=period, tableName=table.name, compactedAt=now, **stats,
+            ))
+        else:
+            connection.execute(
+                update(ArchivePartition)
+                .where(ArchivePartition.source == source, ArchivePartition.period == period)
+                .values(compactedAt=now, **stats)
+            )
+        moved[period] = deleted
+    if moved:
+        _replace_view(connection, source)
+        connection.execute(delete(AnalyticsChange).where(AnalyticsChange.seq > last_change))
+    return moved
+
+
+def unarchive(connection, table):
+    """Put every archived row of a source that is no longer tiered back into
+    its hot table, then drop its partitions, view and catalog entries."""
+    source = table.name
+    names = connection.scalars(
+        select(ArchivePartition.tableName).where(ArchivePartition.source == source)
+    ).all()
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    for name in names:
+        # Rows archived but not yet compacted are still in the hot table.
+        connection.execute(text(
+            f'INSERT OR IGNORE INTO "{source}" ({columns}) SELECT {columns} FROM "{name}"'
+        ))
+        connection.execute(text(f'DROP TABLE "{name}"'))
+    connection.execute(text(f'DROP VIEW IF EXISTS "{source}_archive"'))
+    connection.execute(delete(ArchivePartition).where(ArchivePartition.source == source))
@@ -0,0 +1,40 @@
+"""Task log entries: "Task created", status changes and assignments.
+
+Routes queue them as jobs (see app.core.jobs) instead of inserting them in
+the request. The worker writes a batch, and the full-text index updates
+that come with it, in one transaction. createdAt is taken when the entry
+is queued, so it records when the change happened, not when it was written.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app.core import jobs
+from app.models.task_log import TaskLog
+
+KIND = "task_log"
+
+
+def stored_time(value: datetime) -> datetime:
+    """A since/until bound as createdAt is stored: naive UTC."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def log_task(db, task_id, user_id, message):
+    log_tasks(db, [(task_id, user_id, message)])
+
+
+def log_tasks(db, entries):
+    """Queue (task_id, user_id, message) entries in db's transaction."""
+    created = datetime.now(timezone.utc).replace(tzinfo=None).isoformat(" ")
+    jobs.enqueue(db, KIND, *(
+        {"taskId": task_id, "userId": user_id, "log": message, "createdAt": created}
+        for task_id, user_id, message in entries
+    ))
+
+
+@jobs.handler(KIND, writes=(TaskLog.__tablename__,))
+def _write_task_logs(connection, payloads):
+    connection.execute(insert(TaskLog), [
+        {**payload, "createdAt": datetime.fromisoformat(payload["createdAt"])} for payload in payloads
+    ])
@@ -0,0 +1,86 @@
+import csv
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import orjson
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.time_entries import TimeEntry
+from app.utils import archive
+
+EXPORT_COLUMNS = (
+    TimeEntry.timeEntryId,
+    TimeEntry.userId,
+    TimeEntry.projectId,
+    TimeEntry.taskId,
+    TimeEntry.hours,
+    TimeEntry.billable,
+    TimeEntry.workDate,
+    TimeEntry.note,
+    TimeEntry.createdAt,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Unserializable value: {value!r}")
+
+
+def iter_project_entries(project_id, start_date=None, end_date=None, billable=None, batch_size=None):
+    """Yield batches of time-entry rows for a project from a server-side cursor.
+
+    Opens its own session: the body is produced after the request's
+    dependencies have been torn down.
+    """
+    def where(t):
+        filters = [t.projectId == project_id]
+        if billable:
+            filters.append(t.billable == billable)
+        return filters
+
+    # Archived months in the range are read from their partitions.
+    query = archive.tiered_select(
+        "time_entries", EXPORT_COLUMNS, where, start_date, end_date,
+        key=(TimeEntry.workDate, TimeEntry.timeEntryId),
+    ).execution_options(yield_per=batch_size or settings.EXPORT_BATCH_SIZE)
+
+    db = SessionLocal()
+    try:
+        yield from db.execute(query).partitions()
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches):
+    for rows in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default) + b"\n"
+            for row in rows
+        )
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only, for an empty export.
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_chunks),
+    "csv": ("text/csv", csv_chunks),
+}
@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _coerce(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def paginate(query, columns, cursor=None, limit=50, descending=False):
+    """Apply keyset filtering, ordering and limit to a Query or Select.
+
+    ``columns`` must end in a unique column so the ordering is total. One extra
+    row is fetched so ``build_page`` can tell whether another page exists.
+    """
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < values if descending else key > values)
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def build_page(rows, columns, limit):
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+
+    return {"items": rows, "next_cursor": next_cursor}
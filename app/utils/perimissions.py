@@ -1,6 +1,125 @@
+from dataclasses import dataclass
+from itertools import chain
+
 from fastapi import HTTPException
+from sqlalchemy import event, literal, null, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.enums import Role
+from app.models.assignee import Assignee
+from app.models.project import ProjectOwner
+from app.models.task import Task
 
 def require_role(user, roles: list[Role]):
     if user.role not in roles:
         raise HTTPException(status_code=403, detail="Forbidden")
+
+
+# user id -> (owned projects, assigned tasks, projects of assigned tasks).
+# Only memberships are cached; the role always comes from the live principal.
+scope_cache = TTLCache(
+    max_size=settings.ACCESS_SCOPE_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_SCOPE_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class AccessScope:
+    user_id: int
+    role: str
+    owned_projects: frozenset = frozenset()
+    assigned_tasks: frozenset = frozenset()
+    assigned_projects: frozenset = frozenset()
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == Role.admin
+
+    @property
+    def visible_projects(self) -> frozenset:
+        return self.owned_projects | self.assigned_projects
+
+    def can_manage_project(self, project_id: int) -> bool:
+        return self.is_admin or project_id in self.owned_projects
+
+    def can_view_task(self, task_id: int) -> bool:
+        return self.is_admin or task_id in self.assigned_tasks
+
+
+def scope_query(user_id: int):
+    """Owned projects and assigned tasks (with their project) in one statement."""
+    owned = select(
+        literal("owner").label("kind"),
+        ProjectOwner.projectId.label("projectId"),
+        null().label("taskId"),
+    ).where(ProjectOwner.userId == user_id)
+    assigned = (
+        select(literal("assignee"), Task.projectId, Assignee.taskId)
+        .join(Task, Task.taskId == Assignee.taskId)
+        .where(Assignee.userId == user_id)
+    )
+    return union_all(owned, assigned)
+
+
+def _memberships(rows):
+    owned, tasks, projects = set(), set(), set()
+    for kind, project_id, task_id in rows:
+        if kind == "owner":
+            owned.add(project_id)
+        else:
+            tasks.add(task_id)
+            projects.add(project_id)
+    return frozenset(owned), frozenset(tasks), frozenset(projects)
+
+
+def resolve_scope(db, user) -> AccessScope:
+    if user.role == Role.admin:
+        return AccessScope(user.userId, user.role)
+
+    memberships = scope_cache.get(user.userId)
+    if memberships is None:
+        memberships = _memberships(db.execute(scope_query(user.userId)))
+        scope_cache.set(user.userId, memberships)
+    return AccessScope(user.userId, user.role, *memberships)
+
+
+async def resolve_scope_async(db, user) -> AccessScope:
+    if user.role == Role.admin:
+        return AccessScope(user.userId, user.role)
+
+    memberships = scope_cache.get(user.userId)
+    if memberships is None:
+        memberships = _memberships(await db.execute(scope_query(user.userId)))
+        scope_cache.set(user.userId, memberships)
+    return AccessScope(user.userId, user.role, *memberships)
+
+
+def invalidate_scope(*user_ids):
+    for user_id in user_ids:
+        scope_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_scope_changes(session, flush_context):
+    changed = {
+        obj.userId
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, (ProjectOwner, Assignee))
+    }
+    if changed:
+        session.info.setdefault("scope_changes", set()).update(changed)
+        invalidate_scope(*changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_scopes(session):
+    # Again after commit: a concurrent request may have re-cached the old
+    # memberships between our flush and commit.
+    invalidate_scope(*session.info.pop("scope_changes", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_scope_changes(session):
+    session.info.pop("scope_changes", None)
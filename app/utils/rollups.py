@@ -0,0 +1,208 @@
+"""Incremental daily/weekly/monthly rollups of time_entries."""
+from decimal import Decimal
+
+from sqlalchemy import case, delete, func, insert, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.enums import Billing
+from app.models.time_entries import TimeEntry
+from app.models.time_rollup import TimeRollupDaily
+from app.utils import archive
+
+ROLLUP_KEY = ("userId", "workDate", "projectId", "billable")
+
+ROLLUP_VIEWS = {
+    "time_rollups_weekly": """
+        CREATE VIEW IF NOT EXISTS time_rollups_weekly AS
+        SELECT "userId", "projectId", billable,
+               date("workDate", '-6 days', 'weekday 1') AS "weekStart",
+               SUM("centiHours") / 100.0 AS hours,
+               SUM("entryCount") AS "entryCount"
+        FROM time_rollups_daily
+        GROUP BY "userId", "projectId", billable, "weekStart"
+    """,
+    "time_rollups_monthly": """
+        CREATE VIEW IF NOT EXISTS time_rollups_monthly AS
+        SELECT "userId", "projectId", billable,
+               strftime('%Y-%m-01', "workDate") AS "monthStart",
+               SUM("centiHours") / 100.0 AS hours,
+               SUM("entryCount") AS "entryCount"
+        FROM time_rollups_daily
+        GROUP BY "userId", "projectId", billable, "monthStart"
+    """,
+}
+
+
+def to_centi_hours(hours) -> int:
+    return int((Decimal(str(hours)) * 100).to_integral_value())
+
+
+def billable_key(billable) -> str:
+    return getattr(billable, "value", billable) or Billing.non_billable.value
+
+
+def _upsert(statement):
+    return statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "centiHours": TimeRollupDaily.centiHours + statement.excluded.centiHours,
+            "entryCount": TimeRollupDaily.entryCount + statement.excluded.entryCount,
+        },
+    )
+
+
+def delta_statements(user_id, project_id, work_date, billable, hours, sign=1):
+    """Statements that add (sign=1) or remove (sign=-1) one entry from the daily rollup."""
+    key = {
+        "userId": user_id,
+        "workDate": work_date,
+        "projectId": project_id,
+        "billable": billable_key(billable),
+    }
+    centi = sign * to_centi_hours(hours)
+
+    upsert = _upsert(sqlite_insert(TimeRollupDaily).values(**key, centiHours=centi, entryCount=sign))
+    if sign > 0:
+        return [upsert]
+
+    prune = delete(TimeRollupDaily).where(
+        *(getattr(TimeRollupDaily, name) == value for name, value in key.items()),
+        TimeRollupDaily.entryCount <= 0,
+    )
+    return [upsert, prune]
+
+
+def entry_statements(entry, sign=1):
+    return delta_statements(
+        entry.userId, entry.projectId, entry.workDate, entry.billable, entry.hours, sign
+    )
+
+
+def apply_entry(db, entry, sign=1):
+    for statement in entry_statements(entry, sign):
+        db.execute(statement)
+
+
+def apply_rows(db, rows):
+    """Add many new time-entry rows (dicts) to the rollup with one executemany upsert."""
+    buckets = {}
+    for row in rows:
+        key = (row["userId"], row["workDate"], row["projectId"], billable_key(row["billable"]))
+        centi, count = buckets.get(key, (0, 0))
+        buckets[key] = (centi + to_centi_hours(row["hours"]), count + 1)
+
+    if buckets:
+        db.execute(
+            _upsert(sqlite_insert(TimeRollupDaily)),
+            [
+                dict(zip(ROLLUP_KEY, key), centiHours=centi, entryCount=count)
+                for key, (centi, count) in buckets.items()
+            ],
+        )
+
+
+def daily_hours_query(user_id, work_date):
+    return select(func.coalesce(func.sum(TimeRollupDaily.centiHours), 0)).where(
+        TimeRollupDaily.userId == user_id,
+        TimeRollupDaily.workDate == work_date,
+    )
+
+
+def daily_hours_by_user_query(user_ids, start_date, end_date):
+    """Per (userId, workDate) totals for a batch, in one grouped aggregate."""
+    return select(
+        TimeRollupDaily.userId,
+        TimeRollupDaily.workDate,
+        func.sum(TimeRollupDaily.centiHours).label("centiHours"),
+    ).where(
+        TimeRollupDaily.userId.in_(user_ids),
+        TimeRollupDaily.workDate.between(start_date, end_date),
+    ).group_by(TimeRollupDaily.userId, TimeRollupDaily.workDate)
+
+
+def stats_query(user_id, start_date=None, end_date=None):
+    query = select(
+        func.coalesce(func.sum(TimeRollupDaily.centiHours), 0).label("total"),
+        func.coalesce(func.sum(
+            case((TimeRollupDaily.billable == Billing.billable.value, TimeRollupDaily.centiHours), else_=0)
+        ), 0).label("billable"),
+        func.coalesce(func.sum(TimeRollupDaily.entryCount), 0).label("entry_count"),
+    ).where(TimeRollupDaily.userId == user_id)
+
+    if start_date:
+        query = query.where(TimeRollupDaily.workDate >= start_date)
+
+    if end_date:
+        query = query.where(TimeRollupDaily.workDate <= end_date)
+
+    return query
+
+
+def stats_response(row):
+    return {
+        "total_hours": row.total / 100,
+        "billable_hours": row.billable / 100,
+        "non_billable_hours": (row.total - row.billable) / 100,
+        "entry_count": row.entry_count,
+    }
+
+
+def _aggregate_entries(connection):
+    # Every entry exactly once, archived months included.
+    entries = archive.tiered_select(
+        "time_entries",
+        (TimeEntry.userId, TimeEntry.workDate, TimeEntry.projectId, TimeEntry.billable, TimeEntry.hours),
+        snapshot=archive.load_catalog(connection),
+    ).subquery()
+    billable = func.coalesce(entries.c.billable, Billing.non_billable.value)
+    return select(
+        entries.c.userId,
+        entries.c.workDate,
+        entries.c.projectId,
+        billable.label("billable"),
+        func.sum(func.round(entries.c.hours * 100)).cast(TimeRollupDaily.centiHours.type).label("centiHours"),
+        func.count().label("entryCount"),
+    ).group_by(entries.c.userId, entries.c.workDate, entries.c.projectId, billable)
+
+
+def create_views(connection):
+    for ddl in ROLLUP_VIEWS.values():
+        connection.execute(text(ddl))
+
+
+def rebuild(connection):
+    """Recompute the daily rollup from time_entries inside the caller's transaction."""
+    connection.execute(delete(TimeRollupDaily))
+    connection.execute(
+        insert(TimeRollupDaily).from_select(
+            ["userId", "workDate", "projectId", "billable", "centiHours", "entryCount"],
+            _aggregate_entries(connection),
+        )
+    )
+
+
+def verify(connection):
+    """Diff the stored rollup against a fresh aggregate; returns mismatched keys."""
+    expected = {
+        tuple(row[:4]): (row.centiHours, row.entryCount)
+        for row in connection.execute(_aggregate_entries(connection))
+    }
+    stored = {
+        tuple(row[:4]): (row.centiHours, row.entryCount)
+        for row in connection.execute(
+            select(
+                TimeRollupDaily.userId,
+                TimeRollupDaily.workDate,
+                TimeRollupDaily.projectId,
+                TimeRollupDaily.billable,
+                TimeRollupDaily.centiHours,
+                TimeRollupDaily.entryCount,
+            )
+        )
+    }
+
+    return [
+        {"key": key, "expected": expected.get(key), "stored": stored.get(key)}
+        for key in sorted(expected.keys() | stored.keys(), key=str)
+        if expected.get(key) != stored.get(key)
+    ]
@@ -0,0 +1,45 @@
+"""Select exactly a response schema's columns and render the rows directly.
+
+List endpoints select these columns as Row tuples instead of loading ORM
+objects. The rows already have the schema's shape and types, so validating
+them again through the response_model would only repeat work. They go to
+orjson as dicts instead, and the route's response_model still documents them.
+"""
+from fastapi import HTTPException
+
+from app.core.metrics import TimedJSONResponse
+from app.utils.pagination import build_page
+
+
+def model_columns(schema, model):
+    """The ORM columns behind each field of a response schema, in field order."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def field_columns(fields, schema, model, default=None, always=()):
+    """Columns for a comma-separated fields= parameter.
+
+    Any field of schema may be asked for; without fields= the default
+    schema's fields are selected. The always columns (a pagination key) are
+    selected either way. Unknown names are a 400.
+    """
+    available = schema.model_fields
+    if fields:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - available.keys()
+        if unknown:
+            raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    else:
+        names = set((default or schema).model_fields)
+    names |= {column.key for column in always}
+    return tuple(getattr(model, name) for name in available if name in names)
+
+
+def rows_response(rows):
+    return TimedJSONResponse([row._asdict() for row in rows])
+
+
+def page_response(rows, columns, limit):
+    page = build_page(rows, columns, limit)
+    page["items"] = [row._asdict() for row in page["items"]]
+    return TimedJSONResponse(page)
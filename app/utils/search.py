@@ -0,0 +1,168 @@
+"""FTS5 full-text indexes over task titles/descriptions and task log messages.
+
+Both indexes are external-content FTS5 tables: they store only the inverted
+index and read the text back from ``tasks``/``task_logs``. Triggers on the
+content tables keep them in sync for every write path (ORM, Core bulk inserts
+and raw sqlite3 alike); the task trigger only fires when the title or
+description changes, so status flips never touch the index.
+"""
+import re
+
+from fastapi import HTTPException
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+
+from app.models.task import Task
+from app.models.task_log import TaskLog
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+tasks_fts = table("tasks_fts", column("rowid"), column("title"), column("description"))
+task_logs_fts = table("task_logs_fts", column("rowid"), column("log"))
+
+SEARCH_TABLES = {
+    "tasks_fts": f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description,
+            content='tasks', content_rowid='taskId',
+            tokenize='{TOKENIZER}', prefix='2 3'
+        )
+    """,
+    "task_logs_fts": f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS task_logs_fts USING fts5(
+            log,
+            content='task_logs', content_rowid='id',
+            tokenize='{TOKENIZER}', prefix='2 3'
+        )
+    """,
+}
+
+SEARCH_TRIGGERS = {
+    "tasks_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new."taskId", new.title, new.description);
+        END
+    """,
+    "tasks_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old."taskId", old.title, old.description);
+        END
+    """,
+    "tasks_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+            VALUES ('delete', old."taskId", old.title, old.description);
+            INSERT INTO tasks_fts (rowid, title, description)
+            VALUES (new."taskId", new.title, new.description);
+        END
+    """,
+    "task_logs_fts_insert": """
+        CREATE TRIGGER IF NOT EXISTS task_logs_fts_insert AFTER INSERT ON task_logs BEGIN
+            INSERT INTO task_logs_fts (rowid, log) VALUES (new.id, new.log);
+        END
+    """,
+    "task_logs_fts_delete": """
+        CREATE TRIGGER IF NOT EXISTS task_logs_fts_delete AFTER DELETE ON task_logs BEGIN
+            INSERT INTO task_logs_fts (task_logs_fts, rowid, log) VALUES ('delete', old.id, old.log);
+        END
+    """,
+    "task_logs_fts_update": """
+        CREATE TRIGGER IF NOT EXISTS task_logs_fts_update AFTER UPDATE OF log ON task_logs BEGIN
+            INSERT INTO task_logs_fts (task_logs_fts, rowid, log) VALUES ('delete', old.id, old.log);
+            INSERT INTO task_logs_fts (rowid, log) VALUES (new.id, new.log);
+        END
+    """,
+}
+
+# bm25 column weights: a hit in the title counts ten times one in the description.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+SNIPPET_TOKENS = 12
+
+_TERM = re.compile(r"\w+\*?")
+
+
+def create_index(connection):
+    """Create the FTS tables and triggers and index the existing rows."""
+    for ddl in SEARCH_TABLES.values():
+        connection.execute(text(ddl))
+    for ddl in SEARCH_TRIGGERS.values():
+        connection.execute(text(ddl))
+    rebuild(connection)
+
+
+def rebuild(connection):
+    """Re-read every row of the content tables into the indexes."""
+    for name in SEARCH_TABLES:
+        connection.execute(text(f"INSERT INTO {name} ({name}) VALUES ('rebuild')"))
+
+
+def match_expression(q: str) -> str:
+    """Turn user input into an FTS5 query: every word must match, and a word
+    ending in * matches as a prefix. Operators and column filters are not
+    passed through, so any input is a valid query."""
+    terms = []
+    for term in _TERM.findall(q):
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if term.endswith("*") else f'"{word}"')
+    if not terms:
+        raise HTTPException(400, "Search query has no words")
+    return " ".join(terms)
+
+
+def _matches(index, q):
+    return literal_column(index.name).op("MATCH")(match_expression(q))
+
+
+def task_search_query(q, scope, project_id=None, limit=50):
+    """Best-ranked tasks matching q among those the scope may see: every
+    task of an owned project and every assigned task."""
+    rank = func.bm25(literal_column(tasks_fts.name), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+    query = (
+        select(
+            Task.taskId,
+            Task.projectId,
+            Task.title,
+            Task.status,
+            Task.priority,
+            (-rank).label("score"),
+            func.snippet(literal_column(tasks_fts.name), -1, "<mark>", "</mark>", "…", SNIPPET_TOKENS).label("snippet"),
+        )
+        .select_from(tasks_fts)
+        .join(Task, Task.taskId == tasks_fts.c.rowid)
+        .where(_matches(tasks_fts, q))
+    )
+    if not scope.is_admin:
+        query = query.where(or_(
+            Task.projectId.in_(sorted(scope.owned_projects)),
+            Task.taskId.in_(sorted(scope.assigned_tasks)),
+        ))
+    if project_id is not None:
+        query = query.where(Task.projectId == project_id)
+    return query.order_by(rank, Task.taskId).limit(limit)
+
+
+def task_log_search_query(q, scope, task_id=None, limit=50):
+    """Best-ranked log entries matching q. Like GET /tasks/{id}/logs, only
+    admins and the task's assignees may read a task's logs."""
+    rank = func.bm25(literal_column(task_logs_fts.name))
+    query = (
+        select(
+            TaskLog.id,
+            TaskLog.taskId,
+            TaskLog.userId,
+            TaskLog.createdAt,
+            (-rank).label("score"),
+            func.snippet(literal_column(task_logs_fts.name), 0, "<mark>", "</mark>", "…", SNIPPET_TOKENS).label("snippet"),
+        )
+        .select_from(task_logs_fts)
+        .join(TaskLog, TaskLog.id == task_logs_fts.c.rowid)
+        .where(_matches(task_logs_fts, q))
+    )
+    if not scope.is_admin:
+        query = query.where(TaskLog.taskId.in_(sorted(scope.assigned_tasks)))
+    if task_id is not None:
+        query = query.where(TaskLog.taskId == task_id)
+    return query.order_by(rank, TaskLog.id).limit(limit)
@@ -0,0 +1,79 @@
+"""Write units for app.core.group_commit, shared by the sync and async routers.
+
+Each takes the Session it should write through (the batch's, or the
+request's own when group commit is off), flushes nothing it does not need
+to, and returns plain data: the session may be gone by the time the
+caller reads the result.
+"""
+from decimal import Decimal
+
+from fastapi import HTTPException
+
+from app.models.task import Task
+from app.models.time_entries import TimeEntry
+from app.schemas.time_entries import TimeEntryResponse
+from app.utils import audit, rollups
+
+DAILY_HOUR_LIMIT = 8
+DAILY_LIMIT_EXCEEDED = f"Daily limit exceeded. Maximum {DAILY_HOUR_LIMIT} hours per day."
+
+# Loaded by refresh() so a returned entry never lazy-loads its deferred note.
+ENTRY_FIELDS = list(TimeEntryResponse.model_fields)
+
+
+def check_daily_hours(centi_hours, user_id, work_date, new_hours, exclude_entry=None):
+    """Raise 403 if new_hours on top of the day's rollup total would pass
+    DAILY_HOUR_LIMIT. exclude_entry is the entry being replaced, if any."""
+    total = Decimal(centi_hours) / 100
+
+    if (
+        exclude_entry is not None
+        and exclude_entry.userId == user_id
+        and exclude_entry.workDate == work_date
+    ):
+        total -= exclude_entry.hours
+
+    if total + new_hours > DAILY_HOUR_LIMIT:
+        raise HTTPException(403, DAILY_LIMIT_EXCEEDED)
+
+
+def validate_daily_hours(db, user_id, work_date, new_hours, exclude_entry=None):
+    # Single primary-key range lookup on the daily rollup instead of a SUM
+    # over time_entries.
+    total = db.execute(rollups.daily_hours_query(user_id, work_date)).scalar()
+    check_daily_hours(total, user_id, work_date, new_hours, exclude_entry)
+
+
+def create_time_entry(session, user_id, payload) -> TimeEntryResponse:
+    # Checked on the writer inside the unit, so entries for the same day in
+    # one batch see each other.
+    validate_daily_hours(
+        db=session,
+        user_id=user_id,
+        work_date=payload.workDate,
+        new_hours=payload.hours,
+    )
+
+    entry = TimeEntry(
+        userId=user_id,
+        **payload.model_dump()
+    )
+
+    session.add(entry)
+    rollups.apply_entry(session, entry)
+    session.flush()
+    session.refresh(entry, ENTRY_FIELDS)
+    return TimeEntryResponse.model_validate(entry)
+
+
+def change_task_status(session, task_id, status, actor_id):
+    """Set a task's status and queue its log; returns (old status, projectId)."""
+    task = session.query(Task).filter(Task.taskId == task_id).first()
+    if not task:
+        raise HTTPException(404, "Task not found")
+
+    old_status = task.status
+    task.status = status
+
+    audit.log_task(session, task_id, actor_id, f"Status changed from {old_status} → {status}")
+    return old_status, task.projectId
@@ -0,0 +1,57 @@
+"""Move closed months of time_entries into archive partitions.
+
+    python archive_history.py archive --before 2025-01-01
+    python archive_history.py compact
+    python archive_history.py status
+
+archive copies every whole month before --before into its own table and
+registers it; from then on those months are read-only. compact, run at least
+ARCHIVE_COMPACT_GRACE_SECONDS later so every API process has picked up the
+new catalog, deletes the archived months from the hot table.
+"""
+import argparse
+from datetime import date
+
+from app.core.database import engine
+from app.core.migrations import migrate
+from app.utils import archive
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("command", choices=["archive", "compact", "status"])
+parser.add_argument("--before", type=date.fromisoformat, help="archive: every month before this date's month")
+parser.add_argument("--source", choices=archive.SOURCES, action="append",
+                    help="source to archive (default: all)")
+parser.add_argument("--grace", type=float, help="compact: seconds since archiving (default: from settings)")
+args = parser.parse_args()
+
+sources = args.source or list(archive.SOURCES)
+migrate()
+
+if args.command == "archive":
+    if args.before is None:
+        parser.error("archive needs --before")
+    if archive.month_start(args.before) > archive.month_start(date.today()):
+        parser.error("only closed months can be archived")
+    for source in sources:
+        with engine.begin() as connection:
+            months = archive.archive(connection, source, args.before)
+        for period, rows in months.items():
+            print(f"{source} {period:%Y-%m}: archived {rows} rows")
+        print(f"{source}: {len(months)} month(s) archived")
+
+elif args.command == "compact":
+    for source in sources:
+        with engine.begin() as connection:
+            months = archive.compact(connection, source, args.grace)
+        for period, rows in months.items():
+            print(f"{source} {period:%Y-%m}: removed {rows} rows from the hot table")
+        print(f"{source}: {len(months)} month(s) compacted")
+
+else:
+    with engine.connect() as connection:
+        current = archive.load_catalog(connection)
+    for source in sources:
+        print(f"{source}: hot from {current.boundary(source) or 'the beginning'}")
+        for p in reversed(current.of(source)):
+            state = f"compacted {p.compacted_at:%Y-%m-%d %H:%M}" if p.compacted_at else "pending compaction"
+            print(f"  {p.table_name:28} {p.row_count:>10} rows  ids {p.min_key}-{p.max_key}  {state}")
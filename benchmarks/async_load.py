@@ -0,0 +1,133 @@
+"""Compare sync and async router throughput under concurrent load.
+
+Starts the API twice under uvicorn against a fresh SQLite database, once with
+the default sync routers and once with USE_ASYNC_DB=true, and drives a
+read-heavy mix of authenticated requests at each concurrency level.
+
+    python -m benchmarks.async_load --requests 5000 --concurrency 50 200 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(workdir, use_async, extra_env=None):
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+        "USE_ASYNC_DB": "true" if use_async else "false",
+        **(extra_env or {}),
+    }
+    subprocess.run([sys.executable, str(ROOT / "create_tables.py")], cwd=workdir, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(base_url + "/")
+            return proc, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def _seed(base_url):
+    with httpx.Client(base_url=base_url) as client:
+        token = client.post("/auth/register", json={
+            "email": "bench@example.com", "name": "bench", "password": "bench", "role": "manager",
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = client.post("/projects", json={"name": "bench"}, headers=headers).json()["projectId"]
+        for i in range(20):
+            client.post(f"/projects/{project_id}/tasks", json={"title": f"task {i}"}, headers=headers)
+        return headers, project_id
+
+
+async def _drive(base_url, headers, project_id, total, concurrency):
+    paths = ["/projects", f"/projects/{project_id}/tasks", "/time_entries/time-entries", "/users/me"]
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(paths[i % len(paths)])
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                path = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    args = parser.parse_args()
+
+    results = []
+    for use_async in (False, True):
+        with tempfile.TemporaryDirectory() as workdir:
+            proc, base_url = _start_server(workdir, use_async)
+            try:
+                headers, project_id = _seed(base_url)
+                for concurrency in args.concurrency:
+                    result = asyncio.run(_drive(base_url, headers, project_id, args.requests, concurrency))
+                    result["stack"] = "async" if use_async else "sync"
+                    results.append(result)
+                    print(json.dumps(result))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Rows/sec of the bulk time-entry import vs. one POST per entry.
+
+Runs the app in-process against a scratch database. Each user gets a week of
+entries per batch so the daily limit is exercised but never exceeded.
+
+    python -m benchmarks.bulk_import --rows 5000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def make_entries(project_id, count, start):
+    # One 1-hour entry per day: never trips the 8-hour limit.
+    return [
+        {
+            "projectId": project_id,
+            "hours": "1",
+            "billable": "billable" if i % 2 else "non_billable",
+            "workDate": (start + timedelta(days=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        token = client.post("/auth/register", json={
+            "email": "hr@example.com", "name": "hr", "password": "hr", "role": "manager",
+        }).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = client.post("/projects", json={"name": "bench"}, headers=headers).json()["projectId"]
+
+        loop_entries = make_entries(project_id, args.rows, date(2000, 1, 1))
+        started = time.perf_counter()
+        for entry in loop_entries:
+            response = client.post("/time_entries/time-entries", json=entry, headers=headers)
+            assert response.status_code == 200, response.text
+        loop_seconds = time.perf_counter() - started
+
+        bulk_entries = make_entries(project_id, args.rows, date(2040, 1, 1))
+        started = time.perf_counter()
+        response = client.post("/time_entries/time-entries/bulk", json={"entries": bulk_entries}, headers=headers)
+        bulk_seconds = time.perf_counter() - started
+        assert response.json()["inserted"] == args.rows, response.text
+
+    print(json.dumps({
+        "rows": args.rows,
+        "per_row_rows_per_sec": round(args.rows / loop_seconds),
+        "bulk_rows_per_sec": round(args.rows / bulk_seconds),
+        "speedup": round(loop_seconds / bulk_seconds, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
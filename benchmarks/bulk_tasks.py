@@ -0,0 +1,97 @@
+"""Bulk task creation and bulk assignment vs. one POST per task / assignment.
+
+Runs the app in-process against a scratch database.
+
+    python -m benchmarks.bulk_tasks --tasks 2000 --users 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def register(client, name, role="user"):
+    response = client.post("/auth/register", json={
+        "email": f"{name}@example.com", "name": name, "password": name, "role": role,
+    })
+    return response.json()["access_token"]
+
+
+def create_tasks_loop(client, headers, project_id, count):
+    task_ids = []
+    for i in range(count):
+        response = client.post(f"/projects/{project_id}/tasks", json={"title": f"loop {i}"}, headers=headers)
+        assert response.status_code == 200, response.text
+        task_ids.append(response.json()["taskId"])
+    return task_ids
+
+
+def create_tasks_bulk(client, headers, project_id, count):
+    tasks = [{"title": f"bulk {i}"} for i in range(count)]
+    response = client.post(f"/projects/{project_id}/tasks/bulk", json={"tasks": tasks}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [task["taskId"] for task in response.json()]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=5)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {register(client, 'lead', 'manager')}"}
+        user_ids = []
+        for i in range(args.users):
+            token = register(client, f"dev{i}")
+            me = client.get("/users/me", headers={"Authorization": f"Bearer {token}"}).json()
+            user_ids.append(me["userId"])
+        project_id = client.post("/projects", json={"name": "bench"}, headers=headers).json()["projectId"]
+
+        loop_ids, loop_create = timed(create_tasks_loop, client, headers, project_id, args.tasks)
+        bulk_ids, bulk_create = timed(create_tasks_bulk, client, headers, project_id, args.tasks)
+
+        started = time.perf_counter()
+        for task_id in loop_ids:
+            for user_id in user_ids:
+                response = client.post(f"/tasks/{task_id}/assignees/{user_id}", headers=headers)
+                assert response.status_code == 200, response.text
+        loop_assign = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = client.post(
+            "/tasks/assignees/bulk", json={"taskIds": bulk_ids, "userIds": user_ids}, headers=headers,
+        )
+        bulk_assign = time.perf_counter() - started
+        assert response.json()["assigned"] == len(bulk_ids) * len(user_ids), response.text
+
+    assignments = args.tasks * args.users
+    print(json.dumps({
+        "tasks": args.tasks,
+        "assignments": assignments,
+        "per_task_per_sec": round(args.tasks / loop_create),
+        "bulk_task_per_sec": round(args.tasks / bulk_create),
+        "create_speedup": round(loop_create / bulk_create, 1),
+        "per_assignment_per_sec": round(assignments / loop_assign),
+        "bulk_assignment_per_sec": round(assignments / bulk_assign),
+        "assign_speedup": round(loop_assign / bulk_assign, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
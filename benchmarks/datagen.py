@@ -0,0 +1,241 @@
+"""Fill a fresh database with synthetic, reproducible data at a chosen scale.
+
+Rows are generated from a fixed seed and written with sqlite3 executemany in
+large transactions. Secondary indexes and triggers (the full-text sync) are
+dropped during the load and recreated afterwards, then the search index and
+daily rollups are rebuilt and ANALYZE is run.
+
+Every user's password is "password"; user 1 is an admin, every tenth user is a
+manager, and project p is owned by manager ((p - 1) % managers).
+
+    python -m benchmarks.datagen bench.db --scale small
+    python -m benchmarks.datagen large.db --scale large --time-entries 5000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.core.database import create_engines
+from app.core.migrations import migrate
+from app.core.security import pwd_context
+from app.utils import rollups, search
+
+PASSWORD = "password"
+
+SCALES = {
+    "small": {"users": 200, "projects": 40, "tasks": 5_000, "time_entries": 100_000, "task_logs": 200_000},
+    "medium": {"users": 2_000, "projects": 400, "tasks": 50_000, "time_entries": 1_000_000, "task_logs": 2_000_000},
+    "large": {"users": 10_000, "projects": 2_000, "tasks": 500_000, "time_entries": 20_000_000, "task_logs": 50_000_000},
+}
+
+# Time entries cover the HISTORY_DAYS (by default two years) before this date;
+# load tests write after it.
+LAST_WORK_DATE = date(2025, 12, 31)
+HISTORY_DAYS = 730
+
+LOADED_TABLES = ("users", "projects", "project_owners", "tasks", "assignees", "task_logs", "time_entries")
+TASK_STATUSES = ("todo", "ongoing", "complete")
+LOG_MESSAGES = ("Task created", "Status changed", "User assigned", "User unassigned", "Comment added")
+
+# Task descriptions draw from this vocabulary with Zipf-like frequencies, so
+# searches range from very common to rare words.
+VOCABULARY = (
+    "update fix add remove refactor review test deploy release migrate api endpoint database index "
+    "query cache login logout session token password user account profile settings permission role "
+    "project task assignee report export invoice billing payment customer contract budget estimate "
+    "deadline milestone sprint backlog roadmap design mockup layout button form modal page screen "
+    "mobile desktop browser android ios notification email webhook integration sync import upload "
+    "download attachment image document spreadsheet calendar timezone locale translation accessibility "
+    "performance latency memory crash timeout retry queue worker scheduler backup restore monitoring "
+    "alert dashboard chart metric log audit security encryption certificate firewall compliance gdpr "
+    "onboarding tutorial documentation changelog dependency upgrade vulnerability regression flaky "
+    "pipeline build container kubernetes terraform staging production rollback hotfix outage postmortem"
+).split()
+_VOCABULARY_WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def _text(rng, low, high):
+    return " ".join(rng.choices(VOCABULARY, _VOCABULARY_WEIGHTS, k=rng.randint(low, high)))
+
+
+def manager_ids(users):
+    return [u for u in range(1, users + 1) if u % 10 == 0] or [1]
+
+
+def role_of(user_id):
+    if user_id == 1:
+        return "admin"
+    return "manager" if user_id % 10 == 0 else "user"
+
+
+def _rows(counts, rng, password_hash, history_days):
+    """(table, sql, row iterator) in load order."""
+    users, projects, tasks = counts["users"], counts["projects"], counts["tasks"]
+    managers = manager_ids(users)
+    first_day = LAST_WORK_DATE - timedelta(days=history_days - 1)
+    days = [(first_day + timedelta(days=d)).isoformat() for d in range(history_days)]
+
+    yield "users", (
+        'INSERT INTO users ("userId", email, name, role, password_hash) VALUES (?, ?, ?, ?, ?)'
+    ), ((u, f"user{u}@example.com", f"User {u}", role_of(u), password_hash) for u in range(1, users + 1))
+
+    yield "projects", 'INSERT INTO projects ("projectId", name) VALUES (?, ?)', (
+        (p, f"Project {p}") for p in range(1, projects + 1)
+    )
+
+    yield "project_owners", 'INSERT INTO project_owners ("projectId", "userId") VALUES (?, ?)', (
+        (p, managers[(p - 1) % len(managers)]) for p in range(1, projects + 1)
+    )
+
+    # Seven tasks in ten are due at the end of some day in the history.
+    yield "tasks", (
+        'INSERT INTO tasks ("taskId", "projectId", title, description, status, priority, "createdBy", "dueAt") '
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    ), (
+        (
+            t,
+            (t - 1) % projects + 1,
+            f"Task {t}: {_text(rng, 2, 4)}",
+            _text(rng, 10, 40),
+            rng.choice(TASK_STATUSES),
+            rng.choice(("low", "medium", "high")),
+            managers[((t - 1) % projects) % len(managers)],
+            f"{rng.choice(days)} 17:00:00.000000" if rng.random() < 0.7 else None,
+        )
+        for t in range(1, tasks + 1)
+    )
+
+    # One or two assignees per task; the pairs are distinct by construction.
+    def assignees():
+        for t in range(1, tasks + 1):
+            first = rng.randint(1, users)
+            yield first, t
+            if users > 1 and rng.random() < 0.5:
+                yield first % users + 1, t
+
+    yield "assignees", 'INSERT INTO assignees ("userId", "taskId") VALUES (?, ?)', assignees()
+
+    yield "task_logs", 'INSERT INTO task_logs ("taskId", "userId", log) VALUES (?, ?, ?)', (
+        (rng.randint(1, tasks), rng.randint(1, users), rng.choice(LOG_MESSAGES))
+        for _ in range(counts["task_logs"])
+    )
+
+    # Entries are logged in date order, so ids grow with workDate as in a live
+    # table; each day gets an even share. Six in ten are booked against one of
+    # their project's tasks (task t belongs to project (t - 1) % projects + 1).
+    entries = counts["time_entries"]
+
+    def entry_task(project):
+        if project > tasks or rng.random() >= 0.6:
+            return None
+        return project + projects * rng.randrange((tasks - project) // projects + 1)
+
+    yield "time_entries", (
+        'INSERT INTO time_entries ("userId", "projectId", "taskId", hours, billable, "workDate") '
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    ), (
+        (
+            rng.randint(1, users),
+            (project := rng.randint(1, projects)),
+            entry_task(project),
+            rng.randint(2, 16) / 4,
+            "billable" if rng.random() < 0.7 else "non_billable",
+            days[e * history_days // entries],
+        )
+        for e in range(entries)
+    )
+
+
+def generate(path, counts, seed=42, batch=100_000, log=print, history_days=HISTORY_DAYS):
+    """Create the schema at path and load it; returns {table: (rows, seconds)}."""
+    if os.path.exists(path):
+        raise FileExistsError(f"{path} already exists; datagen only fills a fresh database")
+
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+    migrate(writer)
+    writer.dispose()
+    reader.dispose()
+
+    rng = random.Random(seed)
+    password_hash = pwd_context.hash(PASSWORD)
+    timings = {}
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    indexes = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL "
+        f"AND tbl_name IN ({', '.join('?' * len(LOADED_TABLES))})",
+        LOADED_TABLES,
+    ).fetchall()
+    for kind, name, _ in indexes:
+        conn.execute(f'DROP {kind.upper()} "{name}"')
+
+    for table, sql, rows in _rows(counts, rng, password_hash, history_days):
+        started = time.perf_counter()
+        loaded = 0
+        while chunk := list(islice(rows, batch)):
+            conn.execute("BEGIN")
+            conn.executemany(sql, chunk)
+            conn.execute("COMMIT")
+            loaded += len(chunk)
+        timings[table] = (loaded, time.perf_counter() - started)
+        log(f"{table}: {loaded} rows in {timings[table][1]:.1f}s")
+
+    started = time.perf_counter()
+    for _, _, sql in indexes:
+        conn.execute(sql)
+    log(f"indexes and triggers: {len(indexes)} rebuilt in {time.perf_counter() - started:.1f}s")
+    conn.close()
+
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+    started = time.perf_counter()
+    with writer.begin() as connection:
+        search.rebuild(connection)
+        rollups.rebuild(connection)
+        connection.exec_driver_sql("ANALYZE")
+    log(f"search index, rollups and ANALYZE in {time.perf_counter() - started:.1f}s")
+    writer.dispose()
+    reader.dispose()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", help="path of the SQLite file to create")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    for table in SCALES["small"]:
+        parser.add_argument(f"--{table.replace('_', '-')}", type=int, dest=table,
+                            help=f"override the scale's {table} count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=100_000, help="rows per transaction")
+    parser.add_argument("--history-days", type=int, default=HISTORY_DAYS,
+                        help=f"days of time entries up to {LAST_WORK_DATE}")
+    args = parser.parse_args()
+
+    counts = {
+        table: getattr(args, table) if getattr(args, table) is not None else default
+        for table, default in SCALES[args.scale].items()
+    }
+    started = time.perf_counter()
+    timings = generate(args.database, counts, args.seed, args.batch, history_days=args.history_days)
+    print(json.dumps({
+        "database": args.database,
+        "seed": args.seed,
+        "counts": counts,
+        "rows_per_second": {
+            table: round(rows / seconds) if seconds else None for table, (rows, seconds) in timings.items()
+        },
+        "seconds": round(time.perf_counter() - started, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
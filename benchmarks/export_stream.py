@@ -0,0 +1,90 @@
+"""Stream a large project export and check that peak RSS stays flat.
+
+Seeds a scratch database with one project holding ``--rows`` time entries and
+drains the NDJSON/CSV export generators, sampling RSS as rows go by.
+
+    python -m benchmarks.export_stream --rows 5000000 --format ndjson
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+workdir = tempfile.mkdtemp()
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+
+from app.core.migrations import migrate
+from app.utils.exports import EXPORT_FORMATS, iter_project_entries
+
+def rss_mb():
+    # Anonymous RSS only: with mmap_size set, database pages read through the
+    # mapping show up as file-backed RSS without being process memory.
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("RssAnon not available")
+
+
+def seed(path, rows):
+    rng = random.Random(7)
+    start = date(2015, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO projects (projectId, name) VALUES (1, 'billing')")
+    conn.executemany(
+        "INSERT INTO time_entries (userId, projectId, hours, billable, workDate, note) VALUES (?, 1, ?, ?, ?, ?)",
+        (
+            (
+                rng.randint(1, 5000),
+                rng.choice((0.5, 1, 1.5, 2, 4, 8)),
+                rng.choice(("billable", "non_billable")),
+                (start + timedelta(days=i // 2000)).isoformat(),
+                "client work",
+            )
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    args = parser.parse_args()
+
+    migrate()
+    seed(f"{workdir}/bench.db", args.rows)
+
+    _, encode = EXPORT_FORMATS[args.format]
+    baseline = rss_mb()
+    samples = []
+    exported_bytes = 0
+    started = time.perf_counter()
+    for chunk in encode(iter_project_entries(1)):
+        exported_bytes += len(chunk)
+        samples.append(rss_mb())
+    elapsed = time.perf_counter() - started
+
+    quarter = max(1, len(samples) // 4)
+    print(json.dumps({
+        "rows": args.rows,
+        "format": args.format,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(args.rows / elapsed),
+        "exported_mb": round(exported_bytes / 2**20, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_first_quarter_mb": round(max(samples[:quarter]), 1),
+        "peak_rss_mb": round(max(samples), 1),
+        "rss_growth_after_warmup_mb": round(max(samples) - max(samples[:quarter]), 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
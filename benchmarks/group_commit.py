@@ -0,0 +1,135 @@
+"""Write throughput and latency under a burst of concurrent writers, with
+and without group commit.
+
+Starts the API under uvicorn (see benchmarks.async_load) and has
+--concurrency clients send --requests writes at once, alternating
+POST /time_entries/time-entries and PATCH /tasks/{id}/status. Each
+configuration runs on a fresh database:
+
+    writes_per_s    acknowledged writes per second of wall time
+    transactions    writer transactions that committed them (from /metrics;
+                    equal to writes when group commit is off)
+    p50_ms/p99_ms   latency of the acknowledged writes
+    errors          responses other than 200/201, and dropped connections
+
+--synchronous FULL makes SQLite fsync every commit, which is where sharing
+one commit between many writes matters most.
+
+    python -m benchmarks.group_commit --requests 2000 --concurrency 500
+    python -m benchmarks.group_commit --synchronous NORMAL FULL --async
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from benchmarks.async_load import _seed, _start_server
+
+
+async def _burst(base_url, headers, project_id, task_ids, total, concurrency):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    today = date.today()
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=120) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                i = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    if i % 2:
+                        response = await client.patch(f"/tasks/{task_ids[i % len(task_ids)]}/status?status=s{i}")
+                    else:
+                        # A different day per entry keeps clear of the daily hour limit.
+                        response = await client.post("/time_entries/time-entries", json={
+                            "projectId": project_id,
+                            "hours": "0.25",
+                            "billable": "billable",
+                            "workDate": (today - timedelta(days=i // 2 % 1000)).isoformat(),
+                        })
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                if response.status_code in (200, 201):
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def _counter(base_url, name):
+    for line in httpx.get(base_url + "/metrics").text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return 0.0
+
+
+def run(group_commit, synchronous, use_async, args):
+    workdir = tempfile.mkdtemp()
+    env = {
+        "GROUP_COMMIT_ENABLED": "true" if group_commit else "false",
+        "SQLITE_SYNCHRONOUS": synchronous,
+        "PASSWORD_HASH_WORKERS": "0",
+    }
+    proc, base_url = _start_server(workdir, use_async=use_async, extra_env=env)
+    try:
+        headers, project_id = _seed(base_url)
+        task_ids = [task["taskId"] for task in httpx.get(
+            f"{base_url}/projects/{project_id}/tasks", headers=headers,
+        ).json()["items"]]
+        before = _counter(base_url, "group_commit_batches_total")
+        latencies, errors, elapsed = asyncio.run(_burst(
+            base_url, headers, project_id, task_ids, args.requests, args.concurrency,
+        ))
+        transactions = _counter(base_url, "group_commit_batches_total") - before
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    latencies.sort()
+    return {
+        "stack": "async" if use_async else "sync",
+        "group_commit": group_commit,
+        "synchronous": synchronous,
+        "concurrency": args.concurrency,
+        "writes": len(latencies),
+        "transactions": int(transactions) if group_commit else len(latencies),
+        "writes_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--synchronous", nargs="+", default=["NORMAL", "FULL"])
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use the async routers")
+    args = parser.parse_args()
+
+    for synchronous in args.synchronous:
+        for group_commit in (False, True):
+            print(json.dumps(run(group_commit, synchronous, args.use_async, args)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Hot-path latency as time-entry history grows: one flat table against tiers.
+
+For each --months value a dataset with that much history is generated (see
+benchmarks.datagen) at --entries-per-month. Each dataset is measured twice:
+
+    flat     every entry in time_entries
+    tiered   all but the last --hot-months archived and compacted, as
+             archive_history.py archive + compact would leave them
+
+Queries, each the median of --repeat calls for random users and projects:
+
+    my_month        GET /time-entries?start_date=<first hot day>
+    project_month   GET /time-entries/project/{id}?start_date=<first hot day>
+    get_recent      GET /time-entries/{id} for an entry in the hot months
+    insert          POST /time-entries: rollup check, insert and commit
+    my_unbounded    GET /time-entries without a range, which also reads the
+                    archive view
+
+    python -m benchmarks.history_growth --months 6 12 24 48
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from sqlalchemy import func, select
+
+from app.core.database import create_engines, create_session_factory
+from app.models.time_entries import TimeEntry
+from app.routers.time_entries import _entries_query, validate_daily_hours
+from app.schemas.time_entries import TimeEntryResponse
+from app.utils import archive, rollups
+from app.utils.rows import model_columns
+from benchmarks import datagen
+
+COLUMNS = model_columns(TimeEntryResponse, TimeEntry)
+
+
+def first_month(months):
+    """First day of the earliest of the last `months` generated months."""
+    day = datagen.LAST_WORK_DATE.replace(day=1)
+    for _ in range(months - 1):
+        day = (day - timedelta(days=1)).replace(day=1)
+    return day
+
+
+def layout(path, tiered, first_hot_day):
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+    if tiered:
+        with writer.begin() as connection:
+            archive.archive(connection, "time_entries", first_hot_day)
+        with writer.begin() as connection:
+            archive.compact(connection, "time_entries", grace_seconds=0)
+    # Closing the last connection checkpoints the WAL, so both layouts start
+    # from the database file rather than a log holding the moved rows.
+    writer.dispose()
+    archive.refresh_catalog(reader)
+    return writer, reader
+
+
+def measure(SessionLocal, rng, users, projects, hot_ids, first_hot_day, repeat, limit):
+    def timed(run):
+        samples = []
+        with SessionLocal() as db:
+            run(db, repeat)
+        for i in range(repeat):
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                run(db, i)
+                samples.append(time.perf_counter() - started)
+        return round(statistics.median(samples) * 1000, 3)
+
+    def my_month(db, i):
+        db.execute(_entries_query(COLUMNS, None, limit, first_hot_day, userId=rng.choice(users))).all()
+
+    def project_month(db, i):
+        db.execute(_entries_query(COLUMNS, None, limit, first_hot_day, projectId=rng.choice(projects))).all()
+
+    def get_recent(db, i):
+        entry_id = rng.choice(hot_ids)
+        lookup = archive.lookup_select("time_entries", COLUMNS, entry_id)
+        if lookup is not None:
+            db.execute(lookup).first()
+        else:
+            db.get(TimeEntry, entry_id)
+
+    def my_unbounded(db, i):
+        db.execute(_entries_query(COLUMNS, None, limit, userId=rng.choice(users))).all()
+
+    def insert(db, i):
+        # A fresh day per call keeps every insert under the daily limit.
+        user_id = rng.choice(users)
+        work_date = datagen.LAST_WORK_DATE + timedelta(days=1 + i)  # i == repeat warms up
+        validate_daily_hours(db, user_id, work_date, 1)
+        entry = TimeEntry(userId=user_id, projectId=rng.choice(projects), hours=1, billable="billable", workDate=work_date)
+        db.add(entry)
+        rollups.apply_entry(db, entry)
+        db.commit()
+
+    return {
+        "my_month": timed(my_month),
+        "project_month": timed(project_month),
+        "get_recent": timed(get_recent),
+        "my_unbounded": timed(my_unbounded),
+        "insert": timed(insert),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months", type=int, nargs="+", default=[6, 12, 24, 48])
+    parser.add_argument("--entries-per-month", type=int, default=50_000)
+    parser.add_argument("--hot-months", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    first_hot_day = first_month(args.hot_months)
+
+    workdir = tempfile.mkdtemp()
+    for months in args.months:
+        source = os.path.join(workdir, f"history-{months}.db")
+        counts = {
+            **datagen.SCALES["medium"],
+            "tasks": 1_000,
+            "task_logs": 0,
+            "time_entries": months * args.entries_per_month,
+        }
+        history_days = (datagen.LAST_WORK_DATE - first_month(months)).days + 1
+        datagen.generate(source, counts, log=lambda line: None, history_days=history_days)
+
+        for tiered in (False, True):
+            path = os.path.join(workdir, f"history-{months}-{'tiered' if tiered else 'flat'}.db")
+            shutil.copyfile(source, path)
+            writer, reader = layout(path, tiered, first_hot_day)
+            with reader.connect() as connection:
+                hot_rows = connection.scalar(select(func.count()).select_from(TimeEntry.__table__))
+                hot_ids = list(connection.scalars(
+                    select(TimeEntry.timeEntryId).where(TimeEntry.workDate >= first_hot_day).limit(10_000)
+                ))
+
+            rng = random.Random(42)
+            users = [u for u in range(1, counts["users"] + 1) if datagen.role_of(u) == "user"]
+            results = measure(
+                create_session_factory(writer, reader), rng, users,
+                list(range(1, counts["projects"] + 1)), hot_ids, first_hot_day, args.repeat, args.limit,
+            )
+            print(json.dumps({
+                "months": months,
+                "layout": "tiered" if tiered else "flat",
+                "partitions": len(archive.catalog().of("time_entries")),
+                "hot_rows": hot_rows,
+                "ms": results,
+            }))
+            writer.dispose()
+            reader.dispose()
+            os.remove(path)
+        os.remove(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Per-endpoint latency with and without the query indexes at 1M time entries.
+
+Seeds a scratch database, drops the indexes added by migration 0001, times the
+router handlers, applies the migrations and times them again.
+
+    python -m benchmarks.indexes --entries 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.core.database import create_engines, create_session_factory
+from app.core.migrations import migrate
+from app.routers import projects, task_logs, tasks, time_entries
+from app.schemas.user import UserOut
+
+INDEXES = [
+    "ix_time_entries_user_work_date",
+    "ix_time_entries_project_work_date",
+    "ix_tasks_projectId",
+    "ix_task_logs_taskId",
+    "ix_assignees_task_user",
+    "ix_project_owners_user_project",
+]
+
+
+def seed(path, entries, users=1000, projects_=200, tasks_per_project=50):
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users (userId, email, name, role, password_hash) VALUES (?, ?, ?, 'user', 'x')",
+        ((i, f"u{i}@example.com", f"u{i}") for i in range(1, users + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO projects (projectId, name) VALUES (?, ?)",
+        ((i, f"p{i}") for i in range(1, projects_ + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO project_owners (projectId, userId) VALUES (?, ?)",
+        ((p, (p % users) + 1) for p in range(1, projects_ + 1)),
+    )
+    task_count = projects_ * tasks_per_project
+    conn.executemany(
+        "INSERT INTO tasks (taskId, projectId, title, status) VALUES (?, ?, ?, 'todo')",
+        ((t, (t - 1) // tasks_per_project + 1, f"t{t}") for t in range(1, task_count + 1)),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO assignees (userId, taskId) VALUES (?, ?)",
+        ((rng.randint(1, users), t) for t in range(1, task_count + 1) for _ in range(2)),
+    )
+    conn.executemany(
+        "INSERT INTO task_logs (taskId, userId, log) VALUES (?, ?, 'update')",
+        ((rng.randint(1, task_count), rng.randint(1, users)) for _ in range(entries // 4)),
+    )
+    start = date(2020, 1, 1)
+    conn.executemany(
+        "INSERT INTO time_entries (userId, projectId, taskId, hours, billable, workDate) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (
+                rng.randint(1, users),
+                rng.randint(1, projects_),
+                None,
+                1.5,
+                rng.choice(("billable", "non_billable")),
+                (start + timedelta(days=rng.randint(0, 1500))).isoformat(),
+            )
+            for _ in range(entries)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_endpoints(SessionLocal, repeat):
+    principal = UserOut(userId=1, email="u1@example.com", name="u1", role="admin", joinedAt="2024-01-01T00:00:00")
+    window = (date(2023, 1, 1), date(2023, 3, 31))
+    calls = {
+        "get_time_entries": lambda db: time_entries.get_time_entries(
+            db=db, current_user=principal, project_id=None, start_date=None, end_date=None),
+        "get_time_stats": lambda db: time_entries.get_time_stats(
+            db=db, current_user=principal, start_date=window[0], end_date=window[1]),
+        "validate_daily_hours": lambda db: time_entries.validate_daily_hours(
+            db, principal.userId, date(2023, 1, 2), 0),
+        "get_project_time_entries": lambda db: time_entries.get_project_time_entries(
+            project_id=1, db=db, current_user=principal, start_date=window[0], end_date=window[1]),
+        "get_tasks_by_project": lambda db: tasks.get_tasks_by_project(project_id=1, db=db, user=principal),
+        "get_task_logs": lambda db: task_logs.get_task_logs(task_id=1, db=db, user=principal),
+        "get_projects": lambda db: projects.get_projects(
+            db=db, user=principal.model_copy(update={"role": "user"})),
+    }
+    results = {}
+    for name, call in calls.items():
+        samples = []
+        for _ in range(repeat):
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                call(db)
+                samples.append(time.perf_counter() - started)
+        results[name] = round(min(samples) * 1000, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+    migrate(writer)
+    seed(path, args.entries)
+
+    with writer.begin() as connection:
+        for name in INDEXES:
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS "{name}"')
+        connection.exec_driver_sql("PRAGMA user_version = 0")
+        connection.exec_driver_sql("ANALYZE")
+    writer.dispose()
+    reader.dispose()
+
+    SessionLocal = create_session_factory(writer, reader)
+    before = time_endpoints(SessionLocal, args.repeat)
+    migrate(writer)
+    reader.dispose()
+    after = time_endpoints(SessionLocal, args.repeat)
+
+    for name in before:
+        print(json.dumps({
+            "endpoint": name,
+            "unindexed_ms": before[name],
+            "indexed_ms": after[name],
+            "speedup": round(before[name] / after[name], 1) if after[name] else None,
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Crash recovery and request latency of the background job queue.
+
+Starts the API under uvicorn (see benchmarks.async_load) and sends a burst
+of PATCH /tasks/{id}/status requests. Each one sets a unique status, so its
+"Status changed" task log can be found later. After --kill-after
+responses the server is killed with SIGKILL, with requests still in flight
+and log jobs still queued. It is then restarted on the same database, and
+stopped cleanly so the workers drain what is left.
+
+For every request that was answered 200, its task log must exist exactly
+once. The check runs once with the durable outbox and once with in-memory
+jobs:
+
+    acknowledged    requests answered 200 before the kill
+    logged_at_kill  their logs already written when the server died
+    lost            acknowledged requests whose log never appeared
+    duplicates      logs written more than once
+    p50_ms/p99_ms   latency of the acknowledged requests
+
+    python -m benchmarks.jobs --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from benchmarks.async_load import _seed, _start_server
+
+
+async def _burst(base_url, headers, task_ids, total, concurrency, kill_after, proc):
+    """Send the requests, killing the server after kill_after responses;
+    returns {marker: latency} of those answered 200."""
+    acknowledged = {}
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        async def worker():
+            while not queue.empty():
+                i = queue.get_nowait()
+                started = time.perf_counter()
+                try:
+                    response = await client.patch(f"/tasks/{task_ids[i % len(task_ids)]}/status?status=s{i}")
+                except httpx.TransportError:
+                    continue
+                if response.status_code == 200:
+                    acknowledged[f"s{i}"] = time.perf_counter() - started
+                    if len(acknowledged) == kill_after and proc.poll() is None:
+                        proc.kill()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return acknowledged
+
+
+def _logged(path):
+    """{status marker: number of logs} of the status changes written."""
+    conn = sqlite3.connect(path)
+    counts = {}
+    for (log,) in conn.execute("SELECT log FROM task_logs WHERE log LIKE 'Status changed%'"):
+        marker = log.rsplit(" ", 1)[-1]
+        counts[marker] = counts.get(marker, 0) + 1
+    conn.close()
+    return counts
+
+
+def run(durable, args):
+    workdir = tempfile.mkdtemp()
+    env = {"JOBS_DURABLE": "true" if durable else "false", "PASSWORD_HASH_WORKERS": "0"}
+    proc, base_url = _start_server(workdir, use_async=False, extra_env=env)
+    try:
+        headers, project_id = _seed(base_url)
+        task_ids = [task["taskId"] for task in httpx.get(
+            f"{base_url}/projects/{project_id}/tasks", headers=headers,
+        ).json()["items"]]
+        acknowledged = asyncio.run(_burst(
+            base_url, headers, task_ids, args.requests, args.concurrency, args.kill_after, proc,
+        ))
+    finally:
+        proc.kill()
+        proc.wait()
+
+    path = os.path.join(workdir, "tracker.db")
+    at_kill = _logged(path)
+
+    # A fresh process finds the outbox left behind; stopping it cleanly
+    # drains whatever is still due.
+    proc, base_url = _start_server(workdir, use_async=False, extra_env=env)
+    time.sleep(args.settle)
+    proc.terminate()
+    proc.wait()
+    logged = _logged(path)
+
+    latencies = sorted(acknowledged.values())
+    return {
+        "jobs": "durable" if durable else "memory",
+        "requests": args.requests,
+        "acknowledged": len(acknowledged),
+        "logged_at_kill": sum(1 for marker in acknowledged if marker in at_kill),
+        "lost": sum(1 for marker in acknowledged if marker not in logged),
+        "duplicates": sum(count - 1 for count in logged.values()),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--kill-after", type=int, default=1500)
+    parser.add_argument("--settle", type=float, default=2, help="seconds the restarted server runs")
+    args = parser.parse_args()
+
+    for durable in (True, False):
+        print(json.dumps(run(durable, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Per-request token verification cost: python-jose vs. the HMAC fast path
+vs. the verified-token cache in decode_user_id.
+
+    python -m benchmarks.jwt_decode --number 20000
+"""
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.core import dependencies
+from app.core.security import ALGORITHM, SECRET_KEY, create_access_token, create_signer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "42"})
+    cases = {
+        "jose_decode": create_signer(ALGORITHM, SECRET_KEY, "jose").decode,
+        "hmac_decode": create_signer(ALGORITHM, SECRET_KEY, "hmac").decode,
+    }
+    try:
+        cases["pyjwt_decode"] = create_signer(ALGORITHM, SECRET_KEY, "pyjwt").decode
+    except RuntimeError:
+        pass
+
+    dependencies.decode_user_id(token)  # warm the cache
+    cases["cached_decode_user_id"] = dependencies.decode_user_id
+
+    results = {}
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(lambda: fn(token), number=args.number, repeat=3))
+        results[name] = round(seconds / args.number * 1e6, 2)
+
+    print(json.dumps({"algorithm": ALGORITHM, "us_per_call": results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Load-test scenarios against a generated dataset, with JSON results.
+
+Copies (or generates, see benchmarks.datagen) a database into a scratch
+directory, starts the API under uvicorn on it and drives each scenario with
+concurrent httpx clients. Results are written as JSON tagged with the git
+commit, and --compare flags throughput/latency regressions against an earlier
+run.
+
+Scenarios:
+    login       POST /auth/login (bcrypt bound)
+    timesheet   POST /time_entries/time-entries on dates after the dataset
+    dashboard   project list, project tasks, hour stats and assigned tasks
+    export      month-long billing exports of a project as NDJSON
+
+    python -m benchmarks.load --scale small --output before.json
+    python -m benchmarks.load --database large.db --scenarios dashboard export
+    python -m benchmarks.load --scale small --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from app.core.security import create_access_token
+from benchmarks import datagen
+from benchmarks.async_load import _start_server
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULTS = {
+    "login": {"requests": 200, "concurrency": 8},
+    "timesheet": {"requests": 2000, "concurrency": 32},
+    "dashboard": {"requests": 4000, "concurrency": 32},
+    "export": {"requests": 200, "concurrency": 8},
+}
+
+
+class Dataset:
+    """Actors and ids the scenarios draw from, read from the generated database."""
+
+    def __init__(self, path, seed):
+        conn = sqlite3.connect(path)
+        self.users = [row[0] for row in conn.execute("SELECT \"userId\" FROM users WHERE role = 'user'")]
+        self.owned = conn.execute('SELECT "userId", "projectId" FROM project_owners').fetchall()
+        self.projects = [row[0] for row in conn.execute('SELECT "projectId" FROM projects')]
+        self.counts = {
+            table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in datagen.SCALES["small"]
+        }
+        conn.close()
+        self.rng = random.Random(seed)
+        self._tokens = {}
+
+    def headers(self, user_id):
+        token = self._tokens.get(user_id)
+        if token is None:
+            token = self._tokens[user_id] = create_access_token({"sub": str(user_id)})
+        return {"Authorization": f"Bearer {token}"}
+
+
+def login(dataset, i):
+    user_id = dataset.rng.choice(dataset.users)
+    return "POST", "/auth/login", {
+        "json": {"email": f"user{user_id}@example.com", "password": datagen.PASSWORD},
+    }
+
+
+def timesheet(dataset, i):
+    # A fresh date per request keeps every entry under the daily hour limit.
+    user_id = dataset.users[i % len(dataset.users)]
+    work_date = datagen.LAST_WORK_DATE + timedelta(days=1 + i // len(dataset.users))
+    return "POST", "/time_entries/time-entries", {
+        "headers": dataset.headers(user_id),
+        "json": {
+            "projectId": dataset.rng.choice(dataset.projects),
+            "hours": "1.5",
+            "billable": "billable",
+            "workDate": work_date.isoformat(),
+        },
+    }
+
+
+def dashboard(dataset, i):
+    user_id, project_id = dataset.owned[i // 4 % len(dataset.owned)]
+    path = (
+        "/projects",
+        f"/projects/{project_id}/tasks",
+        "/time_entries/time-entries/stats/summary",
+        "/users/my/assigned-tasks",
+    )[i % 4]
+    return "GET", path, {"headers": dataset.headers(user_id)}
+
+
+def export(dataset, i):
+    user_id, project_id = dataset.rng.choice(dataset.owned)
+    year, month = divmod(datagen.LAST_WORK_DATE.year * 12 + datagen.LAST_WORK_DATE.month - 1 - i % 24, 12)
+    month_start = date(year, month + 1, 1)
+    month_end = (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    return "GET", f"/time_entries/time-entries/project/{project_id}/export", {
+        "headers": dataset.headers(user_id),
+        "params": {"start_date": month_start.isoformat(), "end_date": month_end.isoformat()},
+    }
+
+
+SCENARIOS = {"login": login, "timesheet": timesheet, "dashboard": dashboard, "export": export}
+
+
+async def run_scenario(base_url, dataset, name, requests, concurrency, warmup):
+    build = SCENARIOS[name]
+    calls = [build(dataset, i) for i in range(warmup + requests)]
+    latencies = []
+    statuses = {}
+    transfer_errors = 0
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def send(call, record):
+            nonlocal transfer_errors
+            method, path, options = call
+            started = time.perf_counter()
+            try:
+                # The whole body is read, so streamed exports are timed to the last byte.
+                response = await client.request(method, path, **options)
+                status = response.status_code
+            except httpx.HTTPError:
+                transfer_errors += 1
+                return
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        async def worker(queue, record):
+            while not queue.empty():
+                await send(queue.get_nowait(), record)
+
+        for batch, record in ((calls[:warmup], False), (calls[warmup:], True)):
+            queue = asyncio.Queue()
+            for call in batch:
+                queue.put_nowait(call)
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(queue, record) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(q):
+        return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    errors = sum(count for status, count in statuses.items() if status >= 400) + transfer_errors
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def compare(baseline, current, threshold):
+    """Per-scenario rps and p95 deltas; returns the lines that regressed."""
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before or not before["rps"] or not before["p95_ms"]:
+            continue
+        rps_change = now["rps"] / before["rps"] - 1
+        p95_change = now["p95_ms"] / before["p95_ms"] - 1
+        line = (
+            f"{name:10} rps {before['rps']} -> {now['rps']} ({rps_change:+.0%})  "
+            f"p95 {before['p95_ms']}ms -> {now['p95_ms']}ms ({p95_change:+.0%})"
+        )
+        print(line)
+        if rps_change < -threshold or p95_change > threshold:
+            regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--database", help="generated database to copy and load-test")
+    source.add_argument("--scale", choices=datagen.SCALES, default="small",
+                        help="generate a fresh dataset at this scale (default)")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, help="requests per scenario (default: per scenario)")
+    parser.add_argument("--concurrency", type=int, help="concurrent clients (default: per scenario)")
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded requests before each scenario")
+    parser.add_argument("--async-db", action="store_true", help="serve with USE_ASYNC_DB=true")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON results here")
+    parser.add_argument("--compare", help="earlier results to diff against; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed rps drop / p95 rise before --compare fails")
+    args = parser.parse_args()
+
+    results = {
+        **git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "stack": "async" if args.async_db else "sync",
+        "source": args.database or f"datagen:{args.scale}",
+        "seed": args.seed,
+        "scenarios": {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "tracker.db")
+        if args.database:
+            shutil.copyfile(args.database, path)
+        else:
+            datagen.generate(path, datagen.SCALES[args.scale], args.seed, log=lambda line: None)
+        dataset = Dataset(path, args.seed)
+        results["dataset"] = dataset.counts
+
+        proc, base_url = _start_server(workdir, args.async_db)
+        try:
+            for name in args.scenarios:
+                requests = args.requests or DEFAULTS[name]["requests"]
+                concurrency = args.concurrency or DEFAULTS[name]["concurrency"]
+                result = asyncio.run(run_scenario(base_url, dataset, name, requests, concurrency, args.warmup))
+                results["scenarios"][name] = result
+                print(json.dumps({"scenario": name, **result}))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} scenario(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
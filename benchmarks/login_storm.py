@@ -0,0 +1,111 @@
+"""Latency of ordinary endpoints while a burst of logins hammers bcrypt.
+
+Starts the API under uvicorn once with bcrypt inline (PASSWORD_HASH_WORKERS=0)
+and once with the process pool, then probes GET /users/me with and without a
+concurrent login storm running.
+
+    python -m benchmarks.login_storm --logins 400 --storm-concurrency 100 --probes 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.async_load import _start_server
+
+CREDENTIALS = {"email": "storm@example.com", "password": "storm"}
+
+
+def _seed(base_url):
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        client.post("/auth/register", json={**CREDENTIALS, "name": "storm", "role": "user"})
+        token = client.post("/auth/login", json=CREDENTIALS).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+
+async def _storm(client, total, concurrency, statuses):
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            try:
+                response = await client.post("/auth/login", json=CREDENTIALS)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError:
+                statuses["error"] += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _probe(client, headers, total, concurrency):
+    remaining = iter(range(total))
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get("/users/me", headers=headers)
+                if response.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return {
+        "probe_errors": errors,
+        "probe_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "probe_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+async def _run(base_url, headers, args, with_storm):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        statuses = Counter()
+        storm = None
+        if with_storm:
+            storm = asyncio.create_task(_storm(client, args.logins, args.storm_concurrency, statuses))
+            await asyncio.sleep(0.5)  # let the storm saturate first
+        started = time.perf_counter()
+        result = await _probe(client, headers, args.probes, args.probe_concurrency)
+        result["probe_seconds"] = round(time.perf_counter() - started, 2)
+        if storm:
+            await storm
+            result["logins"] = {str(code): count for code, count in statuses.items()}
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--storm-concurrency", type=int, default=100)
+    parser.add_argument("--probes", type=int, default=1000)
+    parser.add_argument("--probe-concurrency", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    for mode, workers in (("inline", 0), ("pool", args.workers)):
+        with tempfile.TemporaryDirectory() as workdir:
+            proc, base_url = _start_server(workdir, False, {"PASSWORD_HASH_WORKERS": str(workers)})
+            try:
+                headers = _seed(base_url)
+                for with_storm in (False, True):
+                    result = asyncio.run(_run(base_url, headers, args, with_storm))
+                    print(json.dumps({"mode": mode, "storm": with_storm, **result}))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Bytes read, time and peak allocation for listing one large project.
+
+Seeds a project whose tasks carry ~1.5 KB descriptions and 20-item JSON asset
+lists, plus time entries with notes. It then compares:
+
+    tasks  entity+eager   Task entities with every column (the old db.query(Task))
+    tasks  entity         Task entities with description/assets deferred
+    tasks  default        TaskOut columns only (GET /projects/{id}/tasks)
+    tasks  fields=heavy   ...?fields=taskId,title,description,assets
+    entries entity+eager  TimeEntry entities with the note
+    entries default       TimeEntryResponse columns
+    entries fields=hours  ...?fields=hours
+
+"bytes" sums the stored size of every selected value, which is what SQLite
+hands to the driver. "peak_kb" is the tracemalloc peak of the query plus the
+rendered response.
+
+    python -m benchmarks.projection --tasks 20000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from pydantic import TypeAdapter
+from sqlalchemy import cast, func, LargeBinary, select
+from sqlalchemy.orm import undefer
+
+from app.core.database import create_engines, create_session_factory
+from app.core.metrics import TimedJSONResponse
+from app.core.migrations import migrate
+from app.models.task import Task
+from app.models.time_entries import TimeEntry
+from app.schemas.task import TaskDetailOut, TaskOut
+from app.schemas.time_entries import TimeEntryResponse
+from app.utils.rows import field_columns, rows_response
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def seed(path, tasks, entries):
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (\"userId\", email, name, role, password_hash) VALUES (1, 'a@example.com', 'a', 'admin', 'x')")
+    conn.execute("INSERT INTO projects (\"projectId\", name) VALUES (1, 'large')")
+    conn.executemany(
+        'INSERT INTO tasks ("projectId", title, description, status, priority, assets, "createdBy") '
+        "VALUES (1, ?, ?, 'todo', 'high', ?, 1)",
+        (
+            (
+                f"Task {t}",
+                " ".join(rng.choice(WORDS) for _ in range(250)),
+                json.dumps([f"https://assets.example.com/{t}/{a}.png" for a in range(20)]),
+            )
+            for t in range(tasks)
+        ),
+    )
+    conn.executemany(
+        'INSERT INTO time_entries ("userId", "projectId", hours, billable, "workDate", note) '
+        "VALUES (1, 1, 1.5, 'billable', ?, ?)",
+        (
+            ((date(2024, 1, 1) + timedelta(days=e % 700)).isoformat(), " ".join(rng.choice(WORDS) for _ in range(40)))
+            for e in range(entries)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def entity_columns(model, eager):
+    """The columns an entity query loads."""
+    return [
+        column for name, column in model.__mapper__.columns.items()
+        if eager or not model.__mapper__.get_property(name).deferred
+    ]
+
+
+def bytes_read(db, columns, where):
+    size = sum(func.coalesce(func.length(cast(column, LargeBinary)), 0) for column in columns)
+    return db.scalar(select(func.sum(size)).where(where))
+
+
+def cases():
+    def entities(model, schema, eager_options):
+        def run(db):
+            query = select(model).where(model.projectId == 1)
+            if eager_options:
+                query = query.options(*eager_options)
+            rows = db.scalars(query).all()
+            # The pre-projection path: validate every entity through the schema.
+            adapter = TypeAdapter(list[schema])
+            return TimedJSONResponse(adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")).body
+        return run
+
+    def projected(columns, model):
+        def run(db):
+            return rows_response(db.execute(select(*columns).where(model.projectId == 1))).body
+        return run
+
+    heavy = field_columns("taskId,title,description,assets", TaskDetailOut, Task)
+    entry_default = field_columns(None, TimeEntryResponse, TimeEntry)
+    entry_hours = field_columns("hours", TimeEntryResponse, TimeEntry, always=(TimeEntry.workDate, TimeEntry.timeEntryId))
+    return [
+        ("tasks", "entity+eager", entity_columns(Task, True),
+         entities(Task, TaskOut, [undefer(Task.description), undefer(Task.assets)]), Task),
+        ("tasks", "entity", entity_columns(Task, False), entities(Task, TaskOut, None), Task),
+        ("tasks", "default", field_columns(None, TaskDetailOut, Task, default=TaskOut),
+         projected(field_columns(None, TaskDetailOut, Task, default=TaskOut), Task), Task),
+        ("tasks", "fields=heavy", heavy, projected(heavy, Task), Task),
+        ("entries", "entity+eager", entity_columns(TimeEntry, True),
+         entities(TimeEntry, TimeEntryResponse, [undefer(TimeEntry.note)]), TimeEntry),
+        ("entries", "default", entry_default, projected(entry_default, TimeEntry), TimeEntry),
+        ("entries", "fields=hours", entry_hours, projected(entry_hours, TimeEntry), TimeEntry),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--entries", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+    migrate(writer)
+    seed(path, args.tasks, args.entries)
+    SessionLocal = create_session_factory(writer, reader)
+
+    for table, name, columns, run, model in cases():
+        with SessionLocal() as db:
+            read = bytes_read(db, columns, model.projectId == 1)
+
+        samples = []
+        for _ in range(args.repeat):
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                body = run(db)
+                samples.append(time.perf_counter() - started)
+
+        with SessionLocal() as db:
+            tracemalloc.start()
+            run(db)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        print(json.dumps({
+            "table": table,
+            "query": name,
+            "columns": len(columns),
+            "bytes": read,
+            "response_bytes": len(body),
+            "ms": round(min(samples) * 1000, 1),
+            "peak_kb": peak // 1024,
+        }))
+
+
+if __name__ == "__main__":
+    main()
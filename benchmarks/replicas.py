@@ -0,0 +1,180 @@
+"""Read throughput with and without read replicas, and a read-your-writes check.
+
+Generates a dataset (see benchmarks.datagen) and serves copies of it under
+uvicorn (see benchmarks.async_load), first from the primary alone, then
+with --replicas local replica stand-ins (see app.core.replicas):
+
+    --mode copy   SQLite files the server re-copies from the primary every
+                  --sync-seconds (DB_REPLICA_SYNC_SECONDS)
+    --mode uri    read-only URI connections on the primary's own file, with
+                  DB_REPLICA_STICKY_SECONDS of stickiness after a write
+
+For --seconds, --readers clients page through heavy @read_only GETs (a
+project's time entries and the hour stats) as project owners. At the same
+time --writers clients each create a time entry and read it straight back
+by id as the same user. That read must find the entry, whichever replica
+the request lands on:
+
+    read_rps / read_p99_ms    the heavy GETs
+    write_rps / write_p99_ms  the creates
+    ryw_violations            read-backs that did not see the user's own write
+    replica_reads             read-only sessions served by a replica
+    primary_reads             read-only sessions kept on the primary
+
+    python -m benchmarks.replicas --scale small --replicas 2
+    python -m benchmarks.replicas --database large.db --sync-seconds 5 --async
+    python -m benchmarks.replicas --mode uri
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+import httpx
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from benchmarks import datagen
+from benchmarks.async_load import _start_server
+from benchmarks.load import Dataset
+
+
+def _percentile(latencies, q):
+    latencies = sorted(latencies)
+    return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1) if latencies else None
+
+
+async def _drive(base_url, dataset, args):
+    reads, writes = [], []
+    result = {"errors": 0, "ryw_violations": 0}
+    deadline = time.perf_counter() + args.seconds
+
+    limits = httpx.Limits(max_connections=args.readers + args.writers)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def reader(number):
+            i = number
+            while time.perf_counter() < deadline:
+                user_id, project_id = dataset.owned[i % len(dataset.owned)]
+                path = (
+                    f"/time_entries/time-entries/project/{project_id}?limit=500",
+                    "/time_entries/time-entries/stats/summary",
+                )[i % 2]
+                i += args.readers
+                started = time.perf_counter()
+                response = await client.get(path, headers=dataset.headers(user_id))
+                if response.status_code != 200:
+                    result["errors"] += 1
+                    continue
+                reads.append(time.perf_counter() - started)
+
+        async def writer(number):
+            i = number
+            while time.perf_counter() < deadline:
+                user_id = dataset.users[i % len(dataset.users)]
+                headers = dataset.headers(user_id)
+                work_date = datagen.LAST_WORK_DATE + timedelta(days=1 + i // len(dataset.users))
+                i += args.writers
+                started = time.perf_counter()
+                response = await client.post("/time_entries/time-entries", headers=headers, json={
+                    "projectId": dataset.rng.choice(dataset.projects),
+                    "hours": "1",
+                    "billable": "billable",
+                    "workDate": work_date.isoformat(),
+                })
+                if response.status_code not in (200, 201):
+                    result["errors"] += 1
+                    continue
+                writes.append(time.perf_counter() - started)
+                entry_id = response.json()["timeEntryId"]
+                response = await client.get(f"/time_entries/time-entries/{entry_id}", headers=headers)
+                if response.status_code != 200:
+                    result["ryw_violations"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(reader(number) for number in range(args.readers)),
+            *(writer(number) for number in range(args.writers)),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "read_rps": round(len(reads) / elapsed, 1),
+        "read_p50_ms": _percentile(reads, 0.5),
+        "read_p99_ms": _percentile(reads, 0.99),
+        "write_rps": round(len(writes) / elapsed, 1),
+        "write_p99_ms": _percentile(writes, 0.99),
+        **result,
+    }
+
+
+def _metrics(base_url):
+    totals = {"replica_reads": 0.0, "primary_reads": 0.0}
+    for line in httpx.get(base_url + "/metrics").text.splitlines():
+        if line.startswith("replica_reads_total"):
+            totals["replica_reads"] += float(line.split()[-1])
+        elif line.startswith("replica_primary_reads_total "):
+            totals["primary_reads"] = float(line.split()[-1])
+    return {name: int(value) for name, value in totals.items()}
+
+
+def run(source, replicas, args):
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copyfile(source, os.path.join(workdir, "tracker.db"))
+        if args.mode == "copy":
+            urls = [f"sqlite:///{os.path.join(workdir, f'replica{n}.db')}" for n in range(replicas)]
+        else:
+            urls = [f"sqlite:///file:{os.path.join(workdir, 'tracker.db')}?mode=ro&uri=true"] * replicas
+        env = {
+            "DB_REPLICA_URLS": json.dumps(urls),
+            "DB_REPLICA_SYNC_SECONDS": str(args.sync_seconds if args.mode == "copy" else 0),
+            "PASSWORD_HASH_WORKERS": "0",
+        }
+        proc, base_url = _start_server(workdir, use_async=args.use_async, extra_env=env)
+        try:
+            result = asyncio.run(_drive(base_url, Dataset(source, args.seed), args))
+            result.update(_metrics(base_url))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    return {
+        "stack": "async" if args.use_async else "sync",
+        "replicas": replicas,
+        "mode": args.mode if replicas else None,
+        "sync_seconds": args.sync_seconds if replicas and args.mode == "copy" else None,
+        **result,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--database", help="generated database to copy and serve")
+    source.add_argument("--scale", choices=datagen.SCALES, default="small",
+                        help="generate a fresh dataset at this scale (default)")
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--mode", choices=("copy", "uri"), default="copy")
+    parser.add_argument("--sync-seconds", type=float, default=1)
+    parser.add_argument("--seconds", type=float, default=30, help="duration of each run")
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use the async routers")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = args.database
+        if not source:
+            source = os.path.join(workdir, "source.db")
+            datagen.generate(source, datagen.SCALES[args.scale], args.seed, log=lambda line: None)
+
+        for replicas in (0, args.replicas):
+            print(json.dumps(run(source, replicas, args)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
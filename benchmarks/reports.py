@@ -0,0 +1,203 @@
+"""Columnar utilization/due-date reports against the SQL GROUP BYs they replace.
+
+Generates a dataset (see benchmarks.datagen), loads the analytics snapshot
+and runs each report both ways:
+
+    columnar   app.utils.analytics on the in-memory snapshot
+    sql        the same aggregation as one GROUP BY on time_entries
+
+"match" says both returned the same groups and totals. Timings are the
+median of --repeat runs. It also prints the snapshot's load time and size,
+and the time to refresh it after --changes inserts, updates and deletes.
+
+    python -m benchmarks.reports --entries 1000000
+    python -m benchmarks.reports --database large.db
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from sqlalchemy import Integer, case, cast, func, select, text
+
+from app.core.database import create_engines
+from app.core.enums import Billing, TaskStatus
+from app.models.task import Task
+from app.models.time_entries import TimeEntry
+from app.utils import analytics
+from benchmarks import datagen
+
+
+def _week(column):
+    return (cast(func.julianday(column) - 1721424.5, Integer) - 1) // 7
+
+
+def _centi(column):
+    return func.round(column * 100)
+
+
+def utilization_sql(group_by, start=None, end=None, project_id=None, user_id=None):
+    group = {"user": TimeEntry.userId, "project": TimeEntry.projectId}[group_by]
+    week = _week(TimeEntry.workDate)
+    query = select(
+        group,
+        week,
+        func.sum(_centi(TimeEntry.hours)),
+        func.sum(case((TimeEntry.billable == Billing.billable.value, _centi(TimeEntry.hours)), else_=0)),
+    ).group_by(group, week)
+    if start:
+        query = query.where(TimeEntry.workDate >= start)
+    if end:
+        query = query.where(TimeEntry.workDate <= end)
+    if project_id is not None:
+        query = query.where(TimeEntry.projectId == project_id)
+    if user_id is not None:
+        query = query.where(TimeEntry.userId == user_id)
+    return query
+
+
+def due_dates_sql(today, overdue_only):
+    due_day = cast(func.julianday(Task.dueAt) - 1721424.5, Integer)
+    work_day = cast(func.julianday(TimeEntry.workDate) - 1721424.5, Integer)
+    late = func.sum(case((work_day > due_day, _centi(TimeEntry.hours)), else_=0))
+    query = (
+        select(Task.taskId, func.sum(_centi(TimeEntry.hours)), late)
+        .join(TimeEntry, TimeEntry.taskId == Task.taskId)
+        .where(Task.dueAt.is_not(None))
+        .group_by(Task.taskId)
+    )
+    if overdue_only:
+        query = query.where(due_day < today.toordinal(), Task.status != TaskStatus.complete.value)
+    return query
+
+
+def timed(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def utilization_cases(last_day):
+    quarter = last_day - timedelta(days=90)
+    return [
+        ("utilization", "by user, all time", ("user",)),
+        ("utilization", "by project, last quarter", ("project", quarter, last_day)),
+        ("utilization", "one user, all time", ("user", None, None, None, 7)),
+    ]
+
+
+def change_some(writer, changes):
+    """Insert, update and delete `changes` rows each, as API writes would."""
+    with writer.begin() as connection:
+        top = connection.scalar(select(func.max(TimeEntry.timeEntryId)))
+        connection.execute(text(
+            'INSERT INTO time_entries ("userId", "projectId", "taskId", hours, billable, "workDate") '
+            'SELECT "userId", "projectId", "taskId", hours, billable, "workDate" FROM time_entries '
+            'WHERE "timeEntryId" > :top - :n'
+        ), {"top": top, "n": changes})
+        connection.execute(text('UPDATE time_entries SET hours = hours + 0.25 WHERE "timeEntryId" % :step = 0'),
+                           {"step": top // changes})
+        connection.execute(text('DELETE FROM time_entries WHERE "timeEntryId" % :step = 1'),
+                           {"step": top // changes})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="existing generated database to report on instead")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--changes", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.database
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        counts = {**datagen.SCALES["medium"], "time_entries": args.entries, "task_logs": 0}
+        started = time.perf_counter()
+        datagen.generate(path, counts, log=lambda line: None)
+        print(json.dumps({"generated_entries": args.entries, "seconds": round(time.perf_counter() - started, 1)}))
+
+    writer, reader = create_engines(f"sqlite:///{path}", "production", echo=False)
+
+    started = time.perf_counter()
+    snap = analytics.Snapshot().load(reader)
+    load_seconds = time.perf_counter() - started
+    entries = snap.tables["time_entries"]
+    print(json.dumps({
+        "snapshot": "load",
+        "rows": {name: table.size for name, table in snap.tables.items()},
+        "seconds": round(load_seconds, 2),
+        "mb": round(sum(
+            table[name].nbytes for table in snap.tables.values() for name in ("key", "alive", *dict(table.source.columns))
+        ) / 2**20, 1),
+    }))
+
+    last_day = datagen.LAST_WORK_DATE
+    with reader.connect() as connection:
+        for report, label, params in utilization_cases(last_day):
+            columnar_seconds, columnar = timed(lambda: analytics.utilization(snap, *params), args.repeat)
+            sql_seconds, rows = timed(lambda: connection.execute(utilization_sql(*params)).all(), args.repeat)
+            field = {"user": "userId", "project": "projectId"}[params[0]]
+            expected = {(group, week): (hours, billed) for group, week, hours, billed in rows}
+            got = {
+                (item[field], (item["week"].toordinal() - 1) // 7): (item["hours"] * 100, item["billable_hours"] * 100)
+                for item in columnar["items"]
+            }
+            print(json.dumps({
+                "report": report,
+                "query": label,
+                "columnar_ms": round(columnar_seconds * 1000, 1),
+                "sql_ms": round(sql_seconds * 1000, 1),
+                "groups": len(got),
+                "match": got.keys() == expected.keys() and all(
+                    abs(got[k][0] - expected[k][0]) < 0.5 and abs(got[k][1] - expected[k][1]) < 0.5 for k in got
+                ),
+            }))
+
+        today = last_day - timedelta(days=30)
+        for overdue_only in (False, True):
+            limit = entries.size
+            columnar_seconds, columnar = timed(
+                lambda: analytics.due_dates(snap, today, overdue_only=overdue_only, limit=limit), args.repeat,
+            )
+            sql_seconds, rows = timed(lambda: connection.execute(due_dates_sql(today, overdue_only)).all(), args.repeat)
+            expected = {task: (hours, late) for task, hours, late in rows}
+            # The SQL join only sees tasks with entries; the report lists every due task.
+            got = {
+                item["taskId"]: (item["hours"] * 100, item["hours_after_due"] * 100)
+                for item in columnar["items"] if item["hours"]
+            }
+            print(json.dumps({
+                "report": "due_dates",
+                "query": "overdue only" if overdue_only else "all due tasks",
+                "columnar_ms": round(columnar_seconds * 1000, 1),
+                "sql_ms": round(sql_seconds * 1000, 1),
+                "groups": len(got),
+                "match": got.keys() == expected.keys() and all(
+                    abs(got[k][0] - expected[k][0]) < 0.5 and abs(got[k][1] - expected[k][1]) < 0.5 for k in got
+                ),
+            }))
+
+    change_some(writer, args.changes)
+    started = time.perf_counter()
+    snap.refresh(reader)
+    refresh_seconds = time.perf_counter() - started
+    fresh = analytics.Snapshot().load(reader)
+    print(json.dumps({
+        "snapshot": "refresh",
+        "changes": args.changes,
+        "seconds": round(refresh_seconds, 3),
+        "match": analytics.utilization(snap, "project")["items"] == analytics.utilization(fresh, "project")["items"],
+    }))
+
+
+if __name__ == "__main__":
+    main()
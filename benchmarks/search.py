@@ -0,0 +1,119 @@
+"""FTS5 task search against the LIKE scan it replaces.
+
+Generates a dataset (see benchmarks.datagen) and runs each query two ways:
+
+    fts        GET /search/tasks: MATCH on tasks_fts, ranked by bm25
+    like       title/description LIKE '%word%' for every word, unranked, so
+               it stops at the first --limit matches
+    like_scan  the same LIKE over every match, which ranking (or filtering
+               the whole project client-side) needs; "matches" is its count
+
+Each runs as an admin, who may see every task, and as a manager, who may see
+the tasks of their own projects and any assigned ones. The manager's scope is
+applied with the same filter as the endpoint. Timings are the median of
+--repeat runs, each returning at most --limit rows.
+
+    python -m benchmarks.search --tasks 1000000
+    python -m benchmarks.search --database large.db
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from sqlalchemy import and_, func, or_, select
+
+from app.core.database import create_engines, create_session_factory
+from app.models.task import Task
+from app.models.user import User
+from app.utils.perimissions import resolve_scope
+from app.utils.search import task_search_query
+from benchmarks import datagen
+
+# (label, query): a common and a mid-frequency word, a prefix, a conjunction,
+# a rare combination and a word no task contains (the LIKE worst case).
+QUERIES = [
+    ("common", "update"),
+    ("mid", "dashboard"),
+    ("prefix", "migr*"),
+    ("two words", "login timeout"),
+    ("rare", "kubernetes postmortem gdpr"),
+    ("no match", "zeppelin"),
+]
+
+
+def like_filter(q, scope):
+    words = [word.rstrip("*") for word in q.split()]
+    conditions = [or_(Task.title.like(f"%{word}%"), Task.description.like(f"%{word}%")) for word in words]
+    if not scope.is_admin:
+        conditions.append(or_(
+            Task.projectId.in_(sorted(scope.owned_projects)),
+            Task.taskId.in_(sorted(scope.assigned_tasks)),
+        ))
+    return and_(*conditions)
+
+
+def like_query(q, scope, limit):
+    columns = (Task.taskId, Task.projectId, Task.title, Task.status, Task.priority)
+    return select(*columns).where(like_filter(q, scope)).order_by(Task.taskId).limit(limit)
+
+
+def timed(db, statement, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = db.execute(statement).all()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="existing generated database to search instead")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.database
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        counts = {**datagen.SCALES["medium"], "tasks": args.tasks, "time_entries": 0, "task_logs": 0}
+        started = time.perf_counter()
+        datagen.generate(path, counts, log=lambda line: None)
+        print(json.dumps({"generated_tasks": args.tasks, "seconds": round(time.perf_counter() - started, 1)}))
+
+    SessionLocal = create_session_factory(*create_engines(f"sqlite:///{path}", "production", echo=False))
+    with SessionLocal() as db:
+        manager = db.scalar(select(User.userId).where(User.role == "manager").order_by(User.userId).limit(1))
+        actors = {
+            "admin": resolve_scope(db, SimpleNamespace(userId=1, role="admin")),
+            "manager": resolve_scope(db, SimpleNamespace(userId=manager, role="manager")),
+        }
+
+        for actor, scope in actors.items():
+            for label, q in QUERIES:
+                fts_seconds, fts_rows = timed(db, task_search_query(q, scope, limit=args.limit), args.repeat)
+                like_seconds, like_rows = timed(db, like_query(q, scope, args.limit), args.repeat)
+                scan_seconds, _ = timed(db, select(func.count()).where(like_filter(q, scope)), args.repeat)
+                matches = db.scalar(select(func.count()).where(like_filter(q, scope)))
+                print(json.dumps({
+                    "actor": actor,
+                    "query": label,
+                    "q": q,
+                    "fts_ms": round(fts_seconds * 1000, 2),
+                    "fts_rows": fts_rows,
+                    "like_ms": round(like_seconds * 1000, 2),
+                    "like_rows": like_rows,
+                    "like_scan_ms": round(scan_seconds * 1000, 2),
+                    "matches": matches,
+                }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Serialization cost per 10k time-entry rows, old path against new.
+
+    orm+validate+json   ORM objects, response_model validation, stdlib json
+    rows+validate+json  selected columns as Rows, validation, stdlib json
+    rows+orjson         selected columns as Rows rendered straight to orjson
+                        (what the list endpoints do now)
+
+Each path is timed from the query to the rendered bytes, best of --repeat.
+
+    python -m benchmarks.serialization --rows 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+from starlette.responses import JSONResponse
+
+from app.core.database import create_engines, create_session_factory
+from app.models.time_entries import TimeEntry
+from app.routers.time_entries import ENTRY_KEY
+from app.schemas.pagination import Page
+from app.schemas.time_entries import TimeEntryResponse
+from app.utils.pagination import build_page
+from app.utils.rows import model_columns, page_response
+from benchmarks import datagen
+
+PAGE = TypeAdapter(Page[TimeEntryResponse])
+ENTRY_COLUMNS = model_columns(TimeEntryResponse, TimeEntry)
+
+
+def orm_validate_json(db, limit):
+    query = select(TimeEntry).options(undefer(TimeEntry.note))
+    rows = db.scalars(query.order_by(*ENTRY_KEY).limit(limit + 1)).all()
+    page = PAGE.dump_python(PAGE.validate_python(build_page(rows, ENTRY_KEY, limit), from_attributes=True), mode="json")
+    return JSONResponse(page).body
+
+
+def rows_validate_json(db, limit):
+    rows = db.execute(select(*ENTRY_COLUMNS).order_by(*ENTRY_KEY).limit(limit + 1)).all()
+    page = PAGE.dump_python(PAGE.validate_python(build_page(rows, ENTRY_KEY, limit), from_attributes=True), mode="json")
+    return JSONResponse(page).body
+
+
+def rows_orjson(db, limit):
+    rows = db.execute(select(*ENTRY_COLUMNS).order_by(*ENTRY_KEY).limit(limit + 1)).all()
+    return page_response(rows, ENTRY_KEY, limit).body
+
+
+PATHS = {
+    "orm+validate+json": orm_validate_json,
+    "rows+validate+json": rows_validate_json,
+    "rows+orjson": rows_orjson,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    counts = {**datagen.SCALES["small"], "time_entries": args.rows, "task_logs": 0}
+    datagen.generate(path, counts, log=lambda line: None)
+    SessionLocal = create_session_factory(*create_engines(f"sqlite:///{path}", "production", echo=False))
+
+    bodies = {}
+    baseline = None
+    for name, run in PATHS.items():
+        samples = []
+        for _ in range(args.repeat):
+            with SessionLocal() as db:
+                started = time.perf_counter()
+                bodies[name] = run(db, args.rows)
+                samples.append(time.perf_counter() - started)
+        best = min(samples)
+        baseline = baseline or best
+        print(json.dumps({
+            "path": name,
+            "rows": args.rows,
+            "ms": round(best * 1000, 2),
+            "us_per_row": round(best / args.rows * 1e6, 2),
+            "speedup": round(baseline / best, 2),
+            "bytes": len(bodies[name]),
+        }))
+
+    # All three must produce the same document.
+    documents = {name: json.loads(body) for name, body in bodies.items()}
+    assert len({json.dumps(doc, sort_keys=True) for doc in documents.values()}) == 1, "payloads differ"
+
+
+if __name__ == "__main__":
+    main()
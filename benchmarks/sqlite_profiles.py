@@ -0,0 +1,119 @@
+"""Concurrent time-entry writes vs. reads under the legacy and production engine profiles.
+
+    python -m benchmarks.sqlite_profiles --writers 8 --readers 16 --seconds 10
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import Base, create_engines, create_session_factory
+from app.models import user, project, task, assignee, task_log, time_entries  # noqa: F401
+from app.models.project import Project
+from app.models.time_entries import TimeEntry
+from app.models.user import User
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))] * 1000
+
+
+def run_profile(profile, writers, readers, seconds):
+    workdir = tempfile.mkdtemp()
+    url = f"sqlite:///{workdir}/bench.db"
+    # The legacy profile logged every statement; keep that cost but not the noise.
+    writer_engine, reader_engine = create_engines(url, profile, echo=profile == "legacy")
+    logging.getLogger("sqlalchemy.engine.Engine").handlers = [logging.NullHandler()]
+    Base.metadata.create_all(bind=writer_engine)
+    SessionLocal = create_session_factory(writer_engine, reader_engine)
+
+    with SessionLocal() as db:
+        users = [User(email=f"u{i}@example.com", name=f"u{i}", password_hash="x") for i in range(writers)]
+        db.add_all(users + [Project(name="bench")])
+        db.commit()
+        user_ids = [u.userId for u in users]
+
+    stop = threading.Event()
+    stats = {"write": [], "read": [], "write_errors": 0, "read_errors": 0}
+    lock = threading.Lock()
+
+    def write_loop(user_id):
+        day = date(2024, 1, 1)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    db.add(TimeEntry(userId=user_id, projectId=1, hours=1, billable="billable", workDate=day))
+                    db.commit()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    stats["write"].append(elapsed)
+            except OperationalError:
+                with lock:
+                    stats["write_errors"] += 1
+            day += timedelta(days=1)
+
+    def read_loop(user_id):
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    db.query(TimeEntry).filter(TimeEntry.userId == user_id).order_by(
+                        TimeEntry.workDate.desc()
+                    ).limit(50).all()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    stats["read"].append(elapsed)
+            except OperationalError:
+                with lock:
+                    stats["read_errors"] += 1
+
+    threads = [threading.Thread(target=write_loop, args=(user_ids[i % len(user_ids)],)) for i in range(writers)]
+    threads += [threading.Thread(target=read_loop, args=(user_ids[i % len(user_ids)],)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    writer_engine.dispose()
+    reader_engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_sec": round(len(stats["write"]) / seconds, 1),
+        "reads_per_sec": round(len(stats["read"]) / seconds, 1),
+        "write_p99_ms": round(_percentile(stats["write"], 0.99), 2),
+        "read_p99_ms": round(_percentile(stats["read"], 0.99), 2),
+        "write_errors": stats["write_errors"],
+        "read_errors": stats["read_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    for profile in ("legacy", "production"):
+        result = run_profile(profile, args.writers, args.readers, args.seconds)
+        print(json.dumps(result), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+# Settings are read once, at import: point every test at a scratch database
+# before anything from app is imported. USE_ASYNC_DB=true in the environment
+# runs the suite against the async routers.
+_workdir = tempfile.mkdtemp()
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{_workdir}/test.db"
+os.environ["QUERY_BUDGET_MODE"] = "raise"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["EVENT_HEARTBEAT_SECONDS"] = "0.05"
+
+import pytest
+
+from app.core.query_budget import QueryCounter
+
+
+@pytest.fixture
+def query_counter():
+    """Counts the SQL a test runs; check it with query_counter.assert_within(n).
+
+    QUERY_BUDGET_MODE is "raise", so any request over its @query_budget also
+    fails the test that made it.
+    """
+    with QueryCounter() as counter:
+        yield counter
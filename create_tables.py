@@ -1,4 +1,3 @@
-from app.core.database import engine, Base
-from app.models import user, project, task, assignee, task_log, time_entries
+from app.core.migrations import migrate
 
-Base.metadata.create_all(bind=engine)
+migrate()
@@ -0,0 +1,25 @@
+"""Recompute the time-entry rollups from scratch, or diff them with --verify."""
+import argparse
+import sys
+
+from app.core.database import engine
+from app.core.migrations import migrate
+from app.utils import rollups
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--verify", action="store_true", help="only report differences; exit 1 if any")
+args = parser.parse_args()
+
+migrate()
+
+with engine.begin() as connection:
+    diffs = rollups.verify(connection)
+    for diff in diffs:
+        print(f"{', '.join(map(str, diff['key']))}: stored={diff['stored']} expected={diff['expected']}")
+
+    if args.verify:
+        print(f"{len(diffs)} rollup rows differ")
+        sys.exit(1 if diffs else 0)
+
+    rollups.rebuild(connection)
+    print(f"Rebuilt rollups ({len(diffs)} rows were out of date)")
@@ -0,0 +1,81 @@
+"""A write stuck behind the committer gets a 503 only if it was never
+applied, and a dead committer fails its batch and is replaced by the next
+write."""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import group_commit
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+
+class Died(BaseException):
+    """Escapes the committer's error handling and ends its thread."""
+
+
+@pytest.fixture
+def db():
+    group_commit.shutdown()
+    with SessionLocal() as db:
+        yield db
+    group_commit.shutdown()
+
+
+def test_write_that_times_out_gets_503_and_is_never_applied(db, monkeypatch):
+    monkeypatch.setattr(settings, "GROUP_COMMIT_TIMEOUT_SECONDS", 0.05)
+    started, release = threading.Event(), threading.Event()
+    applied = []
+
+    def block(session):
+        started.set()
+        return release.wait(5)
+
+    blocker = group_commit._get_committer().submit(block)
+    assert started.wait(5)
+
+    with pytest.raises(HTTPException) as raised:
+        group_commit.run(db, applied.append)
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == str(settings.GROUP_COMMIT_RETRY_AFTER_SECONDS)
+
+    release.set()
+    assert blocker.result(timeout=5) is True
+    # The committer has moved on past the cancelled write without running it.
+    assert group_commit.run(db, lambda session: "next") == "next"
+    assert applied == []
+
+
+@pytest.mark.parametrize("stack", ["sync", "async"])
+def test_write_already_in_a_batch_is_waited_for_not_refused(db, monkeypatch, stack):
+    monkeypatch.setattr(settings, "GROUP_COMMIT_TIMEOUT_SECONDS", 0.05)
+
+    def slow(session):
+        threading.Event().wait(0.3)
+        return "committed"
+
+    timeouts = group_commit.timeouts
+    if stack == "sync":
+        result = group_commit.run(db, slow)
+    else:
+        result = asyncio.run(group_commit.run_async(db, slow))
+    assert result == "committed"
+    assert group_commit.timeouts == timeouts
+
+
+def test_dead_committer_fails_its_batch_and_is_restarted(db, monkeypatch):
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+    committer = group_commit._get_committer()
+
+    def die(session):
+        raise Died
+
+    dying = committer.submit(die)
+    assert isinstance(dying.exception(timeout=5), Died)
+    committer._thread.join(timeout=5)
+    assert not committer.alive()
+
+    assert group_commit.run(db, lambda session: "written") == "written"
+    assert group_commit._get_committer() is not committer
@@ -0,0 +1,105 @@
+"""Durable jobs survive the worker being down: every task change committed
+before a crash gets exactly one task_logs row once a worker runs again."""
+from itertools import cycle, islice
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.core import jobs
+from app.core.database import SessionLocal, engine
+from app.core.enums import TaskStatus
+from app.core.migrations import migrate
+from app.models.job import Job
+from app.models.project import Project
+from app.models.task import Task
+from app.models.task_log import TaskLog
+from app.utils import audit, writes
+
+STATUSES = list(islice(cycle([TaskStatus.ongoing, TaskStatus.complete, TaskStatus.todo]), 5))
+
+
+class Killed(BaseException):
+    """The worker's process dying; not an Exception, so nothing handles it."""
+
+
+@pytest.fixture
+def task_id():
+    migrate()
+    jobs.shutdown()  # no worker until a test starts one
+    with SessionLocal() as db:
+        project = Project(name="jobs")
+        db.add(project)
+        db.flush()
+        task = Task(projectId=project.projectId, title="jobs", status=TaskStatus.todo)
+        db.add(task)
+        db.commit()
+        project_id, task_id = project.projectId, task.taskId
+
+    yield task_id
+
+    jobs.shutdown()
+    with engine.begin() as connection:
+        connection.execute(delete(Job))
+        connection.execute(delete(TaskLog).where(TaskLog.taskId == task_id))
+        connection.execute(delete(Task).where(Task.taskId == task_id))
+        connection.execute(delete(Project).where(Project.projectId == project_id))
+
+
+def change_statuses(task_id):
+    """Commit each change in STATUSES; returns the log each should leave."""
+    expected = []
+    for status in STATUSES:
+        with SessionLocal() as db:
+            old_status, _ = writes.change_task_status(db, task_id, status, None)
+            db.commit()
+        expected.append(f"Status changed from {old_status} → {status}")
+    return expected
+
+
+def logs(task_id):
+    with engine.connect() as connection:
+        return connection.execute(
+            select(TaskLog.log).where(TaskLog.taskId == task_id).order_by(TaskLog.id)
+        ).scalars().all()
+
+
+def pending():
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(Job)).scalar()
+
+
+def test_changes_committed_while_worker_stopped_are_logged_once_on_restart(task_id):
+    expected = change_statuses(task_id)
+    assert logs(task_id) == []
+    assert pending() == len(STATUSES)
+
+    jobs.start()
+    jobs.shutdown()
+
+    assert logs(task_id) == expected
+    assert pending() == 0
+
+
+def test_worker_killed_after_claim_loses_no_job_and_repeats_none(task_id, monkeypatch):
+    expected = change_statuses(task_id)
+    write = jobs.HANDLERS[audit.KIND]
+
+    def write_then_die(connection, payloads):
+        # The DELETE ... RETURNING claim has taken the whole batch.
+        assert connection.execute(select(func.count()).select_from(Job)).scalar() == 0
+        write(connection, payloads)
+        raise Killed
+
+    monkeypatch.setitem(jobs.HANDLERS, audit.KIND, write_then_die)
+    with pytest.raises(Killed):
+        jobs.run_batch()
+    monkeypatch.setitem(jobs.HANDLERS, audit.KIND, write)
+
+    assert logs(task_id) == []
+    assert pending() == len(STATUSES)
+
+    jobs.start()
+    jobs.shutdown()
+
+    assert logs(task_id) == expected
+    assert pending() == 0
@@ -0,0 +1,30 @@
+"""A changed user's cached principal is dropped again at commit, so one
+re-cached from the pre-commit row by a concurrent request does not last."""
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal, engine
+from app.core.dependencies import principal_cache
+from app.core.migrations import migrate
+from app.models.user import User
+
+
+def test_principal_recached_before_commit_is_dropped_at_commit():
+    migrate()
+    with SessionLocal() as db:
+        user = User(email="principal@example.com", name="before", password_hash="x", role="user")
+        db.add(user)
+        db.commit()
+        user_id = user.userId
+
+        user.name = "after"
+        db.flush()
+        assert principal_cache.get(user_id) is None
+        # A concurrent request reads the committed row and caches it.
+        principal_cache.set(user_id, "stale")
+        db.commit()
+
+    try:
+        assert principal_cache.get(user_id) is None
+    finally:
+        with engine.begin() as connection:
+            connection.execute(delete(User).where(User.userId == user_id))
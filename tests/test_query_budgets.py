@@ -0,0 +1,161 @@
+"""Call every API route once against the scratch database and check its SQL
+statement count against the budget declared with @query_budget.
+
+Caches are cleared before each call, so budgets hold for the cold path. The
+cases share one client and run in order: later calls rely on rows created
+by earlier ones.
+
+    python -m pytest tests/test_query_budgets.py
+    USE_ASYNC_DB=true python -m pytest tests/test_query_budgets.py
+"""
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+from app.core import response_cache
+from app.core.dependencies import principal_cache, token_cache
+from app.core.query_budget import route_budget
+from app.main import app
+from app.utils import analytics
+from app.utils.perimissions import scope_cache
+
+ENTRY = {"projectId": 1, "hours": "1", "billable": "billable", "workDate": "2030-01-02"}
+
+# (method, route path, actor, concrete path, json body). Run in order: later
+# calls rely on rows created by earlier ones. Seeded ids: users 1 admin,
+# 2 manager, 3 user; project 1 owned by the manager; task 1 assigned to user 3.
+SAMPLES = [
+    ("GET", "/", None, "/", None),
+    ("GET", "/metrics", None, "/metrics", None),
+    ("GET", "/cache/stats", "admin", "/cache/stats", None),
+    ("POST", "/auth/register", None, "/auth/register",
+     {"email": "new@example.com", "name": "new", "password": "pw", "role": "user"}),
+    ("POST", "/auth/login", None, "/auth/login", {"email": "new@example.com", "password": "pw"}),
+    ("POST", "/projects", "manager", "/projects", {"name": "budget"}),
+    ("GET", "/projects", "user", "/projects", None),
+    ("GET", "/projects/accessible", "user", "/projects/accessible", None),
+    ("POST", "/projects/{project_id}/tasks", "manager", "/projects/1/tasks", {"title": "t"}),
+    ("POST", "/projects/{project_id}/tasks/bulk", "manager", "/projects/1/tasks/bulk",
+     {"tasks": [{"title": f"t{i}"} for i in range(20)]}),
+    ("PATCH", "/tasks/{task_id}/status", "manager", "/tasks/1/status?status=ongoing", None),
+    ("GET", "/projects/{project_id}/tasks", "manager", "/projects/1/tasks", None),
+    ("POST", "/tasks/{task_id}/assignees/{user_id}", "manager", "/tasks/2/assignees/3", None),
+    ("POST", "/tasks/assignees/bulk", "manager", "/tasks/assignees/bulk",
+     {"taskIds": list(range(3, 13)), "userIds": [1, 3]}),
+    ("DELETE", "/tasks/{task_id}/assignees/{user_id}", "manager", "/tasks/2/assignees/3", None),
+    ("GET", "/projects/{project_id}/assignees", "manager", "/projects/1/assignees", None),
+    ("GET", "/users/my/assigned-tasks", "user", "/users/my/assigned-tasks", None),
+    ("GET", "/tasks/{task_id}/logs", "user", "/tasks/1/logs", None),
+    ("GET", "/search/tasks", "manager", "/search/tasks?q=t*", None),
+    ("GET", "/search/task-logs", "user", "/search/task-logs?q=created", None),
+    ("GET", "/users", "admin", "/users", None),
+    ("GET", "/users/me", "user", "/users/me", None),
+    ("POST", "/time_entries/time-entries", "user", "/time_entries/time-entries", ENTRY),
+    ("POST", "/time_entries/time-entries/bulk", "manager", "/time_entries/time-entries/bulk",
+     {"entries": [{**ENTRY, "userId": 3, "workDate": f"2030-02-{d:02d}"} for d in range(1, 21)]}),
+    ("GET", "/time_entries/time-entries/stats/summary", "user", "/time_entries/time-entries/stats/summary", None),
+    ("GET", "/time_entries/time-entries/reports/utilization", "manager",
+     "/time_entries/time-entries/reports/utilization", None),
+    ("GET", "/time_entries/time-entries/reports/due-dates", "manager",
+     "/time_entries/time-entries/reports/due-dates?project_id=1", None),
+    ("GET", "/time_entries/time-entries/user/{user_id}", "manager", "/time_entries/time-entries/user/3", None),
+    ("GET", "/time_entries/time-entries/project/{project_id}/export", "manager",
+     "/time_entries/time-entries/project/1/export", None),
+    ("GET", "/time_entries/time-entries/project/{project_id}", "manager",
+     "/time_entries/time-entries/project/1", None),
+    ("GET", "/time_entries/time-entries", "user", "/time_entries/time-entries", None),
+    ("GET", "/time_entries/time-entries/{entry_id}", "user", "/time_entries/time-entries/1", None),
+    ("PATCH", "/time_entries/time-entries/{entry_id}", "user", "/time_entries/time-entries/1",
+     {**ENTRY, "hours": "2"}),
+    ("DELETE", "/time_entries/time-entries/{entry_id}", "user", "/time_entries/time-entries/1", None),
+]
+
+# Infinite streams: driven as raw ASGI with a client that disconnects at once,
+# since TestClient would wait for the body to end.
+STREAMS = [
+    ("GET", "/projects/{project_id}/events", "user", "/projects/1/events", None),
+]
+
+
+def clear_caches():
+    for cache in (principal_cache, token_cache, scope_cache, response_cache.response_cache):
+        cache.clear()
+
+
+async def open_stream(url, headers):
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "server": ("testserver", 80), "client": ("testclient", 50000), "root_path": "",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def seed(client):
+    headers = {}
+    for role in ("admin", "manager", "user"):
+        token = client.post("/auth/register", json={
+            "email": f"{role}@example.com", "name": role, "password": role, "role": role,
+        }).json()["access_token"]
+        headers[role] = {"Authorization": f"Bearer {token}"}
+    client.post("/projects", json={"name": "seed"}, headers=headers["manager"])
+    client.post("/projects/1/tasks", json={"title": "seed"}, headers=headers["manager"])
+    client.post("/tasks/1/assignees/3", headers=headers["manager"])
+    return headers
+
+
+ROUTES = {
+    (method, route.path): route
+    for route in app.routes if isinstance(route, APIRoute)
+    for method in route.methods
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        client.actors = seed(client)
+        analytics.refresh()  # rather than wait for the background load
+        yield client
+
+
+@pytest.mark.parametrize(
+    "method, path, actor, url, body",
+    SAMPLES + STREAMS,
+    ids=[f"{method} {path}" for method, path, *_ in SAMPLES + STREAMS],
+)
+def test_route_within_budget(client, query_counter, method, path, actor, url, body):
+    route = ROUTES.get((method, path))
+    assert route is not None, "not mounted"
+    budget = route_budget(route)
+    assert budget is not None, "no @query_budget declared"
+
+    headers = client.actors.get(actor, {})
+    clear_caches()
+    query_counter.statements.clear()
+    if (method, path, actor, url, body) in STREAMS:
+        status = client.portal.call(open_stream, url, headers)
+    else:
+        status = client.request(method, url, headers=headers, json=body).status_code
+
+    assert status < 400, f"sample call failed with {status}"
+    query_counter.assert_within(budget, f"{method} {path}")
+
+
+def test_every_route_has_a_sample():
+    sampled = {(method, path) for method, path, *_ in SAMPLES + STREAMS}
+    missing = sorted(key for key in ROUTES if key not in sampled and key[0] != "HEAD")
+    assert not missing, f"no sample call for {missing}"
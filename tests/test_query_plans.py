@@ -0,0 +1,8 @@
+"""Every hot query in app.core.query_plans is served by an index."""
+from app.core.migrations import migrate
+from app.core.query_plans import check_query_plans
+
+
+def test_hot_queries_are_index_backed():
+    migrate()
+    assert check_query_plans() == {}
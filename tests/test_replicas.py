@@ -0,0 +1,108 @@
+"""@read_only GETs go to a replica, except where it could miss the reader's
+own writes or is too far behind; those fall back to the primary."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import replicas, response_cache
+from app.core.config import settings
+from app.core.dependencies import principal_cache
+from app.main import app
+
+ENTRY = {"projectId": 1, "hours": "1", "billable": "billable", "workDate": "2030-03-02"}
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        token = client.post("/auth/register", json={
+            "email": "replicas@example.com", "name": "replicas", "password": "pw", "role": "user",
+        }).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        client.user_id = client.get("/users/me").json()["userId"]
+        yield client
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """One synced replica, a copy of the primary refreshed only by sync()."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    if settings.USE_ASYNC_DB:
+        from app.core.async_database import AsyncSessionLocal as factory, _async_replica_engine
+        engine = _async_replica_engine(url).sync_engine
+    else:
+        from app.core.database import SessionLocal as factory, create_reader_engine
+        engine = create_reader_engine(url)
+
+    replica = replicas.Replica(url)
+    monkeypatch.setattr(settings, "DB_REPLICA_SYNC_SECONDS", 3600)
+    monkeypatch.setattr(replicas, "REPLICAS", [replica])
+    monkeypatch.setitem(factory.kw, "replica_binds", [engine])
+    replicas._last_write.clear()
+    yield replica
+    engine.dispose()
+
+
+def create_entry(client):
+    response = client.post("/time_entries/time-entries", json=ENTRY)
+    assert response.status_code == 200
+    return response.json()["timeEntryId"]
+
+
+def read_entry(client, replica, entry_id):
+    """GET the entry; returns (status, "replica" or "primary")."""
+    principal_cache.clear()
+    response_cache.response_cache.clear()
+    reads, primary_reads = replica.reads, replicas.primary_reads
+    status = client.get(f"/time_entries/time-entries/{entry_id}").status_code
+    assert replica.reads + replicas.primary_reads == reads + primary_reads + 1
+    return status, "replica" if replica.reads > reads else "primary"
+
+
+def test_read_only_get_is_served_by_a_replica(client, replica):
+    entry_id = create_entry(client)
+    replicas.sync(replica)
+
+    assert read_entry(client, replica, entry_id) == (200, "replica")
+
+
+def test_group_committed_write_is_read_back_from_primary_until_replica_has_it(client, replica):
+    assert settings.GROUP_COMMIT_ENABLED
+    replicas.sync(replica)
+    # Committed by the group-commit thread on the user's behalf.
+    entry_id = create_entry(client)
+
+    assert read_entry(client, replica, entry_id) == (200, "primary")
+    replicas.sync(replica)
+    assert read_entry(client, replica, entry_id) == (200, "replica")
+
+
+def test_note_write_keeps_user_on_primary(client, replica):
+    entry_id = create_entry(client)
+    replicas.sync(replica)
+    replicas.note_write(client.user_id)
+
+    assert read_entry(client, replica, entry_id) == (200, "primary")
+
+
+def test_unsynced_replica_sticks_for_sticky_seconds_after_write(client, replica, monkeypatch):
+    entry_id = create_entry(client)
+    replicas.sync(replica)
+    monkeypatch.setattr(settings, "DB_REPLICA_SYNC_SECONDS", 0)
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 60)
+    replicas.note_write(client.user_id)
+
+    assert read_entry(client, replica, entry_id) == (200, "primary")
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_SECONDS", 0)
+    assert read_entry(client, replica, entry_id) == (200, "replica")
+
+
+@pytest.mark.parametrize("synced_ago", [None, settings.DB_REPLICA_MAX_LAG_SECONDS + 1], ids=["never", "lagging"])
+def test_replica_that_is_not_usable_falls_back_to_primary(client, replica, synced_ago):
+    entry_id = create_entry(client)
+    replicas.sync(replica)
+    replicas._last_write.clear()
+    replica.synced_at = None if synced_ago is None else time.monotonic() - synced_ago
+
+    assert read_entry(client, replica, entry_id) == (200, "primary")